@@ -1,63 +1,85 @@
-import requests
 import json
 from typing import Optional
 
+from aiworkforce.client import get_client
+from aiworkforce.pagination import DEFAULT_PAGE_SIZE, iter_records
 from aiworkforce.utils import save_all_objects
-from aiworkforce.types import FilterType
+from aiworkforce.query import Query, exact, since
 
 
 def get_all_agents(region_id:str, project_id:str, api_key:str):
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/agents/list"
-    response = requests.post(
-        path, 
-        headers=headers, 
+    client = get_client(region_id, project_id, api_key)
+    response = client.post(
+        "/agents/list",
         params=json.dumps({
             "page_size" : 50000, 
-            "filters" : [{"field":"project","condition":"==","condition_value":project_id,"filter_type":FilterType.EXACT_MATCH}]
+            "filters" : [exact("project", project_id)]
         })
     )
     
     return response.json()['results']
 
 
+def iter_agents(region_id:str, project_id:str, api_key:str, page_size:int=DEFAULT_PAGE_SIZE, prefetch:bool=False, updated_since:Optional[str]=None, fields:Optional[list]=None):
+    """ Lazily yields every agent in the project, one page at a time. updated_since (ISO timestamp) limits it to
+    recently changed ones, fields to those fields of each agent """
+    client = get_client(region_id, project_id, api_key)
+
+    query = Query().where(exact("project", project_id))
+    if updated_since:
+        query.where(since("update_date_", updated_since))
+    if fields:
+        query.select(*fields)
+
+    def fetch_page(page, cursor):
+        return client.post("/agents/list", json=query.to_body(page_size=page_size, page=page, cursor=cursor)).json()
+
+    return iter_records(fetch_page, page_size, prefetch)
+
+
+def iter_agent_ids(region_id:str, project_id:str, api_key:str, page_size:int=DEFAULT_PAGE_SIZE):
+    """ Ids of every agent in the project, listing only the id field """
+    for agent in iter_agents(region_id, project_id, api_key, page_size, fields=["agent_id"]):
+        yield agent["agent_id"]
+
+
 def get_agents_tool_metadata(agent_id:str, region_id:str, project_id:str, api_key:str):
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/agents/tools/list"
-    body = {"agent_ids": [agent_id]}
-    response = requests.post(path, json=body, headers=headers)
+    return get_many_agents_tool_metadata([agent_id], region_id, project_id, api_key)
+
+
+def get_many_agents_tool_metadata(agent_ids:list, region_id:str, project_id:str, api_key:str):
+    """ Tool metadata of several agents in one request """
+    client = get_client(region_id, project_id, api_key)
+    body = {"agent_ids": list(agent_ids)}
+    response = client.post("/agents/tools/list", json=body)
     
     return response.json().get("results", [])
 
 
 def get_agent_tools(agent_id:str, region_id:str, project_id:str, api_key:str):
-    headers = {"Content-Type": "application/json", "Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/agents/{agent_id}/tools/list"
-    response = requests.post(path, headers=headers)
+    client = get_client(region_id, project_id, api_key)
+    response = client.post(f"/agents/{agent_id}/tools/list", headers={"Content-Type": "application/json"})
     
     return response.json().get("chains", [])
 
 
-def create_agent(agent_json:dict, region_id:str, project_id:str, api_key:str, partial_update: Optional[bool] = False):
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/agents/upsert"
+def upsert_agent_response(agent_json:dict, region_id:str, project_id:str, api_key:str, partial_update: Optional[bool] = False):
+    """ create_agent's request, returning the raw response so callers can check its status """
+    client = get_client(region_id, project_id, api_key)
     body = {
         **agent_json,
         "partial_update": partial_update,
     }
-    response = requests.post(path, json=body, headers=headers)
-    return response.json()
+    return client.post("/agents/upsert", json=body)
+
+
+def create_agent(agent_json:dict, region_id:str, project_id:str, api_key:str, partial_update: Optional[bool] = False):
+    return upsert_agent_response(agent_json, region_id, project_id, api_key, partial_update).json()
 
 
 def delete_agent(agent_id:str, region_id:str, project_id:str, api_key:str):
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/agents/{agent_id}/delete"
-    response = requests.post(path, json={}, headers=headers)
+    client = get_client(region_id, project_id, api_key)
+    response = client.post(f"/agents/{agent_id}/delete", json={})
     
     return response.json()
 
@@ -66,31 +88,25 @@ def save_agents_to_file(agents:list, folderpath:str):
 
 
 def update_agent(agent_id:str, region_id:str, project_id:str, api_key:str, agent_json:dict):
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/agents/upsert"
+    client = get_client(region_id, project_id, api_key)
     agent_json["agent_id"] = agent_id
-    response = requests.post(path, json=agent_json, headers=headers)
+    response = client.post("/agents/upsert", json=agent_json)
     return response.json()
 
 
 def schedule_message_to_agent(region_id: str, project_id: str, agent_id: str, message: str, conversation_id: str, minutes_until_schedule: int, api_key: str) -> dict:
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/agents/{agent_id}/scheduled_triggers_item/create"
+    client = get_client(region_id, project_id, api_key)
     payload = {
         "message": message,
         "conversation_id": conversation_id,
         "minutes_until_schedule": minutes_until_schedule
     }
-    response = requests.post(path, headers=headers, json=payload)
+    response = client.post(f"/agents/{agent_id}/scheduled_triggers_item/create", json=payload)
     return response.json()
 
 
 def get_agent_analytics(region_id: str, project_id: str, agent_id: str, api_key: str, from_date: str = None, to_date: str = None) -> dict:
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/agents/analytics"
+    client = get_client(region_id, project_id, api_key)
 
     filters = {
         "agentId": {
@@ -110,5 +126,5 @@ def get_agent_analytics(region_id: str, project_id: str, agent_id: str, api_key:
     
     payload = {"filters": filters}
     
-    response = requests.post(path, headers=headers, json=payload)
+    response = client.post("/agents/analytics", json=payload)
     return response.json()
@@ -0,0 +1,9 @@
+""" Async equivalents of the blocking API functions. Calls share the pooled RelevanceClient session """
+from aiworkforce.aio.utils import gather_bounded, run_sync, set_max_workers
+from aiworkforce.aio.conversation import (
+    get_conversations_between_dates,
+    get_list_conversation_studio_history,
+    get_conversation_actions,
+    get_trigger_message,
+)
+from aiworkforce.aio.tool import get_tool_run_history
@@ -0,0 +1,18 @@
+from aiworkforce import conversation
+from aiworkforce.aio.utils import run_sync
+
+
+async def get_conversations_between_dates(region_id, project_id, agent_id, api_key, from_dt=None, to_dt=None):
+    return await run_sync(conversation.get_conversations_between_dates, region_id, project_id, agent_id, api_key, from_dt, to_dt)
+
+
+async def get_list_conversation_studio_history(region_id:str, project_id:str, api_key:str, agent_id:str, conversation_id:str, page_size:int=500000, page:int=1, conversation_state:str=None):
+    return await run_sync(conversation.get_list_conversation_studio_history, region_id, project_id, api_key, agent_id, conversation_id, page_size, page, conversation_state)
+
+
+async def get_conversation_actions(region_id:str, project_id:str, agent_id:str, conversation_id:str, api_key:str, conversation_state:str=None):
+    return await run_sync(conversation.get_conversation_actions, region_id, project_id, agent_id, conversation_id, api_key, conversation_state)
+
+
+async def get_trigger_message(region_id:str, project_id:str, agent_id:str, conversation_id:str, api_key:str):
+    return await run_sync(conversation.get_trigger_message, region_id, project_id, agent_id, conversation_id, api_key)
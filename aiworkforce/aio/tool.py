@@ -0,0 +1,6 @@
+from aiworkforce import tool
+from aiworkforce.aio.utils import run_sync
+
+
+async def get_tool_run_history(tool_id:str, region_id:str, project_id:str, api_key:str):
+    return await run_sync(tool.get_tool_run_history, tool_id, region_id, project_id, api_key)
@@ -0,0 +1,51 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Iterable, Optional
+
+
+DEFAULT_CONCURRENCY = 20
+DEFAULT_MAX_WORKERS = 64
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def set_max_workers(max_workers:int):
+    """ Resize the worker pool the async API runs blocking calls on. Match it to the client pool_size """
+    global _executor
+    with _executor_lock:
+        previous = _executor
+        _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="aiworkforce-aio")
+    if previous is not None:
+        previous.shutdown(wait=False)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS, thread_name_prefix="aiworkforce-aio")
+    return _executor
+
+
+async def run_sync(fn, *args, **kwargs):
+    """ Run a blocking aiworkforce call on the shared worker pool so the event loop stays free """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+async def gather_bounded(aws:Iterable[Awaitable], limit:Optional[int]=DEFAULT_CONCURRENCY, return_exceptions:bool=False) -> list:
+    """ Like asyncio.gather, but with at most `limit` awaitables running at once. Results keep input order """
+    if not limit:
+        return await asyncio.gather(*aws, return_exceptions=return_exceptions)
+
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(aw):
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(bounded(aw) for aw in aws), return_exceptions=return_exceptions)
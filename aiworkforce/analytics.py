@@ -0,0 +1,163 @@
+import math
+from array import array
+from collections import Counter, defaultdict
+
+from aiworkforce.utils import conversation_id_of, epoch_to_datetime, parse_platform_timestamps, percentile
+
+
+def clean_metadata(metadata:list) -> list:
+    """ custom_metadata as a list of {title: value} dicts, keeping repeated titles """
+    return [{item['title']: item.get('value')} for item in metadata or [] if 'title' in item]
+
+
+def metadata_value(cleaned:list, title:str):
+    """ Value of the first entry for title in clean_metadata output, None if absent """
+    for item in cleaned:
+        if title in item:
+            return item[title]
+    return None
+
+
+class ConversationCostTable:
+    """ Columnar table of conversations and their studio run history.
+
+    Conversation columns are parallel lists indexed by conversation position; action columns are typed
+    arrays (conversation position, epoch timestamp, cost, errored). Each studio run is read from its dict
+    once at ingest, with timestamps parsed in one batch per conversation; the aggregates then loop over the
+    flat arrays without dict access or datetime construction """
+
+    def __init__(self):
+        self.conversation_ids = []
+        self.names = []
+        self.states = []
+        self.metadata = []
+        self._positions = {}
+
+        self.action_conversation = array("l")
+        self.action_timestamp = array("d")
+        self.action_cost = array("d")
+        self.action_errored = array("b")
+
+        self._summary = None
+
+    def __len__(self):
+        return len(self.conversation_ids)
+
+    def add_conversation(self, conversation:dict, studio_results) -> int:
+        """ conversation is a record from the conversations list, studio_results its studio run history """
+        conversation_id = conversation_id_of(conversation)
+        details = conversation.get('metadata', {}).get('conversation', {})
+        position = self._positions.get(conversation_id)
+        if position is None:
+            position = len(self.conversation_ids)
+            self._positions[conversation_id] = position
+            self.conversation_ids.append(conversation_id)
+            self.names.append(details.get('title', ''))
+            self.states.append(details.get('state', 'unknown'))
+            self.metadata.append(clean_metadata(details.get('custom_metadata', [])))
+
+        if isinstance(studio_results, dict):
+            studio_results = studio_results.get('results', [])
+        studio_results = studio_results or []
+        timestamps = []
+        for result in studio_results:
+            timestamps.append(result.get("insert_date_"))
+            self.action_cost.append(result.get("cost", 0) or 0)
+            self.action_errored.append(1 if result.get("errors") else 0)
+        self.action_conversation.extend(array("l", [position]) * len(studio_results))
+        self.action_timestamp.extend(parse_platform_timestamps(timestamps))
+
+        self._summary = None
+        return position
+
+    def per_conversation(self) -> dict:
+        """ Columns of total_cost, errored_actions, start, end (epoch) and runtime_minutes per conversation """
+        if self._summary is not None:
+            return self._summary
+        n = len(self.conversation_ids)
+        cost = array("d", [0.0]) * n
+        errored = array("l", [0]) * n
+        start = array("d", [math.inf]) * n
+        end = array("d", [-math.inf]) * n
+
+        for position, timestamp, action_cost, action_errored in zip(self.action_conversation, self.action_timestamp, self.action_cost, self.action_errored):
+            cost[position] += action_cost
+            errored[position] += action_errored
+            if timestamp == timestamp:  # skips nan
+                if timestamp < start[position]:
+                    start[position] = timestamp
+                if timestamp > end[position]:
+                    end[position] = timestamp
+
+        runtime = array("d", ((e - s) / 60 if s <= e else 0.0 for s, e in zip(start, end)))
+        self._summary = {"total_cost": cost, "errored_actions": errored, "start": start, "end": end, "runtime_minutes": runtime}
+        return self._summary
+
+    def conversation_rows(self, tz:str="UTC") -> list:
+        """ One JSON-serialisable summary per conversation, timestamps rendered in tz """
+        summary = self.per_conversation()
+
+        def render(epoch):
+            return epoch_to_datetime(epoch, tz).isoformat() if math.isfinite(epoch) else None
+
+        return [
+            {
+                "task_id": self.conversation_ids[i],
+                "task_name": self.names[i],
+                "task_state": self.states[i],
+                "metadata": self.metadata[i],
+                "errored_actions": summary["errored_actions"][i],
+                "total_cost": round(summary["total_cost"][i], 1),
+                "start_timestamp": render(summary["start"][i]),
+                "end_timestamp": render(summary["end"][i]),
+                "duration_minutes": int(summary["runtime_minutes"][i]),
+            }
+            for i in range(len(self.conversation_ids))
+        ]
+
+    def aggregates(self, percents=(50, 90, 99)) -> dict:
+        summary = self.per_conversation()
+        costs = sorted(summary["total_cost"])
+        runtimes = sorted(summary["runtime_minutes"])
+        total_cost = math.fsum(costs)
+        return {
+            "total_credits": int(total_cost),
+            "total_conversations": len(costs),
+            "total_actions": len(self.action_cost),
+            "errored_actions": sum(self.action_errored),
+            "median": round(percentile(costs, 50), 2) if costs else None,
+            "average": round(total_cost / len(costs), 2) if costs else None,
+            "cost_percentiles": {p: round(percentile(costs, p), 2) for p in percents} if costs else {},
+            "runtime_minutes_percentiles": {p: round(percentile(runtimes, p), 2) for p in percents} if runtimes else {},
+            "task_states": Counter(self.states),
+        }
+
+    def group_by(self, key:str="state") -> dict:
+        """ Conversation count, total and mean cost and errored actions per state, or per value of a custom metadata title """
+        summary = self.per_conversation()
+        labels = self.states if key == "state" else [metadata_value(metadata, key) for metadata in self.metadata]
+        groups = defaultdict(lambda: {"conversations": 0, "total_cost": 0.0, "errored_actions": 0})
+        for label, cost, errored in zip(labels, summary["total_cost"], summary["errored_actions"]):
+            group = groups[label]
+            group["conversations"] += 1
+            group["total_cost"] += cost
+            group["errored_actions"] += errored
+        for group in groups.values():
+            group["mean_cost"] = round(group["total_cost"] / group["conversations"], 2)
+            group["total_cost"] = round(group["total_cost"], 2)
+        return dict(groups)
+
+    def time_series(self, bucket_seconds:int=86400) -> list:
+        """ Cost, action and error totals per time bucket (epoch start of bucket), in time order """
+        buckets = defaultdict(lambda: [0.0, 0, 0])
+        for timestamp, cost, errored in zip(self.action_timestamp, self.action_cost, self.action_errored):
+            if timestamp != timestamp:
+                continue
+            bucket = buckets[timestamp - timestamp % bucket_seconds]
+            bucket[0] += cost
+            bucket[1] += 1
+            bucket[2] += errored
+        return [
+            {"bucket_start": start, "total_cost": round(cost, 2), "actions": actions, "errored_actions": errored}
+            for start, (cost, actions, errored) in sorted(buckets.items())
+        ]
@@ -0,0 +1,143 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Callable, Optional
+
+from aiworkforce.types import ConversationState
+
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+# Errored conversations are left out: retriggering them rewrites their history
+DEFAULT_TERMINAL_STATES = (
+    ConversationState.COMPLETED,
+    ConversationState.CANCELLED,
+)
+
+
+def cache_key(endpoint:str, params:dict) -> str:
+    return hashlib.sha256(json.dumps([endpoint, params], sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """ SQLite-backed response cache. Entries for terminal conversations are kept until evicted,
+    everything else expires after ttl seconds. Least recently used entries are evicted past max_bytes """
+
+    def __init__(self, path:str, ttl:float=DEFAULT_TTL, max_bytes:int=DEFAULT_MAX_BYTES, terminal_states=DEFAULT_TERMINAL_STATES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.terminal_states = terminal_states
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, endpoint TEXT, value TEXT, size INTEGER, expires REAL, accessed REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self.size = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def is_terminal(self, conversation_state:Optional[str]) -> bool:
+        return conversation_state in self.terminal_states
+
+    def get(self, key:str):
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT value, expires, size FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, expires, size = row
+            if expires is not None and expires < now:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.size -= size
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(value)
+
+    def put(self, key:str, endpoint:str, value, permanent:bool=False):
+        now = time.time()
+        encoded = json.dumps(value)
+        size = len(encoded)
+        with self.lock:
+            previous = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, value, size, expires, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, endpoint, encoded, size, None if permanent else now + self.ttl, now)
+            )
+            self.size += size - (previous[0] if previous else 0)
+            self.writes += 1
+            self._evict()
+
+    def _evict(self):
+        while self.size > self.max_bytes:
+            rows = self.conn.execute("SELECT key, size FROM responses ORDER BY accessed LIMIT 100").fetchall()
+            if not rows:
+                break
+            self.conn.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key, _ in rows])
+            self.size -= sum(size for _, size in rows)
+            self.evictions += len(rows)
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+            self.size = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "bytes": self.size,
+        }
+
+    def close(self):
+        self.conn.close()
+
+
+_cache = None
+
+
+def use_cache(cache:Optional[ResponseCache]) -> Optional[ResponseCache]:
+    """ Enable caching for the history functions (get_list_conversation_studio_history,
+    get_conversation_actions, get_tool_run_history). Pass None to disable it again """
+    global _cache
+    _cache = cache
+    return cache
+
+
+def get_cache() -> Optional[ResponseCache]:
+    return _cache
+
+
+def cached_call(endpoint:str, params:dict, fetch:Callable, conversation_state:Optional[str]=None, transform:Optional[Callable]=None):
+    """ Returns the cached response for endpoint+params if there is one, otherwise fetches and stores it.
+    fetch returns the requests.Response; its json (passed through transform, if given) is returned, but
+    only stored when the status is 200, so error bodies are never cached """
+    cache = _cache
+    key = None
+    if cache is not None:
+        key = cache_key(endpoint, params)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    response = fetch()
+    result = response.json()
+    if transform is not None:
+        result = transform(result)
+    if cache is not None and response.status_code == 200:
+        cache.put(key, endpoint, result, permanent=cache.is_terminal(conversation_state))
+    return result
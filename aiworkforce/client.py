@@ -0,0 +1,149 @@
+import time
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from aiworkforce.instrumentation import call_event, emit_call, has_call_hooks
+from aiworkforce.ratelimit import RateLimiter, RetryPolicy, endpoint_family
+
+
+DEFAULT_POOL_SIZE = 10
+
+
+class RelevanceClient:
+    """ Region/project/key bound once, with a pooled keep-alive session shared by every call.
+    Requests are paced by a per-endpoint-family rate limiter and retried on 429/5xx per the retry policy.
+    Each call, retries included, is reported once to the hooks in aiworkforce.instrumentation """
+
+    def __init__(self, region_id:str, project_id:str, api_key:str, pool_size:int=DEFAULT_POOL_SIZE, base_url:Optional[str]=None, timeout:Optional[float]=None, rate_limiter:Optional[RateLimiter]=None, retry_policy:Optional[RetryPolicy]=None, adapter:Optional[HTTPAdapter]=None):
+        """ Pass the same adapter (and rate_limiter) to several clients to share one connection pool (and one
+        budget) between them, e.g. every project in a region. The API key is sent per request, so pooled
+        connections are safe to share """
+        self.region_id = region_id
+        self.project_id = project_id
+        self.api_key = api_key
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.base_url = (base_url or f"https://api-{region_id}.stack.tryrelevance.com/latest").rstrip("/")
+
+        self.session = requests.Session()
+        adapter = adapter or HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Authorization": f"{project_id}:{api_key}"})
+
+    @property
+    def key(self):
+        return (self.region_id, self.project_id, self.api_key)
+
+    def url(self, path:str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method:str, path:str, **kwargs) -> requests.Response:
+        if self.timeout is not None:
+            kwargs.setdefault("timeout", self.timeout)
+        family = endpoint_family(path)
+        attempt = 0
+        response = error = None
+        start_time = time.time()
+        start = time.perf_counter()
+        try:
+            while True:
+                self.rate_limiter.acquire(family)
+                try:
+                    response = self.session.request(method, self.url(path), **kwargs)
+                except (requests.ConnectionError, requests.Timeout):
+                    if not self.retry_policy.should_retry(family, attempt, None):
+                        raise
+                    time.sleep(self.retry_policy.delay(attempt))
+                    attempt += 1
+                    continue
+
+                if response.status_code == 429:
+                    self.rate_limiter.on_throttle(family)
+                elif response.status_code < 500:
+                    self.rate_limiter.on_success(family)
+                if response.status_code not in self.retry_policy.retry_statuses or not self.retry_policy.should_retry(family, attempt, response.status_code):
+                    return response
+                time.sleep(self.retry_policy.delay(attempt, response.headers.get("Retry-After")))
+                attempt += 1
+        except BaseException as e:
+            error = e
+            response = None
+            raise
+        finally:
+            if has_call_hooks():
+                emit_call(call_event(method, path, self.region_id, self.project_id, response, error, start_time, time.perf_counter() - start, attempt))
+
+    def get(self, path:str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path:str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(region_id:str, project_id:str, api_key:str) -> RelevanceClient:
+    """ Returns the registered client for these credentials, creating a default one on first use """
+    key = (region_id, project_id, api_key)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = RelevanceClient(region_id, project_id, api_key)
+                _clients[key] = client
+    return client
+
+
+def use_client(client:RelevanceClient) -> RelevanceClient:
+    """ Register a client so module functions called with the same region/project/key route through it """
+    previous = replace_client(client)
+    if previous is not None and previous is not client:
+        previous.close()
+    return client
+
+
+def replace_client(client:RelevanceClient) -> Optional[RelevanceClient]:
+    """ Registers client like use_client, but leaves the client it replaces open and returns it (None if
+    there was none), so restore_client can put it back """
+    with _clients_lock:
+        previous = _clients.get(client.key)
+        _clients[client.key] = client
+    return previous
+
+
+def restore_client(client:RelevanceClient, previous:Optional[RelevanceClient]):
+    """ Undoes replace_client: if client is still the registered one, previous is registered again
+    (or the credentials unregistered if previous is None). client itself is not closed """
+    with _clients_lock:
+        if _clients.get(client.key) is not client:
+            return
+        if previous is None:
+            del _clients[client.key]
+        else:
+            _clients[client.key] = previous
+
+
+def close_clients():
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
@@ -1,47 +1,91 @@
-import requests
+import sys
 import json
-from datetime import datetime, timedelta
+import time
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
 
-import pytz
+from aiworkforce.cache import cached_call
+from aiworkforce.client import get_client
+from aiworkforce.pagination import DEFAULT_PAGE_SIZE, iter_records
+from aiworkforce.query import Query, date_range, event, exact, is_in, numeric
+from aiworkforce.types import EventType, ComparisonType
+from aiworkforce.utils import conversation_id_of, parse_platform_timestamp
 
-from aiworkforce.types import EventType, FilterType, ComparisonType
+
+def agent_conversations_query(agent_id:str) -> Query:
+    """ The agent's non-debug conversations, most recently updated first. Extend it to narrow the listing further """
+    return (
+        Query()
+        .where(
+            exact("conversation.is_debug_mode_task", True, negate=True),
+            exact("conversation.agent_id", agent_id),
+        )
+        .sort("update_datetime")
+    )
 
 
 def get_conversations(region_id:str, project_id:str, agent_id:str, api_key:str):
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/agents/conversations/list"
+    client = get_client(region_id, project_id, api_key)
+    path = "/agents/conversations/list"
     api_params = {
         "include_agent_details": "true",
         "include_debug_info": "false",
-        "filters": json.dumps(
-            [
-                {
-                    "field": "conversation.is_debug_mode_task",
-                    "filter_type": FilterType.EXACT_MATCH,
-                    "condition": "!=",
-                    "condition_value": True,
-                },
-                {
-                    "filter_type": FilterType.EXACT_MATCH,
-                    "field": "conversation.agent_id",
-                    "condition_value": agent_id,
-                    "condition": "==",
-                },
-            ]
-        ),
-        "sort": json.dumps([{"update_datetime": "desc"}]),
-        "page_size": 500000,
+        **agent_conversations_query(agent_id).to_params(page_size=500000),
     }
     
-    response = requests.get(path, headers=headers, params=json.dumps(api_params))
+    response = client.get(path, params=json.dumps(api_params))
     return response.json()
 
 
-def get_list_conversation_studio_history(region_id:str, project_id:str, api_key:str, agent_id:str, conversation_id:str, page_size:int=500000, page:int=1):
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/agents/conversations/studios/list"
+def query_conversations(region_id:str, project_id:str, api_key:str, query:Query, page_size:int=DEFAULT_PAGE_SIZE, prefetch:bool=False, include_agent_details:bool=True):
+    """ Lazily yields the conversations matching query, filtered server side, one page at a time """
+    client = get_client(region_id, project_id, api_key)
+
+    def fetch_page(page, cursor):
+        params = {
+            "include_agent_details": "true" if include_agent_details else "false",
+            "include_debug_info": "false",
+            **query.to_params(page_size=page_size, page=page),
+        }
+        if cursor:
+            params["cursor"] = cursor
+        return client.get("/agents/conversations/list", params=params).json()
+
+    return iter_records(fetch_page, page_size, prefetch)
+
+
+def iter_conversations(region_id:str, project_id:str, agent_id:str, api_key:str, page_size:int=DEFAULT_PAGE_SIZE, prefetch:bool=False, query:Optional[Query]=None):
+    """ Lazily yields the agent's conversations, most recently updated first, one page at a time.
+    query adds further conditions, e.g. Query().where(is_in("conversation.state", states)) """
+    return query_conversations(region_id, project_id, api_key, agent_conversations_query(agent_id).extend(query), page_size, prefetch)
+
+
+def get_conversation_states(region_id:str, project_id:str, agent_id:str, conversation_ids:list, api_key:str, updated_since:Optional[datetime]=None, page_size:int=DEFAULT_PAGE_SIZE) -> dict:
+    """ Current ConversationState of each of the given conversations that the listing returns. Filters only on
+    fields the list endpoint is known to support (agent id, update_datetime) and matches ids client side, so pass
+    updated_since (e.g. just before the conversations were triggered) to keep the scan short. Ids missing from the
+    result were not found """
+    wanted = set(conversation_ids)
+    if not wanted:
+        return {}
+    query = agent_conversations_query(agent_id)
+    if updated_since is not None:
+        query.where(numeric("update_datetime", ">=", updated_since))
+    states = {}
+    for conversation in query_conversations(region_id, project_id, api_key, query, page_size, include_agent_details=False):
+        conversation_id = conversation_id_of(conversation)
+        if conversation_id in wanted:
+            states[conversation_id] = conversation.get('metadata', {}).get('conversation', {}).get('state', '')
+            if len(states) == len(wanted):
+                break
+    return states
+
+
+def get_list_conversation_studio_history(region_id:str, project_id:str, api_key:str, agent_id:str, conversation_id:str, page_size:int=500000, page:int=1, conversation_state:str=None):
+    """ conversation_state lets an active ResponseCache keep the history of finished conversations permanently """
+    client = get_client(region_id, project_id, api_key)
+    path = "/agents/conversations/studios/list"
     
     params = {
         "agent_id": agent_id,
@@ -50,26 +94,32 @@ def get_list_conversation_studio_history(region_id:str, project_id:str, api_key:
         "page": page
     }
 
-    response = requests.get(path, headers=headers, params=params)
-    return response.json()
+    def fetch():
+        return client.get(path, params=params)
+
+    return cached_call(path, {"region_id": region_id, "project_id": project_id, **params}, fetch, conversation_state)
 
 
-def get_conversation_actions(region_id:str, project_id:str, agent_id:str, conversation_id:str, api_key:str):
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/agents/{agent_id}/tasks/{conversation_id}/view?full_history=true"
+def get_conversation_actions(region_id:str, project_id:str, agent_id:str, conversation_id:str, api_key:str, conversation_state:str=None):
+    """ conversation_state lets an active ResponseCache keep the actions of finished conversations permanently """
+    client = get_client(region_id, project_id, api_key)
+    path = f"/agents/{agent_id}/tasks/{conversation_id}/view?full_history=true"
     body = {}
-    response = requests.post(path, data=json.dumps(body), headers=headers)
-    result = response.json()
-    if 'results' in result:
-        result['results'] = sorted(result['results'], key=lambda x: x.get('insert_date_', ''), reverse=False)
-    return result
+
+    def fetch():
+        return client.post(path, data=json.dumps(body))
+
+    def sort_results(result):
+        if 'results' in result:
+            result['results'] = sorted(result['results'], key=lambda x: x.get('insert_date_', ''), reverse=False)
+        return result
+
+    return cached_call(path, {"region_id": region_id, "project_id": project_id}, fetch, conversation_state, sort_results)
 
 
 def retrigger_conversation_after_message(project_id:str, region_id:str, agent_id:str, conversation_id:str, message_id:str, api_key:str):
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/agents/trigger"
+    client = get_client(region_id, project_id, api_key)
+    path = "/agents/trigger"
 
     payload = {
         "action": "regenerate",
@@ -78,14 +128,13 @@ def retrigger_conversation_after_message(project_id:str, region_id:str, agent_id
         "conversation_id": conversation_id,
     }
 
-    response = requests.post(path, headers=headers, json=payload)
+    response = client.post(path, json=payload)
     return response.json()
 
 def trigger_agent_debug_conversation(region_id: str, project_id: str, agent_id: str, trigger_message: str, debug_mode_config: dict, api_key: str) -> dict:
     """Trigger conversation in debug mode """
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/agents/trigger"
+    client = get_client(region_id, project_id, api_key)
+    path = "/agents/trigger"
     payload = {
         "agent_id": agent_id,
         "message": {
@@ -102,15 +151,14 @@ def trigger_agent_debug_conversation(region_id: str, project_id: str, agent_id:
     #         "title_prompt": "",
     #         "system_prompt": ""
     #     }
-    response = requests.post(path, headers=headers, json=payload)
+    response = client.post(path, json=payload)
     return response.json()
 
 def get_trigger_message(region_id:str, project_id:str, agent_id:str, conversation_id:str, api_key:str):
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/agents/{agent_id}/tasks/{conversation_id}/trigger_message"
+    client = get_client(region_id, project_id, api_key)
+    path = f"/agents/{agent_id}/tasks/{conversation_id}/trigger_message"
     
-    response = requests.get(path, headers=headers)
+    response = client.get(path)
     trigger_message_data = response.json().get("trigger_message")
     
     if trigger_message_data and trigger_message_data.get("content", {}).get("is_trigger_message", False):
@@ -125,73 +173,145 @@ def get_trigger_message(region_id:str, project_id:str, agent_id:str, conversatio
 
 def get_conversations_where_specific_tool_failed(region_id:str, project_id:str, agent_id:str, tool_id:str, api_key:str):
     """ Variation of get_conversations with advanced filters """
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/agents/conversations/list"
-    api_params = {
-        "page_size": 50000,
-        "filters": json.dumps([{
-            "condition": "==",
-            "case_insensitive": False,
-            "field": "agent_id",
-            "filter_type": FilterType.EXACT_MATCH,
-            "condition_value": agent_id
-        }]),
-        "event_logs_filters": json.dumps([{
-            "event_value": tool_id,
-            "event_type": EventType.TOOL_RUNS_FAILED,
-            "min_count": 1,
-            "max_count": 10,
-            "comparison_type": ComparisonType.GTE
-        }])
-    }
-    response = requests.get(path, headers=headers, params=api_params)
+    client = get_client(region_id, project_id, api_key)
+    path = "/agents/conversations/list"
+    query = (
+        Query()
+        .where(exact("agent_id", agent_id, case_insensitive=False))
+        .where_event(event(EventType.TOOL_RUNS_FAILED, tool_id, min_count=1, max_count=10, comparison_type=ComparisonType.GTE))
+    )
+    response = client.get(path, params=query.to_params(page_size=50000))
     return response.json()
 
 
+def conversations_between_dates_query(agent_id:str, from_dt=None, to_dt=None) -> Query:
+    """ The agent's non-debug conversations updated from from_dt up to the end of to_dt's day, most recent first """
+    return (
+        Query()
+        .where(
+            exact("conversation.is_debug_mode_task", True, negate=True),
+            is_in("conversation.agent_id", [agent_id]),
+        )
+        # has to be in these exact formats
+        .where(date_range("update_datetime", from_dt, to_dt + timedelta(days=1) if to_dt else None))
+        .sort("update_datetime")
+    )
+
+
 def get_conversations_between_dates(region_id, project_id, agent_id, api_key, from_dt=None, to_dt=None):
     """ Variation of get_conversations with advanced filters """
-    headers = {"Authorization": f"{project_id}:{api_key}", "Content-Type": "application/json"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/agents/conversations/list"
-
-    filters = [
-        {
-            "field": "conversation.is_debug_mode_task",
-            "filter_type": "exact_match",
-            "condition": "!=",
-            "condition_value": True
-        },
-        {
-            "filter_type": "exact_match",
-            "field": "conversation.agent_id",
-            "condition_value": [agent_id],
-            "condition": "=="
-        }
-    ]
-    # has to be in these exact formats
-    if from_dt:
-        filters.append({
-            "filter_type": "numeric",
-            "field": "update_datetime",
-            "condition": ">=",
-            "condition_value": from_dt.astimezone(pytz.timezone('UTC')).strftime("%Y-%m-%dT%H:%M:%S.000Z")
-        })
-    if to_dt:
-        filters.append({
-            "filter_type": "numeric",
-            "field": "update_datetime",
-            "condition": "<",
-            "condition_value": (to_dt + timedelta(days=1)).astimezone(pytz.timezone('UTC')).strftime("%Y-%m-%dT%H:%M:%S.000Z")
-        })
-  
+    client = get_client(region_id, project_id, api_key)
+    path = "/agents/conversations/list"
+
+    query = conversations_between_dates_query(agent_id, from_dt, to_dt)
     params = {
         "include_agent_details": "false",
         "include_debug_info": "false",
-        "filters": json.dumps(filters),
-        "sort": json.dumps([{"update_datetime": "desc"}]),
-        "page_size": 500000
+        **query.to_params(page_size=500000),
     }
     
-    response = requests.get(path, params=params, headers=headers)
+    response = client.get(path, params=params, headers={"Content-Type": "application/json"})
     return response.json()
+
+
+class ConversationWatcher:
+    """ Polls an agent's conversations updated since the last poll and calls the registered callbacks once per
+    state change, so each poll costs in proportion to recent activity rather than the whole history.
+
+    Only conversation id -> state is kept between polls. The high-water mark is the latest update_datetime seen,
+    kept as epoch seconds so timestamps in any ISO format compare correctly. Each poll re-reads overlap_seconds
+    before it, to catch updates indexed late, and the state index drops the repeats. Starting without `since`
+    watches from now on. A conversation seen for the first time is reported with previous_state None """
+
+    def __init__(self, region_id:str, project_id:str, agent_id:str, api_key:str, poll_interval:float=30, since:Optional[datetime]=None, overlap_seconds:float=5, page_size:int=DEFAULT_PAGE_SIZE):
+        self.region_id = region_id
+        self.project_id = project_id
+        self.agent_id = agent_id
+        self.api_key = api_key
+        self.poll_interval = poll_interval
+        self.overlap_seconds = overlap_seconds
+        self.page_size = page_size
+        self.high_water = (since or datetime.now(timezone.utc)).timestamp()
+        self.states = {}
+        self.polls = 0
+        self.poll_errors = 0
+        self.fetched = 0
+        self.callback_errors = 0
+        self._callbacks = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def on_transition(self, callback:Callable[[dict], None], to_states=None) -> Callable[[dict], None]:
+        """ callback(event) for every state change, or only for changes into one of to_states. An event is
+        {"conversation_id", "previous_state", "state", "update_datetime", "conversation"} """
+        self._callbacks.append((callback, set(to_states) if to_states else None))
+        return callback
+
+    def _query(self) -> Query:
+        since = datetime.fromtimestamp(self.high_water - self.overlap_seconds, timezone.utc)
+        return agent_conversations_query(self.agent_id).where(numeric("update_datetime", ">=", since))
+
+    def _emit(self, event:dict):
+        for callback, to_states in self._callbacks:
+            if to_states is not None and event["state"] not in to_states:
+                continue
+            try:
+                callback(event)
+            except Exception:
+                self.callback_errors += 1
+
+    def poll(self) -> list:
+        """ One incremental poll. Returns the transition events it emitted """
+        events = []
+        high_water = self.high_water
+        for conversation in query_conversations(self.region_id, self.project_id, self.api_key, self._query(), self.page_size, include_agent_details=False):
+            self.fetched += 1
+            conversation_id = conversation_id_of(conversation)
+            state = conversation.get('metadata', {}).get('conversation', {}).get('state')
+            update_datetime = conversation.get('update_datetime', conversation.get('update_date_'))
+            updated = parse_platform_timestamp(update_datetime)
+            if updated > high_water:
+                high_water = updated
+            previous_state = self.states.get(conversation_id)
+            if state == previous_state:
+                continue
+            self.states[conversation_id] = sys.intern(state) if isinstance(state, str) else state
+            event = {
+                "conversation_id": conversation_id,
+                "previous_state": previous_state,
+                "state": state,
+                "update_datetime": update_datetime,
+                "conversation": conversation,
+            }
+            events.append(event)
+            self._emit(event)
+        self.high_water = high_water
+        self.polls += 1
+        return events
+
+    def run(self, max_polls:Optional[int]=None):
+        """ Polls every poll_interval seconds until stop(), or until max_polls attempts, failed ones included.
+        A failed poll is retried on the next tick """
+        attempts = 0
+        while not self._stop.is_set():
+            attempts += 1
+            try:
+                self.poll()
+            except Exception:
+                self.poll_errors += 1
+            if max_polls is not None and attempts >= max_polls:
+                return
+            self._stop.wait(self.poll_interval)
+
+    def start(self) -> "ConversationWatcher":
+        """ Runs the watcher on a background thread """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True, name=f"conversation-watcher-{self.agent_id}")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
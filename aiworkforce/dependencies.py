@@ -0,0 +1,92 @@
+""" Project-wide agent -> tool dependency map built from concurrent agents/tools/list requests """
+import math
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from aiworkforce.agent import get_many_agents_tool_metadata, iter_agents
+
+
+DEFAULT_MAX_BATCH_SIZE = 100
+DEFAULT_CONCURRENCY = 8
+
+
+def tool_id_of(tool:dict) -> Optional[str]:
+    return tool.get('studio_id', tool.get('chain_id', tool.get('tool_id')))
+
+
+def _agents_of(tool:dict) -> List[str]:
+    if tool.get('agent_ids'):
+        return list(tool['agent_ids'])
+    return [tool['agent_id']] if tool.get('agent_id') else []
+
+
+def batch_size_for(count:int, concurrency:int=DEFAULT_CONCURRENCY, max_batch_size:int=DEFAULT_MAX_BATCH_SIZE) -> int:
+    """ Fewest batches that still give every worker one, capped at max_batch_size ids per request """
+    return max(1, min(max_batch_size, math.ceil(count / max(concurrency, 1))))
+
+
+class AgentToolIndex:
+    """ agent id -> tool metadata, and tool id -> ids of the agents using it """
+
+    def __init__(self):
+        self.agent_tools: Dict[str, List[dict]] = {}
+        self.tool_agents: Dict[str, List[str]] = defaultdict(list)
+
+    def add(self, agent_id:str, tools:List[dict]):
+        self.agent_tools[agent_id] = tools
+        for tool in tools:
+            tool_id = tool_id_of(tool)
+            if tool_id is not None and agent_id not in self.tool_agents[tool_id]:
+                self.tool_agents[tool_id].append(agent_id)
+
+    def tools_for(self, agent_id:str) -> List[dict]:
+        return self.agent_tools.get(agent_id, [])
+
+    def agents_for(self, tool_id:str) -> List[str]:
+        return self.tool_agents.get(tool_id, [])
+
+    def unused_tools(self, tool_ids:Iterable[str]) -> List[str]:
+        """ Those of tool_ids no indexed agent uses """
+        return [tool_id for tool_id in tool_ids if tool_id not in self.tool_agents]
+
+    def to_dict(self) -> dict:
+        return {
+            "agent_tools": {agent_id: [tool_id_of(tool) for tool in tools] for agent_id, tools in self.agent_tools.items()},
+            "tool_agents": dict(self.tool_agents),
+        }
+
+
+def _fetch_batch(agent_ids:List[str], region_id:str, project_id:str, api_key:str) -> Dict[str, List[dict]]:
+    """ Tools per agent for one batch. Results of a multi-agent request that don't say which agent they
+    belong to can't be attributed, so that batch falls back to one request per agent """
+    results = get_many_agents_tool_metadata(agent_ids, region_id, project_id, api_key)
+    if len(agent_ids) == 1:
+        return {agent_ids[0]: results}
+    if any(not _agents_of(tool) for tool in results):
+        return {agent_id: get_many_agents_tool_metadata([agent_id], region_id, project_id, api_key) for agent_id in agent_ids}
+    tools = {agent_id: [] for agent_id in agent_ids}
+    for tool in results:
+        for agent_id in _agents_of(tool):
+            if agent_id in tools:
+                tools[agent_id].append(tool)
+    return tools
+
+
+def build_agent_tool_index(region_id:str, project_id:str, api_key:str, agent_ids:Optional[Iterable[str]]=None, concurrency:int=DEFAULT_CONCURRENCY, max_batch_size:int=DEFAULT_MAX_BATCH_SIZE, batched:bool=False) -> AgentToolIndex:
+    """ Fetches the tools of agent_ids (every agent in the project if None), concurrency requests at a time.
+    agents/tools/list isn't documented to say which agent each returned tool belongs to, so by default every
+    agent gets its own request. batched=True sends up to max_batch_size agents per request, for deployments whose
+    results carry agent_id/agent_ids; a batch whose results don't is fetched again one agent at a time """
+    if agent_ids is None:
+        agent_ids = [agent['agent_id'] for agent in iter_agents(region_id, project_id, api_key)]
+    agent_ids = list(dict.fromkeys(agent_ids))
+    size = batch_size_for(len(agent_ids), concurrency, max_batch_size) if batched else 1
+    batches = [agent_ids[i:i + size] for i in range(0, len(agent_ids), size)]
+
+    index = AgentToolIndex()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for tools in executor.map(lambda batch: _fetch_batch(batch, region_id, project_id, api_key), batches):
+            for agent_id, agent_tools in tools.items():
+                index.add(agent_id, agent_tools)
+    return index
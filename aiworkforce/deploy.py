@@ -0,0 +1,235 @@
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from aiworkforce.agent import iter_agents, upsert_agent_response
+from aiworkforce.tool import bulk_update_tools_response, iter_tools
+from aiworkforce.utils import get_object_id, object_hash, remove_objects_changing_fields, update_objects_metadata
+
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_TOOL_BATCH_SIZE = 50
+
+
+def normalized_hash(obj:dict, project_id:str) -> str:
+    """ Hash of an object after the same normalization the local files go through, without mutating it """
+    obj = copy.deepcopy(obj)
+    return object_hash(update_objects_metadata(remove_objects_changing_fields([obj]), project_id)[0])
+
+
+def diff_objects(local_objects:list, remote_objects, project_id:str) -> dict:
+    """ Splits local objects into create/update/unchanged against what is currently deployed """
+    remote_hashes = {get_object_id(obj): normalized_hash(obj, project_id) for obj in remote_objects}
+    diff = {"create": [], "update": [], "unchanged": []}
+    for obj in local_objects:
+        remote_hash = remote_hashes.get(get_object_id(obj))
+        if remote_hash is None:
+            diff["create"].append(obj)
+        elif remote_hash != normalized_hash(obj, project_id):
+            diff["update"].append(obj)
+        else:
+            diff["unchanged"].append(obj)
+    return diff
+
+
+def plan_deployment(local_agents:list, local_tools:list, region_id:str, project_id:str, api_key:str) -> dict:
+    return {
+        "agents": diff_objects(local_agents, iter_agents(region_id, project_id, api_key), project_id),
+        "tools": diff_objects(local_tools, iter_tools(region_id, project_id, api_key), project_id),
+    }
+
+
+def format_plan(plan:dict) -> str:
+    lines = []
+    for object_type in ("agents", "tools"):
+        diff = plan[object_type]
+        lines.append(f"{object_type}: {len(diff['create'])} to create, {len(diff['update'])} to update, {len(diff['unchanged'])} unchanged")
+        for action in ("create", "update"):
+            for obj in diff[action]:
+                lines.append(f"  {action:<6} {get_object_id(obj)}  {obj.get('name', obj.get('title', ''))}")
+    for number, wave in enumerate(plan.get("waves", [])):
+        lines.append(f"wave {number}: " + ", ".join(f"{step['type']}/{step['id']}" for step in wave))
+    return "\n".join(lines)
+
+
+class DeploymentError(Exception):
+    pass
+
+
+def _checked(response) -> dict:
+    if response.status_code >= 400:
+        raise DeploymentError(f"{response.url} returned {response.status_code}: {response.text[:500]}")
+    return response.json()
+
+
+def _push_agent(agent:dict, region_id:str, project_id:str, api_key:str) -> dict:
+    """ create_agent, raising DeploymentError on a failed upsert """
+    return _checked(upsert_agent_response(agent, region_id, project_id, api_key))
+
+
+def _push_tools(tools:list, region_id:str, project_id:str, api_key:str, partial_update:bool=True) -> dict:
+    """ create_tools, raising DeploymentError on a failed bulk update """
+    return _checked(bulk_update_tools_response(tools, region_id, project_id, api_key, partial_update=partial_update))
+
+
+def _timed(fn, *args, **kwargs) -> dict:
+    """ {"status": "deployed", "response"} or {"status": "failed", "error"}, with the seconds taken """
+    start = time.perf_counter()
+    try:
+        outcome = {"status": "deployed", "response": fn(*args, **kwargs)}
+    except Exception as e:
+        outcome = {"status": "failed", "error": repr(e)}
+    return {**outcome, "seconds": round(time.perf_counter() - start, 3)}
+
+
+def execute_deployment(plan:dict, region_id:str, project_id:str, api_key:str, max_workers:int=DEFAULT_MAX_WORKERS, tool_batch_size:int=DEFAULT_TOOL_BATCH_SIZE) -> list:
+    """ Pushes only created/updated objects. Agents are upserted concurrently, tools in bulk_update batches.
+    Returns one record per pushed object, with status "deployed" or "failed" (and the error); a failed tool
+    batch marks every tool in it failed """
+    timings = []
+    agents = plan["agents"]["create"] + plan["agents"]["update"]
+    tools = plan["tools"]["create"] + plan["tools"]["update"]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            get_object_id(agent): executor.submit(_timed, _push_agent, agent, region_id, project_id, api_key)
+            for agent in agents
+        }
+        batches = [tools[i:i + tool_batch_size] for i in range(0, len(tools), tool_batch_size)]
+        batch_futures = [executor.submit(_timed, _push_tools, batch, region_id, project_id, api_key) for batch in batches]
+
+        for agent_id, future in futures.items():
+            timings.append({"type": "agents", "id": agent_id, **future.result()})
+        for batch_number, (batch, future) in enumerate(zip(batches, batch_futures)):
+            outcome = future.result()
+            for tool in batch:
+                timings.append({"type": "tools", "id": get_object_id(tool), "batch": batch_number, **outcome})
+
+    return timings
+
+
+def agent_dependencies(agent:dict) -> list:
+    """ (type, id) of the tools and sub-agents an agent's actions reference """
+    dependencies = []
+    for action in agent.get('actions') or []:
+        if action.get('chain_id'):
+            dependencies.append(("tools", action['chain_id']))
+        elif action.get('agent_id'):
+            dependencies.append(("agents", action['agent_id']))
+    return dependencies
+
+
+def build_dependency_graph(agents:list, tools:list) -> dict:
+    """ (type, id) -> set of the (type, id) it depends on, limited to objects present in agents/tools """
+    graph = {("tools", get_object_id(tool)): set() for tool in tools}
+    graph.update({("agents", get_object_id(agent)): set() for agent in agents})
+    for agent in agents:
+        node = ("agents", get_object_id(agent))
+        graph[node] = {dependency for dependency in agent_dependencies(agent) if dependency in graph and dependency != node}
+    return graph
+
+
+def topological_waves(graph:dict) -> list:
+    """ Groups nodes so every node comes in a later wave than everything it depends on.
+    Nodes on a dependency cycle can't be ordered and share a final wave """
+    remaining = {node: set(dependencies) for node, dependencies in graph.items()}
+    waves = []
+    while remaining:
+        wave = sorted(node for node, dependencies in remaining.items() if not dependencies)
+        if not wave:
+            waves.append(sorted(remaining))
+            break
+        waves.append(wave)
+        for node in wave:
+            del remaining[node]
+        for dependencies in remaining.values():
+            dependencies.difference_update(wave)
+    return waves
+
+
+def plan_graph_deployment(local_agents:list, local_tools:list, region_id:str, project_id:str, api_key:str) -> dict:
+    """ plan_deployment plus the changed objects ordered into dependency waves, and a snapshot of the
+    currently deployed version of every object about to be updated, for rollback """
+    remote = {
+        "agents": {get_object_id(obj): obj for obj in iter_agents(region_id, project_id, api_key)},
+        "tools": {get_object_id(obj): obj for obj in iter_tools(region_id, project_id, api_key)},
+    }
+    plan = {
+        "agents": diff_objects(local_agents, list(remote["agents"].values()), project_id),
+        "tools": diff_objects(local_tools, list(remote["tools"].values()), project_id),
+    }
+
+    changed = {}
+    for object_type in ("agents", "tools"):
+        for action in ("create", "update"):
+            for obj in plan[object_type][action]:
+                changed[(object_type, get_object_id(obj))] = {"type": object_type, "id": get_object_id(obj), "action": action, "object": obj}
+
+    # Waves come from the whole local graph, so a changed agent still waits for a changed tool it reaches through unchanged agents
+    plan["waves"] = [
+        [changed[node] for node in wave if node in changed]
+        for wave in topological_waves(build_dependency_graph(local_agents, local_tools))
+    ]
+    plan["waves"] = [wave for wave in plan["waves"] if wave]
+    plan["snapshot"] = {
+        (step["type"], step["id"]): remote[step["type"]][step["id"]]
+        for wave in plan["waves"] for step in wave if step["action"] == "update"
+    }
+    return plan
+
+
+def _deploy_wave(executor:ThreadPoolExecutor, steps:list, region_id:str, project_id:str, api_key:str, tool_batch_size:int, partial_update:bool=True) -> list:
+    """ Pushes one wave concurrently. Returns the errors, empty if every push succeeded.
+    Tools are partially updated unless partial_update is off; agents are always replaced whole """
+    tools = [step["object"] for step in steps if step["type"] == "tools"]
+    futures = [executor.submit(_push_agent, step["object"], region_id, project_id, api_key) for step in steps if step["type"] == "agents"]
+    futures += [executor.submit(_push_tools, tools[i:i + tool_batch_size], region_id, project_id, api_key, partial_update) for i in range(0, len(tools), tool_batch_size)]
+    errors = []
+    for future in futures:
+        try:
+            future.result()
+        except Exception as e:
+            errors.append(repr(e))
+    return errors
+
+
+def _rollback_wave(executor:ThreadPoolExecutor, steps:list, snapshot:dict, region_id:str, project_id:str, api_key:str, tool_batch_size:int) -> list:
+    """ Re-upserts the snapshot of every updated object in the wave, replacing it whole so fields added by the
+    failed version don't survive. Created objects have no prior version and are left as is """
+    restore = [
+        {**step, "object": remove_objects_changing_fields([copy.deepcopy(snapshot[(step["type"], step["id"])])])[0]}
+        for step in steps if step["action"] == "update"
+    ]
+    return _deploy_wave(executor, restore, region_id, project_id, api_key, tool_batch_size, partial_update=False)
+
+
+def execute_graph_deployment(plan:dict, region_id:str, project_id:str, api_key:str, max_workers:int=DEFAULT_MAX_WORKERS, tool_batch_size:int=DEFAULT_TOOL_BATCH_SIZE, rollback:bool=True) -> list:
+    """ Deploys plan_graph_deployment's waves in order, each wave's agents and tool batches concurrently.
+    If anything in a wave fails, that wave is rolled back to the snapshot (when rollback is set) and the
+    later waves are skipped; earlier waves stay deployed, since nothing in them depends on the failed one.
+    Returns one record per wave """
+    results = []
+    failed = False
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for number, steps in enumerate(plan["waves"]):
+            record = {"wave": number, "objects": [f"{step['type']}/{step['id']}" for step in steps]}
+            if failed:
+                results.append({**record, "status": "skipped"})
+                continue
+            start = time.perf_counter()
+            errors = _deploy_wave(executor, steps, region_id, project_id, api_key, tool_batch_size)
+            record["seconds"] = round(time.perf_counter() - start, 3)
+            if not errors:
+                results.append({**record, "status": "deployed"})
+                continue
+            failed = True
+            record["errors"] = errors
+            if rollback:
+                rollback_errors = _rollback_wave(executor, steps, plan["snapshot"], region_id, project_id, api_key, tool_batch_size)
+                record["status"] = "rollback_failed" if rollback_errors else "rolled_back"
+                if rollback_errors:
+                    record["rollback_errors"] = rollback_errors
+            else:
+                record["status"] = "failed"
+            results.append(record)
+    return results
@@ -0,0 +1,224 @@
+""" Streams conversations, studio run history and tool run history into Parquet files partitioned by agent
+and day (hive style: {root}/{dataset}/agent_id=.../day=.../part-{run}-N.parquet). Conversations go by the day they
+were last updated, the order they are listed in, so only a partition or two is open at a time; run histories by
+insert day. Rows are buffered per partition and written as row groups, so memory stays flat however large the
+project is. Requires pyarrow """
+import os
+import json
+import uuid
+import shutil
+import itertools
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Optional
+
+from aiworkforce.conversation import iter_conversations, get_list_conversation_studio_history
+from aiworkforce.tool import iter_tool_runs
+from aiworkforce.utils import conversation_id_of, parse_platform_timestamp
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = pq = ds = None
+
+
+DEFAULT_ROW_GROUP_SIZE = 10000
+DEFAULT_MAX_OPEN_PARTITIONS = 64
+UNKNOWN_PARTITION = "unknown"
+# What to do with a partition that already holds part files from an earlier export
+EXISTING_DATA_BEHAVIORS = ("error", "delete_matching", "append")
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Columnar export needs pyarrow: pip install pyarrow")
+
+
+def _json(value):
+    return None if value is None else json.dumps(value)
+
+
+def _day(value:Optional[str]) -> str:
+    epoch = parse_platform_timestamp(value)
+    if epoch != epoch:
+        return UNKNOWN_PARTITION
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%d")
+
+
+def _conversation(record:dict) -> dict:
+    return record.get('metadata', {}).get('conversation', {})
+
+
+# name -> (pyarrow type factory name, extractor) per dataset
+CONVERSATION_COLUMNS = {
+    "conversation_id": ("string", conversation_id_of),
+    "title": ("string", lambda r: _conversation(r).get('title')),
+    "state": ("string", lambda r: _conversation(r).get('state')),
+    "insert_datetime": ("string", lambda r: r.get('insert_datetime', r.get('insert_date_'))),
+    "update_datetime": ("string", lambda r: r.get('update_datetime', r.get('update_date_'))),
+    "custom_metadata": ("string", lambda r: _json(_conversation(r).get('custom_metadata'))),
+}
+
+STUDIO_HISTORY_COLUMNS = {
+    "conversation_id": ("string", lambda r: r.get('conversation_id')),
+    "studio_id": ("string", lambda r: r.get('studio_id')),
+    "insert_date_": ("string", lambda r: r.get('insert_date_')),
+    "cost": ("float64", lambda r: r.get('cost')),
+    "errored": ("bool_", lambda r: bool(r.get('errors'))),
+    "errors": ("string", lambda r: _json(r.get('errors') or None)),
+}
+
+TOOL_RUN_COLUMNS = {
+    "studio_id": ("string", lambda r: r.get('studio_id')),
+    "job_id": ("string", lambda r: r.get('job_id', r.get('_id'))),
+    "conversation_id": ("string", lambda r: r.get('conversation_id')),
+    "insert_date_": ("string", lambda r: r.get('insert_date_')),
+    "status": ("string", lambda r: r.get('status')),
+    "cost": ("float64", lambda r: r.get('cost')),
+    "errored": ("bool_", lambda r: bool(r.get('errors'))),
+}
+
+
+class PartitionedParquetWriter:
+    """ Buffers projected rows per (agent_id, day) partition and appends them as row groups.
+    At most max_buffered_rows are held across partitions (the largest buffer is flushed first) and at most
+    max_open_partitions files are open; a partition written to again after its file was closed gets a new part file.
+    Part files are named after this run, so they never collide with earlier ones. existing_data decides what
+    happens when a partition already has part files: "error" raises FileExistsError (rerunning an export would
+    otherwise duplicate its rows), "delete_matching" deletes them first, "append" keeps them """
+
+    def __init__(self, root:str, dataset:str, columns:Dict[str, tuple], row_group_size:int=DEFAULT_ROW_GROUP_SIZE, include_raw:bool=False, max_buffered_rows:Optional[int]=None, max_open_partitions:int=DEFAULT_MAX_OPEN_PARTITIONS, existing_data:str="error"):
+        _require_pyarrow()
+        if existing_data not in EXISTING_DATA_BEHAVIORS:
+            raise ValueError(f"existing_data must be one of {EXISTING_DATA_BEHAVIORS}, not {existing_data!r}")
+        self.path = f"{root}/{dataset}"
+        self.existing_data = existing_data
+        self.run_id = uuid.uuid4().hex[:12]
+        self._part_numbers = itertools.count()
+        self._opened_partitions = set()
+        self.columns = dict(columns)
+        if include_raw:
+            self.columns["raw"] = ("string", _json)
+        self.schema = pa.schema([(name, getattr(pa, type_name)()) for name, (type_name, _) in self.columns.items()])
+        self.row_group_size = row_group_size
+        self.max_buffered_rows = max_buffered_rows or 4 * row_group_size
+        self.max_open_partitions = max_open_partitions
+        self.buffers = {}
+        self.buffered_rows = 0
+        self.writers = OrderedDict()
+        self.rows_written = 0
+
+    def write(self, record:dict, agent_id:Optional[str], timestamp:Optional[str]):
+        partition = (agent_id or UNKNOWN_PARTITION, _day(timestamp))
+        buffer = self.buffers.setdefault(partition, {name: [] for name in self.columns})
+        for name, (_, extract) in self.columns.items():
+            buffer[name].append(extract(record))
+        self.buffered_rows += 1
+        if len(next(iter(buffer.values()))) >= self.row_group_size:
+            self._flush(partition)
+        elif self.buffered_rows > self.max_buffered_rows:
+            self._flush(max(self.buffers, key=lambda key: len(next(iter(self.buffers[key].values())))))
+
+    def _writer(self, partition:tuple):
+        writer = self.writers.get(partition)
+        if writer is not None:
+            self.writers.move_to_end(partition)
+            return writer
+        if len(self.writers) >= self.max_open_partitions:
+            _, oldest = self.writers.popitem(last=False)
+            oldest.close()
+        agent_id, day = partition
+        directory = f"{self.path}/agent_id={agent_id}/day={day}"
+        if partition not in self._opened_partitions:
+            self._prepare_partition(directory)
+            self._opened_partitions.add(partition)
+        os.makedirs(directory, exist_ok=True)
+        writer = pq.ParquetWriter(f"{directory}/part-{self.run_id}-{next(self._part_numbers)}.parquet", self.schema)
+        self.writers[partition] = writer
+        return writer
+
+    def _prepare_partition(self, directory:str):
+        """ Applies existing_data the first time this run writes to a partition """
+        if self.existing_data == "append" or not os.path.isdir(directory):
+            return
+        if not any(file.endswith(".parquet") for file in os.listdir(directory)):
+            return
+        if self.existing_data == "error":
+            raise FileExistsError(f"{directory} already holds exported data; pass existing_data='delete_matching' to replace it or 'append' to keep it")
+        shutil.rmtree(directory)
+
+    def _flush(self, partition:tuple):
+        buffer = self.buffers.pop(partition, None)
+        if not buffer:
+            return
+        table = pa.Table.from_pydict(buffer, schema=self.schema)
+        self._writer(partition).write_table(table)
+        self.buffered_rows -= table.num_rows
+        self.rows_written += table.num_rows
+
+    def close(self):
+        for partition in list(self.buffers):
+            self._flush(partition)
+        for writer in self.writers.values():
+            writer.close()
+        self.writers.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_records(records:Iterable[dict], root:str, dataset:str, columns:Dict[str, tuple], agent_id:Callable[[dict], Optional[str]], timestamp:Callable[[dict], Optional[str]], row_group_size:int=DEFAULT_ROW_GROUP_SIZE, include_raw:bool=False, existing_data:str="error") -> int:
+    with PartitionedParquetWriter(root, dataset, columns, row_group_size, include_raw, existing_data=existing_data) as writer:
+        for record in records:
+            writer.write(record, agent_id(record), timestamp(record))
+    return writer.rows_written
+
+
+def export_conversations(region_id:str, project_id:str, agent_id:str, api_key:str, root:str, with_studio_history:bool=True, row_group_size:int=DEFAULT_ROW_GROUP_SIZE, include_raw:bool=False, existing_data:str="error") -> dict:
+    """ Streams an agent's conversations, and optionally each one's studio run history, into root """
+    counts = {"conversations": 0, "studio_history": 0}
+    with PartitionedParquetWriter(root, "conversations", CONVERSATION_COLUMNS, row_group_size, include_raw, existing_data=existing_data) as conversations, \
+         PartitionedParquetWriter(root, "studio_history", STUDIO_HISTORY_COLUMNS, row_group_size, include_raw, existing_data=existing_data) as histories:
+        for conversation in iter_conversations(region_id, project_id, agent_id, api_key, prefetch=True):
+            # iter_conversations lists by update_datetime, so partitioning on it keeps consecutive rows together
+            conversations.write(conversation, agent_id, conversation.get('update_datetime', conversation.get('update_date_')))
+            counts["conversations"] += 1
+            if not with_studio_history:
+                continue
+            conversation_id = conversation_id_of(conversation)
+            results = get_list_conversation_studio_history(region_id, project_id, api_key, agent_id, conversation_id, conversation_state=_conversation(conversation).get('state'))
+            for result in results.get('results', []) if isinstance(results, dict) else results:
+                result.setdefault('conversation_id', conversation_id)
+                histories.write(result, agent_id, result.get('insert_date_'))
+                counts["studio_history"] += 1
+    return counts
+
+
+def export_tool_runs(tool_id:str, region_id:str, project_id:str, api_key:str, root:str, row_group_size:int=DEFAULT_ROW_GROUP_SIZE, include_raw:bool=False, existing_data:str="error") -> int:
+    return export_records(
+        iter_tool_runs(tool_id, region_id, project_id, api_key, prefetch=True),
+        root,
+        "tool_runs",
+        TOOL_RUN_COLUMNS,
+        agent_id=lambda r: r.get('agent_id') or r.get('agent_details', {}).get('agent_id'),
+        timestamp=lambda r: r.get('insert_date_'),
+        row_group_size=row_group_size,
+        include_raw=include_raw,
+        existing_data=existing_data,
+    )
+
+
+def open_dataset(root:str, dataset:str):
+    """ Lazy pyarrow dataset over an export; filter on agent_id/day to prune partitions before reading """
+    _require_pyarrow()
+    return ds.dataset(f"{root}/{dataset}", format="parquet", partitioning="hive")
+
+
+def iter_batches(root:str, dataset:str, columns:Optional[list]=None, filter=None, batch_size:int=DEFAULT_ROW_GROUP_SIZE):
+    """ Yields record batches of an export without loading it whole """
+    yield from open_dataset(root, dataset).to_batches(columns=columns, filter=filter, batch_size=batch_size)
@@ -0,0 +1,181 @@
+""" Runs operations across many projects, possibly in several regions, at once.
+
+Each region gets its own worker pool, connection pool and rate limiter, shared by all of its projects, so a
+busy or slow region doesn't hold up the others and many projects in one region don't multiply the request
+rate against it. Results come back as one list of rows tagged with _region_id, _project_id and _project_name;
+failures are collected in Fleet.errors instead of aborting the run """
+import json
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional
+
+from requests.adapters import HTTPAdapter
+
+from aiworkforce.agent import get_all_agents, get_agent_analytics
+from aiworkforce.analytics import ConversationCostTable
+from aiworkforce.client import RelevanceClient, replace_client, restore_client
+from aiworkforce.conversation import conversations_between_dates_query, get_list_conversation_studio_history, query_conversations
+from aiworkforce.pagination import PaginationError
+from aiworkforce.ratelimit import DEFAULT_BURST, DEFAULT_RATE, RateLimiter, RetryPolicy
+from aiworkforce.tool import get_all_tools
+from aiworkforce.utils import conversation_id_of
+
+
+DEFAULT_REGION_CONCURRENCY = 8
+DEFAULT_REGION_POOL_SIZE = 16
+
+
+@dataclass(frozen=True)
+class ProjectCredentials:
+    region_id: str
+    project_id: str
+    api_key: str
+    name: Optional[str] = None
+
+    def tags(self) -> dict:
+        return {"_region_id": self.region_id, "_project_id": self.project_id, "_project_name": self.name or self.project_id}
+
+
+def _studio_history(c:ProjectCredentials, agent_id:str, conversation:dict) -> list:
+    """ A conversation's studio runs. The history call returns the error body on failure, so a response
+    without results raises rather than reading as a conversation that cost nothing """
+    history = get_list_conversation_studio_history(
+        c.region_id, c.project_id, c.api_key, agent_id, conversation_id_of(conversation),
+        conversation_state=conversation.get('metadata', {}).get('conversation', {}).get('state'),
+    )
+    if not isinstance(history, dict) or "results" not in history:
+        raise PaginationError(f"Studio history response has no results: {str(history)[:500]}")
+    return history["results"]
+
+
+def load_fleet_credentials(filepath:str) -> List[ProjectCredentials]:
+    """ Reads a JSON list of {"region_id", "project_id", "api_key", "name"} objects """
+    with open(filepath, "r") as f:
+        return [ProjectCredentials(**entry) for entry in json.load(f)]
+
+
+class Fleet:
+    """ A set of project credentials with per-region concurrency (region_concurrency workers), connection pools
+    (pool_size connections) and rate limits (region_rate requests per second per endpoint family) """
+
+    def __init__(self, credentials:Iterable[ProjectCredentials], region_concurrency:int=DEFAULT_REGION_CONCURRENCY, region_rate:float=DEFAULT_RATE, region_burst:int=DEFAULT_BURST, pool_size:int=DEFAULT_REGION_POOL_SIZE, retry_policy:Optional[RetryPolicy]=None, base_urls:Optional[dict]=None):
+        self.credentials = list(credentials)
+        self.errors = []
+        self._errors_lock = threading.Lock()
+        self._executors = {}
+        self._adapters = {}
+        self.rate_limiters = {}
+        self._clients = []
+
+        for credentials in self.credentials:
+            region_id = credentials.region_id
+            if region_id not in self._executors:
+                self._executors[region_id] = ThreadPoolExecutor(max_workers=region_concurrency, thread_name_prefix=f"fleet-{region_id}")
+                self._adapters[region_id] = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+                self.rate_limiters[region_id] = RateLimiter(rate=region_rate, burst=region_burst)
+            client = RelevanceClient(
+                region_id,
+                credentials.project_id,
+                credentials.api_key,
+                pool_size=pool_size,
+                base_url=(base_urls or {}).get(region_id),
+                rate_limiter=self.rate_limiters[region_id],
+                retry_policy=retry_policy,
+                adapter=self._adapters[region_id],
+            )
+            self._clients.append((client, replace_client(client)))
+
+    @property
+    def regions(self) -> list:
+        return list(self._executors)
+
+    def _record_error(self, credentials:ProjectCredentials, operation:str, error:Exception, **context):
+        with self._errors_lock:
+            self.errors.append({**credentials.tags(), "operation": operation, "error": repr(error), **context})
+
+    def map(self, operation:str, fn:Callable, tasks:Iterable[tuple]) -> list:
+        """ Calls fn(credentials, *args) for every (credentials, *args) task on its region's pool.
+        Returns (task, result) pairs in task order, leaving out failed tasks (see errors) """
+        submitted = [(task, self._executors[task[0].region_id].submit(fn, *task)) for task in tasks]
+        results = []
+        for task, future in submitted:
+            try:
+                results.append((task, future.result()))
+            except Exception as e:
+                self._record_error(task[0], operation, e, args=[repr(arg) for arg in task[1:]])
+        return results
+
+    def run(self, fn:Callable[[ProjectCredentials], object], operation:Optional[str]=None) -> list:
+        """ fn(credentials) once per project; returns {**tags, "result": ...} rows """
+        return [{**task[0].tags(), "result": result} for task, result in self.map(operation or getattr(fn, "__name__", "run"), fn, [(c,) for c in self.credentials])]
+
+    def _records(self, operation:str, fn:Callable[[ProjectCredentials], list]) -> list:
+        return [{**record, **task[0].tags()} for task, records in self.map(operation, fn, [(c,) for c in self.credentials]) for record in records]
+
+    def agents(self) -> list:
+        return self._records("get_all_agents", lambda c: get_all_agents(c.region_id, c.project_id, c.api_key))
+
+    def tools(self) -> list:
+        return self._records("get_all_tools", lambda c: get_all_tools(c.region_id, c.project_id, c.api_key))
+
+    def agent_analytics(self, from_date:Optional[str]=None, to_date:Optional[str]=None, agents:Optional[list]=None) -> list:
+        """ get_agent_analytics for every agent (from agents(), or the given tagged agent rows), one row per agent """
+        agents = self.agents() if agents is None else agents
+        by_project = {(c.region_id, c.project_id): c for c in self.credentials}
+        tasks = [(by_project[(agent["_region_id"], agent["_project_id"])], agent["agent_id"]) for agent in agents]
+        results = self.map(
+            "get_agent_analytics",
+            lambda c, agent_id: get_agent_analytics(c.region_id, c.project_id, agent_id, c.api_key, from_date, to_date),
+            tasks,
+        )
+        return [{**c.tags(), "agent_id": agent_id, "analytics": analytics} for (c, agent_id), analytics in results]
+
+    def conversation_costs(self, from_dt=None, to_dt=None, agents:Optional[list]=None) -> list:
+        """ Cost rollup (ConversationCostTable.aggregates) per agent across the fleet. Conversations of every
+        agent are listed first, then all studio histories are fetched as one flat fan-out """
+        agents = self.agents() if agents is None else agents
+        by_project = {(c.region_id, c.project_id): c for c in self.credentials}
+        agent_tasks = [(by_project[(agent["_region_id"], agent["_project_id"])], agent["agent_id"]) for agent in agents]
+        # Paged listing raises on an error response, so a failed listing lands in errors instead of reading as 0 conversations
+        listings = self.map(
+            "get_conversations_between_dates",
+            lambda c, agent_id: list(query_conversations(c.region_id, c.project_id, c.api_key, conversations_between_dates_query(agent_id, from_dt, to_dt), include_agent_details=False)),
+            agent_tasks,
+        )
+
+        history_tasks = [
+            (c, agent_id, conversation)
+            for (c, agent_id), conversations in listings
+            for conversation in conversations
+        ]
+        histories = self.map("get_list_conversation_studio_history", _studio_history, history_tasks)
+
+        tables = defaultdict(ConversationCostTable)
+        for (c, agent_id, conversation), history in histories:
+            tables[(c, agent_id)].add_conversation(conversation, history)
+        rows = []
+        for (c, agent_id), _ in listings:
+            aggregates = tables[(c, agent_id)].aggregates() if (c, agent_id) in tables else {"total_conversations": 0}
+            if "task_states" in aggregates:
+                aggregates["task_states"] = dict(aggregates["task_states"])
+            rows.append({**c.tags(), "agent_id": agent_id, **aggregates})
+        return rows
+
+    def close(self):
+        """ Waits for running tasks, re-registers the clients the fleet replaced and closes its own """
+        for executor in self._executors.values():
+            executor.shutdown(wait=True)
+        for client, previous in reversed(self._clients):
+            restore_client(client, previous)
+            client.close()
+        self._clients.clear()
+        for adapter in self._adapters.values():
+            adapter.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
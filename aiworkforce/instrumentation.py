@@ -0,0 +1,265 @@
+""" Per-call instrumentation for RelevanceClient.
+
+Every request made through a client emits one CallEvent (after its retries) to the registered hooks.
+CallStats aggregates them in memory and prints a per-endpoint latency histogram; OpenTelemetryHook turns them
+into spans and a duration histogram when opentelemetry-api is installed. Hooks must be cheap and thread safe:
+they run on the calling thread, and an exception raised by a hook is swallowed """
+import re
+import sys
+import atexit
+import threading
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from aiworkforce.utils import percentile
+
+try:
+    from opentelemetry import trace as otel_trace
+    from opentelemetry import metrics as otel_metrics
+except ImportError:
+    otel_trace = otel_metrics = None
+
+
+# Upper bounds in seconds; the last bucket holds everything slower
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_ID_SEGMENT = re.compile(r"^(?=.*\d)[0-9A-Za-z_-]{8,}$")
+# Segments followed by an id (/agents/{id}, /studios/{id}/async_poll/{id}, /knowledge/sets/{id}), and the fixed
+# routes that can take the id's place after them (/agents/list, /studios/bulk_update, /knowledge/sets/list)
+_ID_PARENTS = frozenset(("agents", "studios", "tasks", "sets", "async_poll"))
+_ROUTES = frozenset(("analytics", "bulk_delete", "bulk_update", "conversations", "delete", "list", "run_history", "tools", "trigger", "upsert"))
+
+
+def _is_id(previous:str, segment:str) -> bool:
+    if previous in _ID_PARENTS:
+        return segment not in _ROUTES
+    return bool(_ID_SEGMENT.match(segment))
+
+
+def endpoint_name(path:str) -> str:
+    """ Path with the query string dropped and ids replaced, so calls group per endpoint:
+    /agents/1f0e.../tasks/9a7c.../view?full_history=true -> /agents/{id}/tasks/{id}/view. Ids are recognised by
+    position, so names such as my-tool collapse too; elsewhere long segments containing a digit count as ids """
+    segments = path.split("?", 1)[0].strip("/").split("/")
+    return "/" + "/".join("{id}" if _is_id(previous, segment) else segment for previous, segment in zip([""] + segments, segments))
+
+
+@dataclass(slots=True)
+class CallEvent:
+    method: str
+    endpoint: str
+    path: str
+    region_id: str
+    project_id: str
+    status: Optional[int]  # None when the call raised
+    latency: float  # seconds, including retries and rate limiter waits
+    start_time: float  # epoch seconds
+    request_bytes: int
+    response_bytes: int
+    retries: int
+    error: Optional[str] = None  # exception class name
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None or (self.status is not None and self.status >= 400)
+
+
+_hooks: List[Callable[[CallEvent], None]] = []
+
+
+def add_call_hook(hook:Callable[[CallEvent], None]) -> Callable[[CallEvent], None]:
+    _hooks.append(hook)
+    return hook
+
+
+def remove_call_hook(hook:Callable[[CallEvent], None]):
+    if hook in _hooks:
+        _hooks.remove(hook)
+
+
+def has_call_hooks() -> bool:
+    return bool(_hooks)
+
+
+def emit_call(event:CallEvent):
+    for hook in list(_hooks):
+        try:
+            hook(event)
+        except Exception:
+            pass
+
+
+def _body_size(body) -> int:
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    try:
+        return len(body)
+    except TypeError:
+        return 0
+
+
+def call_event(method:str, path:str, region_id:str, project_id:str, response, error:Optional[BaseException], start_time:float, latency:float, retries:int) -> CallEvent:
+    """ Builds the event for a finished call from its final response (None if it raised) """
+    return CallEvent(
+        method=method,
+        endpoint=endpoint_name(path),
+        path=path,
+        region_id=region_id,
+        project_id=project_id,
+        status=response.status_code if response is not None else None,
+        latency=latency,
+        start_time=start_time,
+        request_bytes=_body_size(response.request.body) if response is not None and response.request is not None else 0,
+        response_bytes=len(response.content) if response is not None else 0,
+        retries=retries,
+        error=type(error).__name__ if error is not None else None,
+    )
+
+
+class _EndpointStats:
+    __slots__ = ("calls", "failures", "retries", "request_bytes", "response_bytes", "latencies", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.latencies = array("d")
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+
+def _duration(seconds:float) -> str:
+    return f"{seconds * 1000:.0f}ms" if seconds < 1 else f"{seconds:.2f}s"
+
+
+def _size(n:int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.0f}{unit}" if unit == "B" else f"{n:.1f}{unit}"
+        n /= 1024
+    return f"{n:.1f}GB"
+
+
+class CallStats:
+    """ In-memory per-endpoint aggregate of CallEvents: counts, failures, retries, bytes and latencies """
+
+    def __init__(self):
+        self.endpoints = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event:CallEvent):
+        key = (event.method, event.endpoint)
+        with self._lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = _EndpointStats()
+            stats.calls += 1
+            stats.failures += event.failed
+            stats.retries += event.retries
+            stats.request_bytes += event.request_bytes
+            stats.response_bytes += event.response_bytes
+            stats.latencies.append(event.latency)
+            stats.buckets[bisect_right(LATENCY_BUCKETS, event.latency)] += 1
+
+    def summary(self) -> list:
+        """ One dict per endpoint, the endpoints taking the most total time first """
+        with self._lock:
+            items = [(key, stats, sorted(stats.latencies)) for key, stats in self.endpoints.items()]
+        rows = []
+        for (method, endpoint), stats, latencies in items:
+            rows.append({
+                "method": method,
+                "endpoint": endpoint,
+                "calls": stats.calls,
+                "failures": stats.failures,
+                "retries": stats.retries,
+                "total_seconds": sum(latencies),
+                "p50": percentile(latencies, 50),
+                "p90": percentile(latencies, 90),
+                "p99": percentile(latencies, 99),
+                "max": latencies[-1] if latencies else None,
+                "request_bytes": stats.request_bytes,
+                "response_bytes": stats.response_bytes,
+                "histogram": list(stats.buckets),
+            })
+        return sorted(rows, key=lambda row: row["total_seconds"], reverse=True)
+
+    def report(self, width:int=40) -> str:
+        rows = self.summary()
+        if not rows:
+            return "No API calls recorded"
+        labels = [f"<{_duration(bound)}" for bound in LATENCY_BUCKETS] + [f">={_duration(LATENCY_BUCKETS[-1])}"]
+        lines = []
+        for row in rows:
+            lines.append(
+                f"{row['method']} {row['endpoint']}  calls {row['calls']}  failed {row['failures']}  retries {row['retries']}  "
+                f"total {_duration(row['total_seconds'])}  p50 {_duration(row['p50'])}  p90 {_duration(row['p90'])}  "
+                f"p99 {_duration(row['p99'])}  max {_duration(row['max'])}  sent {_size(row['request_bytes'])}  "
+                f"received {_size(row['response_bytes'])}"
+            )
+            peak = max(row["histogram"])
+            for label, count in zip(labels, row["histogram"]):
+                if count:
+                    lines.append(f"  {label:>8} {'#' * max(1, round(count / peak * width)):<{width}} {count}")
+        return "\n".join(lines)
+
+    def print_report(self, file=None):
+        print(self.report(), file=file or sys.stderr)
+
+    def reset(self):
+        with self._lock:
+            self.endpoints.clear()
+
+
+def enable_call_stats(print_at_exit:bool=True) -> CallStats:
+    """ Registers a CallStats hook, optionally printing its report to stderr when the process exits """
+    stats = add_call_hook(CallStats())
+    if print_at_exit:
+        atexit.register(stats.print_report)
+    return stats
+
+
+class OpenTelemetryHook:
+    """ Records each call as a client span (backdated to the call's start) and in an
+    aiworkforce.client.duration histogram. Uses the global tracer/meter providers unless given ones.
+    Requires opentelemetry-api, plus an SDK and exporter configured by the application """
+
+    def __init__(self, tracer_provider=None, meter_provider=None):
+        if otel_trace is None:
+            raise ImportError("OpenTelemetry export needs opentelemetry-api: pip install opentelemetry-api opentelemetry-sdk")
+        self.tracer = otel_trace.get_tracer("aiworkforce", tracer_provider=tracer_provider)
+        meter = otel_metrics.get_meter("aiworkforce", meter_provider=meter_provider)
+        self.duration = meter.create_histogram("aiworkforce.client.duration", unit="s", description="Relevance AI API call duration, including retries")
+
+    def __call__(self, event:CallEvent):
+        attributes = {
+            "http.request.method": event.method,
+            "url.path": event.path,
+            "aiworkforce.endpoint": event.endpoint,
+            "aiworkforce.region_id": event.region_id,
+            "aiworkforce.project_id": event.project_id,
+            "aiworkforce.retries": event.retries,
+            "http.request.body.size": event.request_bytes,
+            "http.response.body.size": event.response_bytes,
+        }
+        if event.status is not None:
+            attributes["http.response.status_code"] = event.status
+        if event.error is not None:
+            attributes["error.type"] = event.error
+
+        start_ns = int(event.start_time * 1e9)
+        span = self.tracer.start_span(f"{event.method} {event.endpoint}", kind=otel_trace.SpanKind.CLIENT, start_time=start_ns, attributes=attributes)
+        if event.failed:
+            span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR))
+        span.end(end_time=start_ns + int(event.latency * 1e9))
+
+        self.duration.record(event.latency, {
+            "http.request.method": event.method,
+            "aiworkforce.endpoint": event.endpoint,
+            "http.response.status_code": event.status or 0,
+        })
@@ -1,47 +1,83 @@
-import requests
 import json
 from dataclasses import dataclass, field
 from typing import Dict, List, Any
 import uuid
 
+from aiworkforce.client import get_client
+from aiworkforce.pagination import DEFAULT_PAGE_SIZE, iter_records
+from aiworkforce.query import is_in
+
 def get_all_knowledge(region_id, project_id, api_key):
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/knowledge/sets/list"
+    client = get_client(region_id, project_id, api_key)
+    path = "/knowledge/sets/list"
     body = {
         "filters": [],
         "sort": [{"update_date":"desc"}]
     }
-    response = requests.post(path, json=body, headers=headers)
+    response = client.post(path, json=body)
 
     return response.json().get("results", [])
 
 
 def get_knowledge(region_id:str, project_id:str, api_key:str, knowledge_set: str, max_results: int = 5000):
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/knowledge/list"
+    client = get_client(region_id, project_id, api_key)
+    path = "/knowledge/list"
     body = {
         "knowledge_set": knowledge_set,
         "page_size": max_results,
         "sort": [{"insert_date_": "desc"}]
     }
-    response = requests.post(path, data=json.dumps(body), headers=headers)
+    response = client.post(path, data=json.dumps(body))
     if response.status_code == 200:
         return response.json().get("results", [])
     return {"error": response.text}
 
 
+def iter_knowledge(region_id:str, project_id:str, api_key:str, knowledge_set: str, page_size: int = DEFAULT_PAGE_SIZE, prefetch: bool = False):
+    """ Lazily yields every row of a knowledge set, one page at a time """
+    client = get_client(region_id, project_id, api_key)
+
+    def fetch_page(page, cursor):
+        body = {
+            "knowledge_set": knowledge_set,
+            "page_size": page_size,
+            "page": page,
+            "sort": [{"insert_date_": "desc"}]
+        }
+        if cursor:
+            body["cursor"] = cursor
+        return client.post("/knowledge/list", json=body).json()
+
+    return iter_records(fetch_page, page_size, prefetch)
+
+
+def row_values(row:dict) -> dict:
+    """ The uploaded values of a row from the knowledge listing """
+    return row.get("data", row)
+
+
 def delete_knowledge(region_id:str, project_id:str, api_key:str, knowledge_set: str) -> bool:
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/knowledge/sets/delete"
+    client = get_client(region_id, project_id, api_key)
+    path = "/knowledge/sets/delete"
     body = {"knowledge_set": knowledge_set}
-    response = requests.post(path, json=body, headers=headers)
+    response = client.post(path, json=body)
 
     return response.status_code == 200
 
 
+def delete_knowledge_documents(region_id:str, project_id:str, api_key:str, knowledge_set: str, document_ids: List[str]) -> dict:
+    client = get_client(region_id, project_id, api_key)
+    path = "/knowledge/delete"
+    body = {
+        "knowledge_set": knowledge_set,
+        "filters": [is_in("document_id", document_ids)]
+    }
+    response = client.post(path, json=body)
+    if response.status_code == 200:
+        return response.json()
+    return {"error": response.text, "status_code": response.status_code}
+
+
 @dataclass
 class KnowledgeDocument:
     """Represents a document to be added to a knowledge store."""
@@ -51,30 +87,31 @@ class KnowledgeDocument:
 
 
 def add_knowledge_data(region_id: str, project_id: str, api_key: str, knowledge_id: str, records: List[Dict[str, Any]]) -> dict:
-    headers = {"Authorization": f"{project_id}:{api_key}", "Content-Type": "application/json"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/knowledge/add"
-    
     documents = [KnowledgeDocument(value=item) for item in records]
+    return add_knowledge_documents(region_id, project_id, api_key, knowledge_id, [doc.__dict__ for doc in documents])
+
+
+def add_knowledge_documents(region_id: str, project_id: str, api_key: str, knowledge_id: str, documents: List[Dict[str, Any]]) -> dict:
+    """ Like add_knowledge_data, for documents already shaped as {"value", "document_id", "type"} """
+    client = get_client(region_id, project_id, api_key)
+    path = "/knowledge/add"
     
     body = {
-        "data": [doc.__dict__ for doc in documents],
+        "data": documents,
         "knowledge_set": knowledge_id
     }
     
-    response = requests.post(path, json=body, headers=headers)
+    response = client.post(path, json=body)
     
     if response.status_code == 200:
         return response.json()
     return {"error": response.text, "status_code": response.status_code}
 
 
-
 def get_knowledge_metadata(region_id:str, project_id:str, api_key:str, knowledge_set: str):
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/knowledge/sets/{knowledge_set}/get_metadata"
-    response = requests.get(path, headers=headers)
+    client = get_client(region_id, project_id, api_key)
+    path = f"/knowledge/sets/{knowledge_set}/get_metadata"
+    response = client.get(path)
     if response.status_code == 200:
         return response.json()
     return {"error": response.text}
@@ -0,0 +1,167 @@
+import os
+import csv
+import json
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from aiworkforce.client import get_client
+from aiworkforce.knowledge import add_knowledge_documents
+from aiworkforce.utils import canonical_json
+
+
+DEFAULT_CHUNK_ROWS = 500
+DEFAULT_CHUNK_BYTES = 2 * 1024 ** 2
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 3
+# The client already retries 429/5xx and dropped connections; the loader only retries what it doesn't
+DEFAULT_RETRY_STATUSES = (408,)
+
+# uuid5 namespace for document ids derived from row content
+DOCUMENT_NAMESPACE = uuid.UUID("6f1c0a6e-4d7b-4a53-9c1e-2f0b8d9a7e11")
+
+
+def iter_records_from_file(filepath:str) -> Iterator[Dict[str, Any]]:
+    """ Streams rows from a .csv (one dict per row) or .jsonl file """
+    if filepath.endswith(".csv"):
+        with open(filepath, "r", newline="") as f:
+            yield from csv.DictReader(f)
+    elif filepath.endswith(".jsonl"):
+        with open(filepath, "r") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        raise ValueError(f"Unsupported knowledge file type: {filepath}")
+
+
+def document_id_for(record:Dict[str, Any], id_field:Optional[str]=None) -> str:
+    """ record[id_field] if given, otherwise a uuid derived from the row content, so re-uploading a row
+    (on retry or resume) overwrites it instead of duplicating it """
+    if id_field:
+        return str(record[id_field])
+    return str(uuid.uuid5(DOCUMENT_NAMESPACE, canonical_json(record)))
+
+
+def to_documents(records:Iterable[Dict[str, Any]], id_field:Optional[str]=None) -> Iterator[dict]:
+    for record in records:
+        yield {"value": record, "document_id": document_id_for(record, id_field), "type": "document"}
+
+
+def chunk_documents(documents:Iterable[dict], max_rows:int=DEFAULT_CHUNK_ROWS, max_bytes:int=DEFAULT_CHUNK_BYTES) -> Iterator[List[dict]]:
+    """ Groups knowledge/add documents into chunks, closing a chunk at max_rows or an estimated max_bytes of JSON """
+    chunk = []
+    chunk_bytes = 0
+    for document in documents:
+        size = len(json.dumps(document, ensure_ascii=False).encode("utf-8")) + 1
+        if chunk and (len(chunk) >= max_rows or chunk_bytes + size > max_bytes):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+        chunk.append(document)
+        chunk_bytes += size
+    if chunk:
+        yield chunk
+
+
+def _load_completed_chunks(checkpoint_path:Optional[str]) -> set:
+    completed = set()
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        with open(checkpoint_path, "r") as f:
+            for line in f:
+                if line.strip():
+                    completed.add(json.loads(line)["chunk"])
+    return completed
+
+
+class KnowledgeBulkLoader:
+    """ Uploads records to a knowledge set in chunks, several at once.
+
+    A chunk rejected as too large (413) is split in half and both halves are uploaded. 429/5xx responses are
+    retried by the client; on top of that a chunk failing with one of retry_statuses is retried on its own.
+    Completed chunk numbers are appended to checkpoint_path, and a rerun over the same input skips them.
+    Chunking must be deterministic for that, so feed the same records in the same order. failures lists each
+    failed chunk with the document_ids that were not uploaded """
+
+    def __init__(self, region_id:str, project_id:str, api_key:str, knowledge_id:str, max_rows:int=DEFAULT_CHUNK_ROWS, max_bytes:int=DEFAULT_CHUNK_BYTES, concurrency:int=DEFAULT_CONCURRENCY, max_retries:int=DEFAULT_MAX_RETRIES, checkpoint_path:Optional[str]=None, id_field:Optional[str]=None, retry_statuses=DEFAULT_RETRY_STATUSES):
+        self.region_id = region_id
+        self.project_id = project_id
+        self.api_key = api_key
+        self.knowledge_id = knowledge_id
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.checkpoint_path = checkpoint_path
+        self.id_field = id_field
+        client_retries = get_client(region_id, project_id, api_key).retry_policy.retry_statuses
+        self.retry_statuses = tuple(status for status in retry_statuses if status not in client_retries)
+
+        self.stats = {"rows": 0, "chunks": 0, "skipped_chunks": 0, "failed_chunks": 0, "retries": 0}
+        self.failures = []
+        self._lock = threading.Lock()
+
+    def _upload(self, documents:List[dict]) -> Optional[dict]:
+        """ Returns None on success, otherwise the last error response with the document_ids that were not uploaded """
+        for attempt in range(self.max_retries + 1):
+            result = add_knowledge_documents(self.region_id, self.project_id, self.api_key, self.knowledge_id, documents)
+            if "error" not in result:
+                return None
+            if result.get("status_code") == 413 and len(documents) > 1:
+                middle = len(documents) // 2
+                left = self._upload(documents[:middle])
+                right = self._upload(documents[middle:])
+                if left and right:
+                    return {**left, "document_ids": left["document_ids"] + right["document_ids"]}
+                return left or right
+            if result.get("status_code") not in self.retry_statuses:
+                break
+            if attempt < self.max_retries:
+                with self._lock:
+                    self.stats["retries"] += 1
+                time.sleep(min(30, 2 ** attempt))
+        return {**result, "document_ids": [document["document_id"] for document in documents]}
+
+    def _upload_chunk(self, number:int, documents:List[dict], slots:threading.BoundedSemaphore):
+        try:
+            error = self._upload(documents)
+        except Exception as e:
+            error = {"error": repr(e), "document_ids": [document["document_id"] for document in documents]}
+        finally:
+            slots.release()
+        with self._lock:
+            if error is None:
+                self.stats["rows"] += len(documents)
+                self.stats["chunks"] += 1
+                if self.checkpoint_path:
+                    with open(self.checkpoint_path, "a") as f:
+                        f.write(json.dumps({"chunk": number, "rows": len(documents)}) + "\n")
+            else:
+                # Part of a split chunk may have gone through; the whole chunk is uploaded again on resume
+                self.stats["rows"] += len(documents) - len(error["document_ids"])
+                self.stats["failed_chunks"] += 1
+                self.failures.append({"chunk": number, "rows": len(error["document_ids"]), **error})
+
+    def load(self, records:Iterable[Dict[str, Any]]) -> dict:
+        """ Uploads records (any iterable, read lazily) and returns row/chunk counts and rows per second """
+        return self.load_documents(to_documents(records, self.id_field))
+
+    def load_documents(self, documents:Iterable[dict]) -> dict:
+        """ Same as load, for documents already shaped as {"value", "document_id", "type"} """
+        completed = _load_completed_chunks(self.checkpoint_path)
+        slots = threading.BoundedSemaphore(self.concurrency * 2)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for number, chunk in enumerate(chunk_documents(documents, self.max_rows, self.max_bytes)):
+                if number in completed:
+                    self.stats["skipped_chunks"] += 1
+                    continue
+                slots.acquire()
+                executor.submit(self._upload_chunk, number, chunk, slots)
+        elapsed = time.perf_counter() - start
+        return {**self.stats, "elapsed_seconds": round(elapsed, 2), "rows_per_second": round(self.stats["rows"] / elapsed, 1) if elapsed else None}
+
+    def load_file(self, filepath:str) -> dict:
+        return self.load(iter_records_from_file(filepath))
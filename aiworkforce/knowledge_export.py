@@ -0,0 +1,71 @@
+""" Exports whole knowledge sets to JSONL or CSV files, paging through every row (unlike get_knowledge, which
+stops at max_results) and checking the row count against the set's metadata """
+import os
+import csv
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from aiworkforce.knowledge import get_all_knowledge, get_knowledge_metadata, iter_knowledge, row_values
+
+
+DEFAULT_EXPORT_PAGE_SIZE = 500
+DEFAULT_CONCURRENCY = 4
+
+
+def knowledge_row_count(metadata:dict) -> Optional[int]:
+    """ Row count from a get_knowledge_metadata response ({"metadata": {"count": n}}), None if it has none """
+    count = (metadata.get("metadata") or {}).get("count")
+    return count if isinstance(count, int) else None
+
+
+def export_knowledge(region_id:str, project_id:str, api_key:str, knowledge_set:str, filepath:str, page_size:int=DEFAULT_EXPORT_PAGE_SIZE, verify:bool=True) -> dict:
+    """ Pages through the whole knowledge set and writes it incrementally to .jsonl (full rows) or .csv
+    (document_id plus the row's data). For CSV the rows are staged as JSONL while the columns of every row are
+    collected, then converted, so a column first seen late in the set still gets a header. The file is only
+    moved into place once complete. With verify, the row count is checked against get_knowledge_metadata and
+    "verification" is "verified", "mismatch", or "unverified" when the metadata carries no count """
+    as_csv = filepath.endswith(".csv")
+    rows = 0
+    fieldnames = {"document_id": None}
+    tmp_path = f"{filepath}.tmp"
+    staged_path = f"{filepath}.rows.tmp" if as_csv else tmp_path
+    with open(staged_path, "w") as f:
+        for row in iter_knowledge(region_id, project_id, api_key, knowledge_set, page_size=page_size, prefetch=True):
+            if as_csv:
+                values = {"document_id": row.get("document_id"), **row_values(row)}
+                fieldnames.update(dict.fromkeys(values))
+                f.write(json.dumps(values) + "\n")
+            else:
+                f.write(json.dumps(row) + "\n")
+            rows += 1
+    if as_csv:
+        with open(staged_path, "r") as staged, open(tmp_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(fieldnames))
+            writer.writeheader()
+            for line in staged:
+                writer.writerow(json.loads(line))
+        os.remove(staged_path)
+    os.replace(tmp_path, filepath)
+
+    result = {"knowledge_set": knowledge_set, "filepath": filepath, "rows": rows}
+    if verify:
+        expected = knowledge_row_count(get_knowledge_metadata(region_id, project_id, api_key, knowledge_set))
+        result["expected_rows"] = expected
+        if expected is None:
+            result["verification"] = "unverified"
+        else:
+            result["verification"] = "verified" if expected == rows else "mismatch"
+    return result
+
+
+def export_all_knowledge(region_id:str, project_id:str, api_key:str, folderpath:str, file_format:str="jsonl", concurrency:int=DEFAULT_CONCURRENCY, verify:bool=True) -> list:
+    """ Exports every knowledge set from get_all_knowledge to {folderpath}/{knowledge_set}.{file_format}, several at once """
+    os.makedirs(folderpath, exist_ok=True)
+    knowledge_sets = [knowledge["knowledge_set"] for knowledge in get_all_knowledge(region_id, project_id, api_key)]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(export_knowledge, region_id, project_id, api_key, knowledge_set, f"{folderpath}/{knowledge_set}.{file_format}", verify=verify)
+            for knowledge_set in knowledge_sets
+        ]
+        return [future.result() for future in futures]
@@ -0,0 +1,106 @@
+""" Promotes knowledge sets between projects by shipping only the rows that differ.
+
+Both sides are read once and reduced to document_id -> content hash, so memory grows with the number of rows
+rather than their size. The source is then read a second time to pick up the added or changed rows, which are
+uploaded in chunks; rows missing from the source are deleted from the target in batches """
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from aiworkforce.knowledge import delete_knowledge_documents, get_all_knowledge, iter_knowledge, row_values
+from aiworkforce.knowledge_bulk import DEFAULT_CHUNK_ROWS, DEFAULT_CONCURRENCY, KnowledgeBulkLoader
+from aiworkforce.pagination import PaginationError
+from aiworkforce.utils import object_hash
+
+
+DEFAULT_DELETE_BATCH_SIZE = 500
+
+
+def knowledge_row_hashes(region_id:str, project_id:str, api_key:str, knowledge_set:str, page_size:int=DEFAULT_CHUNK_ROWS, missing_ok:bool=False) -> Dict[str, str]:
+    """ document_id -> hash of the row's data for every row of the knowledge set. With missing_ok, a set whose
+    first page is an error (as for a set that does not exist yet) counts as empty """
+    hashes = {}
+    try:
+        for row in iter_knowledge(region_id, project_id, api_key, knowledge_set, page_size=page_size, prefetch=True):
+            hashes[row.get("document_id")] = object_hash(row_values(row))
+    except PaginationError:
+        if not missing_ok or hashes:
+            raise
+    return hashes
+
+
+def diff_knowledge(source_hashes:Dict[str, str], target_hashes:Dict[str, str]) -> dict:
+    """ Document ids to add (only in source), update (content differs) and delete (only in target) """
+    diff = {"add": [], "update": [], "delete": [], "unchanged": 0}
+    for document_id, content_hash in source_hashes.items():
+        target_hash = target_hashes.get(document_id)
+        if target_hash is None:
+            diff["add"].append(document_id)
+        elif target_hash != content_hash:
+            diff["update"].append(document_id)
+        else:
+            diff["unchanged"] += 1
+    diff["delete"] = [document_id for document_id in target_hashes if document_id not in source_hashes]
+    return diff
+
+
+def _iter_documents(rows:Iterable[dict], document_ids:set):
+    for row in rows:
+        if row.get("document_id") in document_ids:
+            yield {"value": row_values(row), "document_id": row["document_id"], "type": "document"}
+
+
+def delete_knowledge_rows(region_id:str, project_id:str, api_key:str, knowledge_set:str, document_ids:List[str], batch_size:int=DEFAULT_DELETE_BATCH_SIZE) -> dict:
+    stats = {"deleted": 0, "failed": 0, "failures": []}
+    for start in range(0, len(document_ids), batch_size):
+        batch = document_ids[start:start + batch_size]
+        result = delete_knowledge_documents(region_id, project_id, api_key, knowledge_set, batch)
+        if isinstance(result, dict) and "error" in result:
+            stats["failed"] += len(batch)
+            stats["failures"].append({"rows": len(batch), **result})
+        else:
+            stats["deleted"] += len(batch)
+    return stats
+
+
+def sync_knowledge(source:tuple, target:tuple, knowledge_set:str, target_knowledge_set:Optional[str]=None, prune:bool=True, concurrency:int=DEFAULT_CONCURRENCY, delete_batch_size:int=DEFAULT_DELETE_BATCH_SIZE, dry_run:bool=False) -> dict:
+    """ Makes target's copy of knowledge_set match source's. source and target are (region_id, project_id, api_key).
+    Changed rows are re-added under their document_id, which overwrites them. Without prune, rows only in the
+    target are kept. A target without the set yet is treated as empty. added/updated/deleted count the rows that
+    went through, and failures lists the upload chunks and delete batches that did not.
+    With dry_run, only the planned counts are returned """
+    target_knowledge_set = target_knowledge_set or knowledge_set
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        source_future = executor.submit(knowledge_row_hashes, *source, knowledge_set)
+        target_future = executor.submit(knowledge_row_hashes, *target, target_knowledge_set, missing_ok=True)
+        diff = diff_knowledge(source_future.result(), target_future.result())
+
+    result = {
+        "knowledge_set": target_knowledge_set,
+        "added": len(diff["add"]),
+        "updated": len(diff["update"]),
+        "deleted": len(diff["delete"]) if prune else 0,
+        "unchanged": diff["unchanged"],
+    }
+    if dry_run:
+        return result
+
+    result["failures"] = []
+    changed = set(diff["add"]) | set(diff["update"])
+    if changed:
+        loader = KnowledgeBulkLoader(*target, target_knowledge_set, concurrency=concurrency)
+        result["upload"] = loader.load_documents(_iter_documents(iter_knowledge(*source, knowledge_set, page_size=DEFAULT_CHUNK_ROWS, prefetch=True), changed))
+        failed = {document_id for failure in loader.failures for document_id in failure["document_ids"]}
+        result["added"] = sum(1 for document_id in diff["add"] if document_id not in failed)
+        result["updated"] = sum(1 for document_id in diff["update"] if document_id not in failed)
+        result["failures"].extend(loader.failures)
+    if prune and diff["delete"]:
+        deletion = delete_knowledge_rows(*target, target_knowledge_set, diff["delete"], delete_batch_size)
+        result["deleted"] = deletion["deleted"]
+        result["failures"].extend(deletion["failures"])
+    return result
+
+
+def sync_all_knowledge(source:tuple, target:tuple, prune:bool=True, concurrency:int=DEFAULT_CONCURRENCY, dry_run:bool=False) -> list:
+    """ sync_knowledge for every knowledge set in the source project, one set at a time """
+    knowledge_sets = [knowledge["knowledge_set"] for knowledge in get_all_knowledge(*source)]
+    return [sync_knowledge(source, target, knowledge_set, prune=prune, concurrency=concurrency, dry_run=dry_run) for knowledge_set in knowledge_sets]
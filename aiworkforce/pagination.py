@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, Optional
+
+
+DEFAULT_PAGE_SIZE = 1000
+
+
+class PaginationError(Exception):
+    """ A list endpoint returned something other than a page of results, e.g. an error body """
+
+
+def _results(response:dict) -> list:
+    if not isinstance(response, dict) or "results" not in response:
+        raise PaginationError(f"List response has no results: {str(response)[:500]}")
+    return response["results"]
+
+
+def _next_page(response:dict, page:int, cursor:Optional[str], page_size:int):
+    results = _results(response)
+    if not results:
+        return None
+    next_cursor = response.get("cursor")
+    if next_cursor:
+        return None if next_cursor == cursor else (page + 1, next_cursor)
+    if len(results) < page_size:
+        return None
+    return (page + 1, None)
+
+
+def iter_pages(fetch_page:Callable[[int, Optional[str]], dict], page_size:int=DEFAULT_PAGE_SIZE, prefetch:bool=False) -> Iterator[list]:
+    """ Yields each page's results. fetch_page(page, cursor) returns the list endpoint's response json.
+    Follows the response cursor when the endpoint returns one, otherwise increments page until a short page.
+    With prefetch the next page is requested in the background while the caller works on the current one """
+    if not prefetch:
+        page, cursor = 1, None
+        while True:
+            response = fetch_page(page, cursor)
+            yield _results(response)
+            following = _next_page(response, page, cursor, page_size)
+            if following is None:
+                return
+            page, cursor = following
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        page, cursor = 1, None
+        future = executor.submit(fetch_page, page, cursor)
+        while future is not None:
+            response = future.result()
+            following = _next_page(response, page, cursor, page_size)
+            if following is None:
+                future = None
+            else:
+                page, cursor = following
+                future = executor.submit(fetch_page, page, cursor)
+            yield _results(response)
+
+
+def iter_records(fetch_page:Callable[[int, Optional[str]], dict], page_size:int=DEFAULT_PAGE_SIZE, prefetch:bool=False) -> Iterator[dict]:
+    for results in iter_pages(fetch_page, page_size, prefetch):
+        yield from results
@@ -0,0 +1,152 @@
+""" Composable filters for the list endpoints.
+
+Conditions are plain filter dicts in the shape the endpoints accept. A Query collects them together with
+event log filters, sort and projected fields, and serializes to GET params (JSON-encoded values) or a POST body:
+
+    query = (
+        Query()
+        .where(exact("conversation.agent_id", agent_id), is_in("conversation.state", states))
+        .where(*date_range("update_datetime", from_dt, to_dt))
+        .sort("update_datetime")
+    )
+    client.get("/agents/conversations/list", params=query.to_params(page_size=100))
+"""
+import json
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from aiworkforce.types import ComparisonType, FilterType
+from aiworkforce.utils import format_platform_timestamp
+
+
+def _value(value):
+    return format_platform_timestamp(value) if isinstance(value, datetime) else value
+
+
+def condition(field:str, filter_type:str, condition:str, condition_value, **options) -> dict:
+    """ A single filter. options are passed through, e.g. case_insensitive=False """
+    return {"field": field, "filter_type": filter_type, "condition": condition, "condition_value": _value(condition_value), **options}
+
+
+def exact(field:str, value, negate:bool=False, **options) -> dict:
+    return condition(field, FilterType.EXACT_MATCH, "!=" if negate else "==", value, **options)
+
+
+def is_in(field:str, values:Iterable, negate:bool=False) -> dict:
+    """ Matches any of values in one filter """
+    return exact(field, list(values), negate)
+
+
+def exists(field:str, negate:bool=False) -> dict:
+    return condition(field, FilterType.EXISTS, "!=" if negate else "==", " ")
+
+
+def regexp(field:str, pattern:str) -> dict:
+    return condition(field, FilterType.REGEXP, "==", pattern)
+
+
+def numeric(field:str, comparison:str, value) -> dict:
+    """ comparison is one of >=, >, <=, <. Platform timestamps compare as numbers, so datetimes are accepted """
+    return condition(field, FilterType.NUMERIC, comparison, value)
+
+
+def since(field:str, value) -> dict:
+    """ field >= value for date fields (update_date_ etc.) """
+    return condition(field, FilterType.DATE, ">=", value)
+
+
+def date_range(field:str, start:Optional[datetime]=None, end:Optional[datetime]=None) -> List[dict]:
+    """ start <= field < end; either bound may be left out """
+    conditions = []
+    if start:
+        conditions.append(numeric(field, ">=", start))
+    if end:
+        conditions.append(numeric(field, "<", end))
+    return conditions
+
+
+def any_of(*conditions) -> dict:
+    """ Matches if any condition does. A list among conditions is treated as an all_of group """
+    return {"filter_type": FilterType.OR, "condition_value": [_group(c) for c in conditions]}
+
+
+def all_of(*conditions) -> dict:
+    return {"filter_type": FilterType.AND, "condition_value": [_group(c) for c in conditions]}
+
+
+def _group(conditions):
+    return all_of(*conditions) if isinstance(conditions, (list, tuple)) else conditions
+
+
+def event(event_type:str, event_value:Optional[str]=None, min_count:int=1, max_count:Optional[int]=None, comparison_type:str=ComparisonType.GTE) -> dict:
+    """ Event log filter, e.g. event(EventType.TOOL_RUNS_FAILED, tool_id) for conversations where the tool failed """
+    log_filter = {"event_type": event_type, "min_count": min_count, "comparison_type": comparison_type}
+    if event_value is not None:
+        log_filter["event_value"] = event_value
+    if max_count is not None:
+        log_filter["max_count"] = max_count
+    return log_filter
+
+
+class Query:
+    """ Filters are ANDed together. Every method returns the query, so calls chain """
+
+    def __init__(self, filters:Optional[list]=None):
+        self.filters = list(filters or [])
+        self.event_filters = []
+        self.sorts = []
+        self.fields = []
+
+    def where(self, *conditions) -> "Query":
+        for c in conditions:
+            if isinstance(c, (list, tuple)):
+                self.filters.extend(c)
+            else:
+                self.filters.append(c)
+        return self
+
+    def where_event(self, *event_filters) -> "Query":
+        self.event_filters.extend(event_filters)
+        return self
+
+    def sort(self, field:str, descending:bool=True) -> "Query":
+        self.sorts.append({field: "desc" if descending else "asc"})
+        return self
+
+    def select(self, *fields) -> "Query":
+        """ Only return these fields, where the endpoint supports it """
+        self.fields.extend(fields)
+        return self
+
+    def extend(self, other:Optional["Query"]) -> "Query":
+        """ A new query with other's filters, event filters, sort and fields added after this one's """
+        query = self.copy()
+        if other is not None:
+            query.filters += other.filters
+            query.event_filters += other.event_filters
+            query.sorts += other.sorts
+            query.fields += other.fields
+        return query
+
+    def copy(self) -> "Query":
+        query = Query(self.filters)
+        query.event_filters = list(self.event_filters)
+        query.sorts = list(self.sorts)
+        query.fields = list(self.fields)
+        return query
+
+    def to_body(self, **extra) -> dict:
+        """ POST body with the filters as lists. extra (page_size, page, ...) is added as is """
+        body = {"filters": self.filters}
+        if self.event_filters:
+            body["event_logs_filters"] = self.event_filters
+        if self.sorts:
+            body["sort"] = self.sorts
+        if self.fields:
+            body["select_fields"] = self.fields
+        body.update({key: value for key, value in extra.items() if value is not None})
+        return body
+
+    def to_params(self, **extra) -> dict:
+        """ GET params: the same keys as to_body, with list values JSON encoded """
+        return {key: json.dumps(value) if key in ("filters", "event_logs_filters", "sort", "select_fields") else value for key, value in self.to_body(**extra).items()}
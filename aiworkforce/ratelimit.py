@@ -0,0 +1,144 @@
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+
+DEFAULT_RATE = 20.0
+DEFAULT_BURST = 40
+DEFAULT_MIN_RATE = 0.2
+DEFAULT_MAX_RATE = 100.0
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Last path segments of the endpoints that start a run. Reads such as .../trigger_message are not triggers
+TRIGGER_SEGMENTS = ("trigger", "trigger_async")
+
+
+def endpoint_family(path:str) -> str:
+    """ Groups endpoints that share a platform limit, e.g. /agents/{id}/tasks/x/view -> agents and
+    /agents/trigger or /studios/{id}/trigger_async -> agents/trigger, studios/trigger """
+    segments = [segment for segment in path.split("?", 1)[0].split("/") if segment]
+    if not segments:
+        return ""
+    if segments[-1] in TRIGGER_SEGMENTS:
+        return f"{segments[0]}/trigger"
+    return segments[0]
+
+
+class TokenBucket:
+    """ Thread-safe token bucket whose refill rate adapts: halved on a 429, nudged back up on success """
+
+    def __init__(self, rate:float=DEFAULT_RATE, burst:int=DEFAULT_BURST, min_rate:float=DEFAULT_MIN_RATE, max_rate:float=DEFAULT_MAX_RATE):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now:float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self) -> float:
+        """ Blocks until a token is available. Returns the seconds waited """
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def on_success(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + 1.0 / max(self.rate, 1.0))
+
+    def on_throttle(self):
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+
+
+class RateLimiter:
+    """ One adaptive token bucket per endpoint family. family_rates caps specific families: their bucket starts
+    at, and never climbs above, the configured rate, with a burst of 1 so the cap also holds over short windows """
+
+    def __init__(self, rate:float=DEFAULT_RATE, burst:int=DEFAULT_BURST, family_rates:Optional[Dict[str, float]]=None, min_rate:float=DEFAULT_MIN_RATE, max_rate:float=DEFAULT_MAX_RATE):
+        self.rate = rate
+        self.burst = burst
+        self.family_rates = family_rates or {}
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, family:str) -> TokenBucket:
+        bucket = self.buckets.get(family)
+        if bucket is None:
+            with self.lock:
+                bucket = self.buckets.get(family)
+                if bucket is None:
+                    if family in self.family_rates:
+                        rate = self.family_rates[family]
+                        bucket = TokenBucket(rate, 1, min(self.min_rate, rate), rate)
+                    else:
+                        bucket = TokenBucket(self.rate, self.burst, self.min_rate, self.max_rate)
+                    self.buckets[family] = bucket
+        return bucket
+
+    def acquire(self, family:str) -> float:
+        return self.bucket(family).acquire()
+
+    def on_success(self, family:str):
+        self.bucket(family).on_success()
+
+    def on_throttle(self, family:str):
+        self.bucket(family).on_throttle()
+
+
+def parse_retry_after(value:Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """ Exponential backoff with full jitter, honouring Retry-After. Server errors and dropped connections
+    are not retried for non-idempotent families (triggers), since the platform may have acted on them """
+
+    def __init__(self, max_retries:int=5, backoff_base:float=0.5, backoff_max:float=60.0, retry_statuses=RETRY_STATUSES, non_idempotent_families=("agents/trigger", "studios/trigger")):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = retry_statuses
+        self.non_idempotent_families = non_idempotent_families
+
+    def should_retry(self, family:str, attempt:int, status_code:Optional[int]) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if status_code == 429:
+            return True
+        if status_code is not None and status_code not in self.retry_statuses:
+            return False
+        return family not in self.non_idempotent_families
+
+    def delay(self, attempt:int, retry_after:Optional[str]=None) -> float:
+        retry_after_seconds = parse_retry_after(retry_after)
+        if retry_after_seconds is not None:
+            return min(retry_after_seconds, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
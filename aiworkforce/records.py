@@ -0,0 +1,121 @@
+""" Compact, slotted views of conversation, tool run and action records.
+
+List endpoints return deeply nested dicts of which scripts usually read a handful of fields. from_api projects
+those fields once at parse time: timestamps become epoch floats, repeated strings (states, ids, statuses) are
+interned so identical values share one object, and the raw payload is dropped unless keep_raw is set.
+`python -m benchmarks.bench_records` measures the memory saved per 100k records """
+import sys
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+from aiworkforce.conversation import iter_conversations
+from aiworkforce.recovery import action_message_id
+from aiworkforce.tool import iter_tool_runs
+from aiworkforce.utils import parse_platform_timestamp
+
+
+def _intern(value) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _metadata_dict(metadata:Optional[list]) -> Optional[dict]:
+    """ custom_metadata as {title: value}; the first entry wins when a title repeats """
+    cleaned = {}
+    for item in metadata or []:
+        if 'title' in item:
+            cleaned.setdefault(item['title'], item.get('value'))
+    return cleaned or None
+
+
+@dataclass(slots=True)
+class ConversationRecord:
+    """ A conversation from the conversations list. Timestamps are epoch seconds, nan if missing """
+    conversation_id: Optional[str]
+    agent_id: Optional[str]
+    title: Optional[str]
+    state: Optional[str]
+    insert_datetime: float
+    update_datetime: float
+    custom_metadata: Optional[dict] = None
+    raw: Optional[dict] = None
+
+    @classmethod
+    def from_api(cls, record:dict, keep_raw:bool=False) -> "ConversationRecord":
+        conversation = record.get('metadata', {}).get('conversation', {})
+        return cls(
+            conversation_id=record.get('knowledge_set'),
+            agent_id=_intern(conversation.get('agent_id')),
+            title=conversation.get('title'),
+            state=_intern(conversation.get('state')),
+            insert_datetime=parse_platform_timestamp(record.get('insert_datetime', record.get('insert_date_'))),
+            update_datetime=parse_platform_timestamp(record.get('update_datetime', record.get('update_date_'))),
+            custom_metadata=_metadata_dict(conversation.get('custom_metadata')),
+            raw=record if keep_raw else None,
+        )
+
+
+@dataclass(slots=True)
+class ToolRunRecord:
+    """ A row of tool run history or of a conversation's studio run history """
+    job_id: Optional[str]
+    studio_id: Optional[str]
+    conversation_id: Optional[str]
+    agent_id: Optional[str]
+    status: Optional[str]
+    insert_date: float
+    cost: float
+    errored: bool
+    raw: Optional[dict] = None
+
+    @classmethod
+    def from_api(cls, record:dict, keep_raw:bool=False) -> "ToolRunRecord":
+        return cls(
+            job_id=record.get('job_id', record.get('_id')),
+            studio_id=_intern(record.get('studio_id')),
+            conversation_id=_intern(record.get('conversation_id')),
+            agent_id=_intern(record.get('agent_id') or record.get('agent_details', {}).get('agent_id')),
+            status=_intern(record.get('status')),
+            insert_date=parse_platform_timestamp(record.get('insert_date_')),
+            cost=float(record.get('cost') or 0),
+            errored=bool(record.get('errors')),
+            raw=record if keep_raw else None,
+        )
+
+
+@dataclass(slots=True)
+class ActionRecord:
+    """ An event from get_conversation_actions. message_id is the id a retrigger would start after """
+    item_id: Optional[str]
+    action_type: Optional[str]
+    tool_run_state: Optional[str]
+    message_id: Optional[str]
+    insert_date: float
+    raw: Optional[dict] = None
+
+    @classmethod
+    def from_api(cls, record:dict, keep_raw:bool=False) -> "ActionRecord":
+        content = record.get('content', {})
+        return cls(
+            item_id=content.get('item_id'),
+            action_type=_intern(content.get('type')),
+            tool_run_state=_intern(content.get('tool_run_state')),
+            message_id=action_message_id(record),
+            insert_date=parse_platform_timestamp(record.get('insert_date_')),
+            raw=record if keep_raw else None,
+        )
+
+
+def compact_records(records:Iterable[dict], record_type:type, keep_raw:bool=False) -> Iterator:
+    """ Lazily projects API records (or the 'results' of a list response) into record_type """
+    if isinstance(records, dict):
+        records = records.get('results', [])
+    for record in records:
+        yield record_type.from_api(record, keep_raw)
+
+
+def iter_conversation_records(region_id:str, project_id:str, agent_id:str, api_key:str, keep_raw:bool=False, **kwargs) -> Iterator[ConversationRecord]:
+    return compact_records(iter_conversations(region_id, project_id, agent_id, api_key, **kwargs), ConversationRecord, keep_raw)
+
+
+def iter_tool_run_records(tool_id:str, region_id:str, project_id:str, api_key:str, keep_raw:bool=False, **kwargs) -> Iterator[ToolRunRecord]:
+    return compact_records(iter_tool_runs(tool_id, region_id, project_id, api_key, **kwargs), ToolRunRecord, keep_raw)
@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from aiworkforce.query import Query, is_in
+from aiworkforce.types import ConversationState
+from aiworkforce.utils import conversation_id_of
+from aiworkforce.conversation import iter_conversations, get_conversation_actions, get_conversation_states, retrigger_conversation_after_message
+
+
+DEFAULT_ERROR_STATES = (
+    ConversationState.ERRORED_PENDING_APPROVAL,
+    ConversationState.UNRECOVERABLE,
+    ConversationState.TIMED_OUT,
+)
+
+# Slack on the update_datetime cutoff of state polls, for clock skew between this machine and the platform
+POLL_CLOCK_SKEW = timedelta(minutes=5)
+
+ACTIVE_STATES = (
+    ConversationState.STARTING_UP,
+    ConversationState.RUNNING,
+    ConversationState.WAITING_FOR_CAPACITY,
+    ConversationState.QUEUED_FOR_RERUN,
+)
+
+
+def conversation_state(conversation_metadata:dict) -> str:
+    return conversation_metadata.get('metadata', {}).get('conversation', {}).get('state', '')
+
+
+def action_message_id(action:dict) -> Optional[str]:
+    """ The message id a retrigger would start after: the event's action-response, action-error or agent-error
+    id, falling back to its item_id """
+    content = action.get('content', {})
+    message_ids = content.get('original_message_ids', {})
+    return message_ids.get('action-response', message_ids.get('action-error', message_ids.get('agent-error', content.get('item_id'))))
+
+
+def find_retrigger_message_id(actions:list) -> Optional[str]:
+    """ Message id of the event just before the last action with tool_run_state == 'error' """
+    for i in range(len(actions) - 1, 0, -1):
+        if actions[i].get('content', {}).get('tool_run_state', '') == 'error':
+            prev_event_id = action_message_id(actions[i - 1])
+            if prev_event_id is not None:
+                return prev_event_id
+    return None
+
+
+def load_checkpoint(checkpoint_path:Optional[str]) -> dict:
+    """ conversation id -> outcome of conversations a previous run already finished with """
+    done = {}
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        with open(checkpoint_path, "r") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    done[record["conversation_id"]] = record["outcome"]
+    return done
+
+
+class RetriggerPipeline:
+    """ Retriggers failed conversations from just before their last tool error.
+
+    Stages run concurrently: conversations in the given states are listed page by page, actions fetched on a pool of
+    fetch_concurrency workers, and retriggers sent on trigger_concurrency workers. At most max_in_flight
+    retriggered conversations run at once; their state is polled every poll_interval seconds, and one the poll
+    no longer finds is counted as poll_missing and frees its slot rather than holding it.
+    Each finished conversation is appended to checkpoint_path, so a rerun resumes where it stopped """
+
+    def __init__(self, region_id:str, project_id:str, agent_id:str, api_key:str, states=DEFAULT_ERROR_STATES, fetch_concurrency:int=8, trigger_concurrency:int=2, max_in_flight:int=10, poll_interval:float=15, checkpoint_path:Optional[str]=None, dry_run:bool=False):
+        self.region_id = region_id
+        self.project_id = project_id
+        self.agent_id = agent_id
+        self.api_key = api_key
+        self.states = states
+        self.fetch_concurrency = fetch_concurrency
+        self.trigger_concurrency = trigger_concurrency
+        self.max_in_flight = max_in_flight
+        self.poll_interval = poll_interval
+        self.checkpoint_path = checkpoint_path
+        self.dry_run = dry_run
+
+        self.stats = Counter()
+        self.stage_seconds = Counter()
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._in_flight_slots = threading.BoundedSemaphore(max_in_flight)
+        self._fetch_slots = threading.BoundedSemaphore(fetch_concurrency * 2)
+
+    def _record(self, conversation_id:str, outcome:str, message_id:Optional[str]=None):
+        with self._lock:
+            self.stats[outcome] += 1
+            # Errors are left out so a resumed run tries those conversations again
+            if self.checkpoint_path and outcome in ("triggered", "skipped"):
+                with open(self.checkpoint_path, "a") as f:
+                    f.write(json.dumps({"conversation_id": conversation_id, "outcome": outcome, "message_id": message_id}) + "\n")
+
+    def _timed(self, stage:str, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.stage_seconds[stage] += time.perf_counter() - start
+
+    def _fetch(self, conversation_id:str, trigger_pool:ThreadPoolExecutor):
+        try:
+            actions = self._timed("fetch", get_conversation_actions, self.region_id, self.project_id, self.agent_id, conversation_id, self.api_key).get('results', [])
+            message_id = find_retrigger_message_id(actions)
+        except Exception:
+            self._record(conversation_id, "fetch_errors")
+            return
+        finally:
+            self._fetch_slots.release()
+        with self._lock:
+            self.stats["fetched"] += 1
+        if message_id is None:
+            self._record(conversation_id, "skipped")
+            return
+        trigger_pool.submit(self._trigger, conversation_id, message_id)
+
+    def _trigger(self, conversation_id:str, message_id:str):
+        if self.dry_run:
+            self._record(conversation_id, "planned", message_id)
+            return
+        self._in_flight_slots.acquire()
+        try:
+            self._timed("trigger", retrigger_conversation_after_message, self.project_id, self.region_id, self.agent_id, conversation_id, message_id, self.api_key)
+        except Exception:
+            self._in_flight_slots.release()
+            self._record(conversation_id, "trigger_errors", message_id)
+            return
+        with self._lock:
+            self._in_flight[conversation_id] = {"triggered_at": time.monotonic(), "triggered_wall": datetime.now(timezone.utc), "seen_active": False}
+        self._record(conversation_id, "triggered", message_id)
+
+    def _poll_in_flight(self):
+        with self._lock:
+            in_flight = dict(self._in_flight)
+        if not in_flight:
+            return
+        # A retrigger bumps the conversation's update_datetime, so nothing older than the first trigger is needed
+        updated_since = min(tracked["triggered_wall"] for tracked in in_flight.values()) - POLL_CLOCK_SKEW
+        try:
+            states = self._timed("poll", get_conversation_states, self.region_id, self.project_id, self.agent_id, list(in_flight), self.api_key, updated_since)
+        except Exception:
+            with self._lock:
+                self.stats["poll_errors"] += 1
+            return
+        now = time.monotonic()
+        for conversation_id, tracked in in_flight.items():
+            if conversation_id not in states:
+                with self._lock:
+                    self.stats["poll_missing"] += 1
+                    self._in_flight.pop(conversation_id, None)
+                self._in_flight_slots.release()
+                continue
+            state = states[conversation_id]
+            if state in ACTIVE_STATES:
+                tracked["seen_active"] = True
+                continue
+            # A just-retriggered conversation can still report its old state until the platform picks it up
+            if tracked["seen_active"] or now - tracked["triggered_at"] > 2 * self.poll_interval:
+                with self._lock:
+                    self._in_flight.pop(conversation_id, None)
+                self._in_flight_slots.release()
+
+    def _monitor(self, stop:threading.Event):
+        while not stop.wait(self.poll_interval):
+            self._poll_in_flight()
+
+    def run(self) -> dict:
+        done = load_checkpoint(self.checkpoint_path)
+        start = time.perf_counter()
+        stop = threading.Event()
+        monitor = threading.Thread(target=self._monitor, args=(stop,), daemon=True)
+        monitor.start()
+
+        with ThreadPoolExecutor(max_workers=self.trigger_concurrency) as trigger_pool:
+            with ThreadPoolExecutor(max_workers=self.fetch_concurrency) as fetch_pool:
+                list_start = time.perf_counter()
+                # Only conversations in the wanted states are listed; the state check below guards against
+                # conversations that moved on between the server filtering and this loop
+                query = Query().where(is_in("conversation.state", self.states))
+                for conversation in iter_conversations(self.region_id, self.project_id, self.agent_id, self.api_key, prefetch=True, query=query):
+                    self.stats["listed"] += 1
+                    conversation_id = conversation_id_of(conversation)
+                    if conversation_state(conversation) not in self.states:
+                        continue
+                    if conversation_id in done:
+                        self.stats["resumed"] += 1
+                        continue
+                    self.stats["matched"] += 1
+                    self._fetch_slots.acquire()
+                    fetch_pool.submit(self._fetch, conversation_id, trigger_pool)
+                self.stage_seconds["list"] += time.perf_counter() - list_start
+
+        stop.set()
+        monitor.join()
+        return self.summary(time.perf_counter() - start)
+
+    def summary(self, elapsed:float) -> dict:
+        """ Counts per outcome plus overall throughput in conversations per second """
+        summary = dict(self.stats)
+        summary["in_flight"] = len(self._in_flight)
+        summary["elapsed_seconds"] = round(elapsed, 2)
+        summary["stage_seconds"] = {stage: round(seconds, 2) for stage, seconds in self.stage_seconds.items()}
+        if elapsed > 0:
+            summary["listed_per_second"] = round(self.stats["listed"] / elapsed, 2)
+            summary["fetched_per_second"] = round(self.stats["fetched"] / elapsed, 2)
+            summary["triggered_per_second"] = round(self.stats["triggered"] / elapsed, 2)
+        return summary
@@ -1,15 +1,15 @@
-import requests
+from aiworkforce.client import get_client
 
 def upsert_snippet(region_id: str, project_id: str, api_key: str, snippet_name: str, snippet_content: str, title:str = None, description:str = None):
     """Upserts a snippet to the Relevance platform."""
-    headers = {"Content-Type": "application/json", "Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    url = f"{base_url}/projects/snippets/list"
+    client = get_client(region_id, project_id, api_key)
+    headers = {"Content-Type": "application/json"}
+    url = "/projects/snippets/list"
 
-    response = requests.get(url, headers=headers)
+    response = client.get(url, headers=headers)
     current_snippets = response.json()
 
-    url = f"{base_url}/projects/snippets/upsert"
+    url = "/projects/snippets/upsert"
 
     payload = {"name": snippet_name.lower(), "content": snippet_content}
 
@@ -27,6 +27,6 @@ def upsert_snippet(region_id: str, project_id: str, api_key: str, snippet_name:
     if 'order' not in payload:
         payload['order'] = 1
 
-    response = requests.post(url, json=payload, headers=headers)
+    response = client.post(url, json=payload, headers=headers)
 
     return response.json()
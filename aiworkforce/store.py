@@ -0,0 +1,110 @@
+import os
+import copy
+import json
+
+from aiworkforce.utils import canonical_json, get_object_id, object_hash, remove_objects_changing_fields, update_objects_metadata
+
+
+def strip_project_fields(obj:dict) -> dict:
+    """ Drops the fields update_objects_metadata sets, so the same definition hashes the same in every project """
+    obj.pop("project", None)
+    obj.pop("_id", None)
+    if isinstance(obj.get("actions"), list):
+        for action in obj["actions"]:
+            action.pop("project", None)
+    return obj
+
+
+def normalize_object(obj:dict) -> dict:
+    obj = copy.deepcopy(obj)
+    return strip_project_fields(remove_objects_changing_fields([obj])[0])
+
+
+class ObjectStore:
+    """ Content-addressed store: blobs are keyed by the hash of the canonical normalized JSON and shared
+    between projects, while each project has a small index of object id -> blob hash per object type """
+
+    def __init__(self, root:str, project_id:str):
+        self.root = root
+        self.project_id = project_id
+        self.index_path = f"{root}/index/{project_id}.json"
+        self.index = self._load_index()
+
+    def _load_index(self) -> dict:
+        if not os.path.exists(self.index_path):
+            return {}
+        with open(self.index_path, "r") as f:
+            return json.load(f)
+
+    def save_index(self):
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        with open(f"{self.index_path}.tmp", "w") as f:
+            json.dump(self.index, f, indent=4, sort_keys=True)
+        os.replace(f"{self.index_path}.tmp", self.index_path)
+
+    def blob_path(self, content_hash:str) -> str:
+        return f"{self.root}/blobs/{content_hash[:2]}/{content_hash[2:]}.json"
+
+    def ids(self, object_type:str) -> list:
+        return list(self.index.get(object_type, {}))
+
+    def hash_of(self, object_type:str, object_id:str):
+        return self.index.get(object_type, {}).get(object_id)
+
+    def has_changed(self, obj:dict, object_type:str) -> bool:
+        return self.hash_of(object_type, get_object_id(obj)) != object_hash(normalize_object(obj))
+
+    def put(self, obj:dict, object_type:str) -> str:
+        """ Stores the object, writing a blob only if no project has stored identical content yet """
+        normalized = normalize_object(obj)
+        content_hash = object_hash(normalized)
+        path = self.blob_path(content_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(f"{path}.tmp", "w") as f:
+                f.write(canonical_json(normalized))
+            os.replace(f"{path}.tmp", path)
+        self.index.setdefault(object_type, {})[get_object_id(obj)] = content_hash
+        return content_hash
+
+    def put_all(self, objects, object_type:str) -> list:
+        """ Stores objects and saves the index. Returns the ids whose content changed """
+        changed = []
+        for obj in objects:
+            previous = self.hash_of(object_type, get_object_id(obj))
+            if self.put(obj, object_type) != previous:
+                changed.append(get_object_id(obj))
+        self.save_index()
+        return changed
+
+    def get(self, object_type:str, object_id:str) -> dict:
+        """ Loads the object with this project's metadata reapplied """
+        with open(self.blob_path(self.index[object_type][object_id]), "r") as f:
+            obj = json.load(f)
+        return update_objects_metadata([obj], self.project_id)[0]
+
+    def get_all(self, object_type:str):
+        for object_id in self.ids(object_type):
+            yield self.get(object_type, object_id)
+
+    def remove(self, object_type:str, object_id:str):
+        self.index.get(object_type, {}).pop(object_id, None)
+
+    def collect_garbage(self) -> int:
+        """ Deletes blobs no project index references. Returns the number removed """
+        self.save_index()
+        referenced = set()
+        index_dir = f"{self.root}/index"
+        for file in os.listdir(index_dir) if os.path.exists(index_dir) else []:
+            if file.endswith(".json"):
+                with open(f"{index_dir}/{file}", "r") as f:
+                    for hashes in json.load(f).values():
+                        referenced.update(hashes.values())
+        removed = 0
+        blob_dir = f"{self.root}/blobs"
+        for prefix in os.listdir(blob_dir) if os.path.exists(blob_dir) else []:
+            for file in os.listdir(f"{blob_dir}/{prefix}"):
+                if file.endswith(".json") and f"{prefix}{file[:-5]}" not in referenced:
+                    os.remove(f"{blob_dir}/{prefix}/{file}")
+                    removed += 1
+        return removed
@@ -0,0 +1,100 @@
+import os
+import json
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from aiworkforce.utils import (
+    clean_filename,
+    get_object_id,
+    object_hash,
+    open_object_file,
+    remove_objects_changing_fields,
+    update_objects_metadata,
+)
+
+
+MANIFEST_FILENAME = ".sync-manifest"
+
+
+def load_sync_manifest(folderpath:str) -> dict:
+    """ Manifest of the last sync: object id -> file, content hash and update_date_ """
+    path = f"{folderpath}/{MANIFEST_FILENAME}"
+    if not os.path.exists(path):
+        return {"last_sync": None, "objects": {}}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_sync_manifest(manifest:dict, folderpath:str):
+    os.makedirs(folderpath, exist_ok=True)
+    path = f"{folderpath}/{MANIFEST_FILENAME}"
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def _file_hash(filepath:str):
+    try:
+        return object_hash(open_object_file(filepath))
+    except (OSError, ValueError):
+        return None
+
+
+def sync_objects_to_local(objects:Iterable[dict], folderpath:str, object_type:str, prod_project_id:str, prune:bool=True, current_ids:Optional[Iterable[str]]=None) -> dict:
+    """ Incrementally mirror objects into folderpath, touching only files whose normalized content changed.
+    Objects whose update_date_ matches the manifest are skipped without normalizing or hashing.
+    With prune, files of objects that no longer exist are deleted: those missing from current_ids (every id in
+    the project, e.g. from iter_agent_ids) when given, so `objects` can be just the ones changed since the last
+    sync, otherwise those missing from `objects`, which must then be the full listing """
+    started_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    os.makedirs(folderpath, exist_ok=True)
+    manifest = load_sync_manifest(folderpath)
+    entries = manifest["objects"]
+    stats = Counter(written=0, unchanged=0, deleted=0)
+    seen = set()
+
+    for obj in objects:
+        object_id = get_object_id(obj)
+        seen.add(object_id)
+        entry = entries.get(object_id)
+        update_date = obj.get("update_date_")
+
+        if entry and update_date and entry.get("update_date_") == update_date and os.path.exists(f"{folderpath}/{entry['file']}"):
+            stats["unchanged"] += 1
+            continue
+
+        obj = update_objects_metadata(remove_objects_changing_fields([obj]), prod_project_id)[0]
+        content_hash = object_hash(obj)
+        file = clean_filename(obj, object_type)
+        filepath = f"{folderpath}/{file}"
+
+        if entry and entry["file"] != file and os.path.exists(f"{folderpath}/{entry['file']}"):
+            os.remove(f"{folderpath}/{entry['file']}")
+
+        known_hash = entry["hash"] if entry and entry["file"] == file else _file_hash(filepath)
+        if known_hash == content_hash and os.path.exists(filepath):
+            stats["unchanged"] += 1
+        else:
+            with open(filepath, "w") as f:
+                json.dump(obj, f, indent=4)
+            stats["written"] += 1
+
+        entries[object_id] = {"file": file, "hash": content_hash, "update_date_": update_date}
+
+    if prune:
+        existing = set(current_ids) if current_ids is not None else seen
+        for object_id in set(entries) - existing:
+            filepath = f"{folderpath}/{entries.pop(object_id)['file']}"
+            if os.path.exists(filepath):
+                os.remove(filepath)
+            stats["deleted"] += 1
+        tracked = {entry["file"] for entry in entries.values()}
+        for file in os.listdir(folderpath):
+            if file.endswith(".json") and file not in tracked:
+                os.remove(f"{folderpath}/{file}")
+                stats["deleted"] += 1
+
+    manifest["last_sync"] = started_at
+    save_sync_manifest(manifest, folderpath)
+    return dict(stats)
@@ -1,107 +1,270 @@
-import requests
 import json
-from aiworkforce.utils import save_all_objects
-from aiworkforce.types import FilterType
+import time
+import heapq
+import bisect
+import itertools
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Iterable, Iterator, Optional
+
+from aiworkforce.cache import cached_call
+from aiworkforce.client import get_client
+from aiworkforce.pagination import DEFAULT_PAGE_SIZE, iter_records
+from aiworkforce.utils import percentile, save_all_objects
+from aiworkforce.query import Query, exact, since
 
 def get_tool(tool_id:str, region_id:str, project_id:str, api_key:str, limit:int=1):
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/studios/list"
-    response = requests.get(
-        path, 
-        headers=headers, 
+    client = get_client(region_id, project_id, api_key)
+    response = client.get(
+        "/studios/list",
         params={
             "page_size": limit, 
-            "filters": json.dumps([{"field":"project","condition":"==","condition_value":project_id,"filter_type":FilterType.EXACT_MATCH}, {"field":"studio_id","condition":"==","condition_value":tool_id,"filter_type":FilterType.EXACT_MATCH}])
+            "filters": json.dumps([exact("project", project_id), exact("studio_id", tool_id)])
         }
     )
     return response.json()['results'][0]
 
 
 def get_all_tools(region_id:str, project_id:str, api_key:str, limit:int=50000):
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/studios/list"
-    response = requests.get(
-        path, 
-        headers=headers, 
+    client = get_client(region_id, project_id, api_key)
+    response = client.get(
+        "/studios/list",
         params={
             "page_size" : limit,
-            "filters" : json.dumps([{"field":"project","condition":"==","condition_value":project_id,"filter_type":FilterType.EXACT_MATCH}])
+            "filters" : json.dumps([exact("project", project_id)])
         }
     )
     return response.json()['results']
 
 
-def create_tools(tool_jsons:list, region_id:str, project_id:str, api_key:str, partial_update:bool=True, insert_if_not_exists:bool=True):
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/studios/bulk_update"
+def iter_tools(region_id:str, project_id:str, api_key:str, page_size:int=DEFAULT_PAGE_SIZE, prefetch:bool=False, updated_since:Optional[str]=None, fields:Optional[list]=None):
+    """ Lazily yields every tool in the project, one page at a time. updated_since (ISO timestamp) limits it to
+    recently changed ones, fields to those fields of each tool """
+    client = get_client(region_id, project_id, api_key)
+
+    query = Query().where(exact("project", project_id))
+    if updated_since:
+        query.where(since("update_date_", updated_since))
+    if fields:
+        query.select(*fields)
+
+    def fetch_page(page, cursor):
+        return client.get("/studios/list", params=query.to_params(page_size=page_size, page=page, cursor=cursor)).json()
+
+    return iter_records(fetch_page, page_size, prefetch)
+
+
+def iter_tool_ids(region_id:str, project_id:str, api_key:str, page_size:int=DEFAULT_PAGE_SIZE):
+    """ Ids of every tool in the project, listing only the id field """
+    for tool in iter_tools(region_id, project_id, api_key, page_size, fields=["studio_id"]):
+        yield tool["studio_id"]
+
+
+def bulk_update_tools_response(tool_jsons:list, region_id:str, project_id:str, api_key:str, partial_update:bool=True, insert_if_not_exists:bool=True):
+    """ create_tools' request, returning the raw response so callers can check its status """
+    client = get_client(region_id, project_id, api_key)
     payload = {
         "updates": tool_jsons,
         "partial_update": partial_update,
         "insert_if_not_exists": insert_if_not_exists
     }
-    response = requests.post(path, json=payload, headers=headers)
-    return response.json()
+    return client.post("/studios/bulk_update", json=payload)
+
+
+def create_tools(tool_jsons:list, region_id:str, project_id:str, api_key:str, partial_update:bool=True, insert_if_not_exists:bool=True):
+    return bulk_update_tools_response(tool_jsons, region_id, project_id, api_key, partial_update, insert_if_not_exists).json()
 
 
 def get_tool_run_history(tool_id:str, region_id:str, project_id:str, api_key:str):
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/studios/run_history/list"
+    client = get_client(region_id, project_id, api_key)
     payload = {
         "page_size": 999999999999,
-        "filters": json.dumps([{"filter_type":FilterType.EXACT_MATCH,"field":"project","condition":"==","condition_value":project_id}, {"filter_type":FilterType.EXACT_MATCH,"field":"studio_id","condition":"==","condition_value":tool_id}]),
+        "filters": json.dumps([exact("project", project_id), exact("studio_id", tool_id)]),
         "with_agent_details": True
     }
-    response = requests.get(path, headers=headers, params=payload)
-    return response.json()
+
+    def fetch():
+        return client.get("/studios/run_history/list", params=payload)
+
+    return cached_call("/studios/run_history/list", {"region_id": region_id, "project_id": project_id, "tool_id": tool_id}, fetch)
+
+
+def iter_tool_runs(tool_id:str, region_id:str, project_id:str, api_key:str, page_size:int=DEFAULT_PAGE_SIZE, prefetch:bool=False):
+    """ Lazily yields a tool's run history, one page at a time """
+    client = get_client(region_id, project_id, api_key)
+
+    def fetch_page(page, cursor):
+        params = {
+            "page_size": page_size,
+            "page": page,
+            "filters": json.dumps([exact("project", project_id), exact("studio_id", tool_id)]),
+            "with_agent_details": True
+        }
+        if cursor:
+            params["cursor"] = cursor
+        return client.get("/studios/run_history/list", params=params).json()
+
+    return iter_records(fetch_page, page_size, prefetch)
 
 
 def trigger_tool(tool_id:str, region_id:str, project_id:str, api_key:str, tool_inputs:dict):
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/studios/{tool_id}/trigger_async" #
+    client = get_client(region_id, project_id, api_key)
     payload = {
         "executor": {"type": "run_chain"},
         "max_job_duration": "minutes",
         "params": tool_inputs,
         "studio_id": tool_id,
     }
-    response = requests.post(path, headers=headers, json=payload)
+    response = client.post(f"/studios/{tool_id}/trigger_async", json=payload)
     return response.json()
 
 
 def poll_tool_run(tool_id:str, region_id:str, project_id:str, api_key:str, job_id:str):
     """ Check if trigger_tool has finished running. Loop until response["type"] != 'timeout' """
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/studios/{tool_id}/async_poll/{job_id}"
-    response = requests.get(path, headers=headers)
+    client = get_client(region_id, project_id, api_key)
+    response = client.get(f"/studios/{tool_id}/async_poll/{job_id}")
     return response.json()
 
 
 def delete_tools(tool_ids:list, region_id:str, project_id:str, api_key:str):
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/studios/bulk_delete"
-    response = requests.post(path, json={"ids": tool_ids}, headers=headers)
+    client = get_client(region_id, project_id, api_key)
+    response = client.post("/studios/bulk_delete", json={"ids": tool_ids})
     return response.json()
 
 
 def update_tool(tool_json:dict, region_id:str, project_id:str, api_key:str):
-    headers = {"Authorization": f"{project_id}:{api_key}"}
-    base_url = f"https://api-{region_id}.stack.tryrelevance.com/latest"
-    path = f"{base_url}/studios/bulk_update"
+    client = get_client(region_id, project_id, api_key)
     payload = {
         "updates": [tool_json],
         "partial_update": True,
         "insert_if_not_exists": False
     }
-    response = requests.post(path, json=payload, headers=headers)
+    response = client.post("/studios/bulk_update", json=payload)
     return response.json()
 
 
 def save_tools_to_file(tools, folderpath):
     save_all_objects(tools, folderpath, "tools")
+
+
+def _percentile(sorted_values:list, percent:float):
+    value = percentile(sorted_values, percent)
+    return None if value is None else round(value, 3)
+
+
+class ToolJobRunner:
+    """ Runs a tool over many inputs with trigger_tool, keeping at most max_outstanding jobs running.
+    One scheduler loop polls every outstanding job on a shared worker pool; each job's poll interval starts
+    near half the median job latency seen so far and backs off while the job keeps returning 'timeout'.
+    run() yields results as jobs finish, not in input order """
+
+    def __init__(self, tool_id:str, region_id:str, project_id:str, api_key:str, max_outstanding:int=20, workers:int=8, min_poll_interval:float=0.5, max_poll_interval:float=10.0, poll_backoff:float=1.5):
+        if max_outstanding < 1:
+            raise ValueError(f"max_outstanding must be at least 1, not {max_outstanding!r}")
+        self.tool_id = tool_id
+        self.region_id = region_id
+        self.project_id = project_id
+        self.api_key = api_key
+        self.max_outstanding = max_outstanding
+        self.workers = workers
+        self.min_poll_interval = min_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.poll_backoff = poll_backoff
+        self.latencies = []
+        self._sorted_latencies = []
+        self.polls = 0
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def _initial_poll_interval(self) -> float:
+        median = _percentile(self._sorted_latencies, 50)
+        if median is None:
+            return self.min_poll_interval
+        return min(self.max_poll_interval, max(self.min_poll_interval, median / 2))
+
+    def _trigger(self, tool_inputs:dict) -> dict:
+        return trigger_tool(self.tool_id, self.region_id, self.project_id, self.api_key, tool_inputs)
+
+    def _poll(self, job_id:str) -> dict:
+        return poll_tool_run(self.tool_id, self.region_id, self.project_id, self.api_key, job_id)
+
+    def run(self, inputs:Iterable[dict]) -> Iterator[dict]:
+        """ Yields {"index", "inputs", "job_id", "result", "seconds", "error"} per input as each job completes """
+        start = time.perf_counter()
+        inputs = enumerate(inputs)
+        exhausted = False
+        scheduled = []  # heap of (next_poll_at, seq, job)
+        seq = itertools.count()
+        futures = {}
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                while True:
+                    outstanding = len(futures) + len(scheduled)
+                    while not exhausted and outstanding < self.max_outstanding:
+                        try:
+                            index, tool_inputs = next(inputs)
+                        except StopIteration:
+                            exhausted = True
+                            break
+                        job = {"index": index, "inputs": tool_inputs, "job_id": None, "started_at": time.perf_counter(), "interval": self._initial_poll_interval()}
+                        futures[executor.submit(self._trigger, tool_inputs)] = ("trigger", job)
+                        outstanding += 1
+
+                    now = time.perf_counter()
+                    while scheduled and scheduled[0][0] <= now:
+                        _, _, job = heapq.heappop(scheduled)
+                        futures[executor.submit(self._poll, job["job_id"])] = ("poll", job)
+                        self.polls += 1
+
+                    if not futures and not scheduled:
+                        if exhausted:
+                            break
+                        continue
+
+                    timeout = max(0.0, scheduled[0][0] - time.perf_counter()) if scheduled else None
+                    done, _ = wait(list(futures), timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        kind, job = futures.pop(future)
+                        try:
+                            response = future.result()
+                        except Exception as e:
+                            yield self._finish(job, None, repr(e))
+                            continue
+
+                        if kind == "trigger":
+                            job["job_id"] = response.get("job_id")
+                            if job["job_id"] is None:
+                                yield self._finish(job, response, "no job_id returned")
+                                continue
+                        elif response.get("type") != "timeout":
+                            yield self._finish(job, response, response.get("error") if response.get("type") == "failed" else None)
+                            continue
+                        else:
+                            job["interval"] = min(self.max_poll_interval, job["interval"] * self.poll_backoff)
+                        heapq.heappush(scheduled, (time.perf_counter() + job["interval"], next(seq), job))
+        finally:
+            # also set when the caller stops iterating early
+            self.elapsed = time.perf_counter() - start
+
+    def _finish(self, job:dict, result, error) -> dict:
+        seconds = time.perf_counter() - job["started_at"]
+        if error:
+            self.errors += 1
+        else:
+            self.latencies.append(seconds)
+            bisect.insort(self._sorted_latencies, seconds)
+        return {"index": job["index"], "inputs": job["inputs"], "job_id": job["job_id"], "result": result, "seconds": round(seconds, 3), "error": error}
+
+    def stats(self) -> dict:
+        latencies = self._sorted_latencies
+        completed = len(latencies) + self.errors
+        return {
+            "completed": len(latencies),
+            "errors": self.errors,
+            "polls": self.polls,
+            "elapsed_seconds": round(self.elapsed, 2),
+            "jobs_per_second": round(completed / self.elapsed, 2) if self.elapsed else None,
+            "latency_p50": _percentile(latencies, 50),
+            "latency_p90": _percentile(latencies, 90),
+            "latency_p99": _percentile(latencies, 99),
+        }
@@ -1,6 +1,23 @@
 import os
 import re
 import json
+import pickle
+import hashlib
+import functools
+from array import array
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+import pytz
+
+
+PLATFORM_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
 
 
 def make_valid_ref_name(name):
@@ -12,18 +29,88 @@ def open_object_file(filepath):
     with open(filepath, "r") as f:
         return json.load(f)
 
-def save_object_file(filepath, json):
+def save_object_file(filepath, obj):
     with open(filepath, "w") as f:
-        json.dump(json, f, indent=4)
+        json.dump(obj, f, indent=4)
+
+def load_json_file(filepath):
+    """ Uses orjson when it is installed, otherwise the standard library """
+    if orjson is not None:
+        with open(filepath, "rb") as f:
+            return orjson.loads(f.read())
+    with open(filepath, "r") as f:
+        return json.load(f)
+
+def _load_file_cache(cache_path):
+    if not cache_path or not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.PickleError, AttributeError, ImportError, ValueError):
+        # A truncated or stale pickle (e.g. written by another version) is a cache miss
+        return {}
+
+def _save_file_cache(cache, cache_path):
+    with open(f"{cache_path}.tmp", "wb") as f:
+        pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(f"{cache_path}.tmp", cache_path)
+
+def open_all_object_files(folderpath, max_workers=None, cache_path=None):
+    """ Loads every .json object in folderpath. max_workers parses files in a thread pool.
+    cache_path keeps parsed objects between runs and only re-reads files whose mtime or size changed """
+    entries = sorted((entry for entry in os.scandir(folderpath) if entry.name.endswith(".json")), key=lambda entry: entry.name)
+    cache = _load_file_cache(cache_path)
+    stats = {}
+    if cache_path:
+        for entry in entries:
+            stat = entry.stat()
+            stats[entry.name] = (stat.st_mtime_ns, stat.st_size)
+
+    to_load = [entry.path for entry in entries if entry.name not in cache or cache[entry.name][0] != stats.get(entry.name)]
+    if max_workers and max_workers > 1 and len(to_load) > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            loaded = dict(zip(to_load, executor.map(load_json_file, to_load)))
+    else:
+        loaded = {path: load_json_file(path) for path in to_load}
 
-def open_all_object_files(folderpath):
     object_jsons = []
-    for file in os.listdir(folderpath):
-        if file.endswith(".json"):
-            with open(f"{folderpath}/{file}", "r") as f:
-                object_jsons.append(json.load(f))
+    new_cache = {}
+    for entry in entries:
+        obj = loaded[entry.path] if entry.path in loaded else cache[entry.name][1]
+        object_jsons.append(obj)
+        if cache_path:
+            new_cache[entry.name] = (stats[entry.name], obj)
+    if cache_path and (to_load or len(new_cache) != len(cache)):
+        _save_file_cache(new_cache, cache_path)
     return object_jsons
 
+class LazyObjectFiles(Mapping):
+    """ Mapping of object id -> object over a folder of object files, parsing each file on first access.
+    Ids are taken from the file names written by clean_filename, so '/', '.' and ':' appear as '_' """
+
+    def __init__(self, folderpath):
+        self.folderpath = folderpath
+        self._paths = {
+            file[:-5].rsplit("--", 1)[-1]: f"{folderpath}/{file}"
+            for file in os.listdir(folderpath) if file.endswith(".json")
+        }
+        self._loaded = {}
+
+    def __getitem__(self, object_id):
+        if object_id not in self._loaded:
+            self._loaded[object_id] = load_json_file(self._paths[object_id])
+        return self._loaded[object_id]
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __len__(self):
+        return len(self._paths)
+
+def open_object_files_lazy(folderpath):
+    return LazyObjectFiles(folderpath)
+
 def clean_filename(f, object_type):
     if object_type == "tools":
         title = f["title"]
@@ -36,6 +123,21 @@ def clean_filename(f, object_type):
 
     return f'{title}--{object_id}.json'
 
+def get_object_id(obj):
+    return obj.get('studio_id', obj.get('agent_id', obj.get('knowledge_id')))
+
+def conversation_id_of(conversation:dict) -> str:
+    """ Id of a record from the conversations list: knowledge_set, or the part of metadata._id after the agent id """
+    return conversation.get('knowledge_set') or conversation.get('metadata', {}).get('_id', '').split("_-_")[-1]
+
+
+def canonical_json(obj):
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+def object_hash(obj):
+    """ Hash of the canonical JSON, so key order and whitespace don't count as changes """
+    return hashlib.sha256(canonical_json(obj).encode("utf-8")).hexdigest()
+
 def remove_objects_changing_fields(object_jsons):
     for obj in object_jsons:
         if "metrics" in obj: del obj["metrics"]
@@ -52,7 +154,7 @@ def update_objects_metadata(object_jsons, prod_project_id):
     for obj in object_jsons:
         obj['public'] = False
         obj['project'] = prod_project_id
-        object_id = obj.get('studio_id', obj.get('agent_id', obj.get('knowledge_id')))
+        object_id = get_object_id(obj)
         obj['_id'] = f"{prod_project_id}_-_{object_id}"
         if 'actions' in obj and isinstance(obj['actions'], list):
             for action in obj['actions']:
@@ -78,3 +180,57 @@ def remove_local_files_not_in_objects(objects, object_type, filepath):
     for file in os.listdir(filepath):
         if file not in current_list and file.endswith(".json"):
             os.remove(f"{filepath}/{file}")
+
+
+@functools.lru_cache(maxsize=None)
+def get_timezone(name:str):
+    """ pytz.timezone is slow to construct, so each zone is built once per process """
+    return pytz.timezone(name)
+
+def parse_platform_timestamp(value) -> float:
+    """ Epoch seconds of a platform timestamp such as 2024-05-01T03:04:05.000Z, or nan if missing.
+    Other ISO formats are accepted too, treating naive values as UTC """
+    if not value:
+        return float("nan")
+    if len(value) == 24 and value[23] == "Z":
+        try:
+            # An explicit offset keeps this on the C fast path of fromisoformat with no tz conversion
+            return datetime.fromisoformat(value[:23] + "+00:00").timestamp()
+        except ValueError:
+            pass
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return float("nan")
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+def parse_platform_timestamps(values) -> array:
+    """ Batch version of parse_platform_timestamp returning an array of epoch seconds """
+    fromisoformat = datetime.fromisoformat
+    epochs = array("d")
+    for value in values:
+        if value and len(value) == 24 and value[23] == "Z":
+            try:
+                epochs.append(fromisoformat(value[:23] + "+00:00").timestamp())
+                continue
+            except ValueError:
+                pass
+        epochs.append(parse_platform_timestamp(value))
+    return epochs
+
+def format_platform_timestamp(dt:datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime(PLATFORM_TIMESTAMP_FORMAT)
+
+def epoch_to_datetime(epoch:float, tz:str="UTC") -> datetime:
+    return datetime.fromtimestamp(epoch, get_timezone(tz))
+
+def percentile(sorted_values, percent:float):
+    """ Linear-interpolated percentile of an already sorted sequence """
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
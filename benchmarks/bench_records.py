@@ -0,0 +1,108 @@
+""" Memory held by 100k conversations, tool runs and actions as parsed API dicts against the compact records
+in aiworkforce.records. Payloads are synthetic but shaped like the list responses. Run with
+`python -m benchmarks.bench_records` """
+import gc
+import json
+import random
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from aiworkforce.records import ActionRecord, ConversationRecord, ToolRunRecord, compact_records
+from aiworkforce.utils import PLATFORM_TIMESTAMP_FORMAT
+
+STATES = ["completed", "running", "errored-pending-approval", "unrecoverable", "timed-out"]
+AGENT_IDS = [f"agent-{i:04d}" for i in range(20)]
+STUDIO_IDS = [f"studio-{i:04d}" for i in range(50)]
+
+
+def _timestamp(start:datetime) -> str:
+    return (start + timedelta(seconds=random.randrange(30 * 86400))).strftime(PLATFORM_TIMESTAMP_FORMAT)
+
+
+def make_conversation(i:int, start:datetime) -> dict:
+    agent_id = random.choice(AGENT_IDS)
+    return {
+        "knowledge_set": f"conversation-{i:08d}",
+        "insert_datetime": _timestamp(start),
+        "update_datetime": _timestamp(start),
+        "metadata": {
+            "_id": f"{agent_id}_-_conversation-{i:08d}",
+            "conversation": {
+                "agent_id": agent_id,
+                "title": f"Task {i}",
+                "state": random.choice(STATES),
+                "is_debug_mode_task": False,
+                "custom_metadata": [{"title": "customer", "value": f"c{i % 500}"}, {"title": "priority", "value": "high"}],
+                "agent_details": {"name": "Support agent", "emoji": None, "description": "Handles support requests " * 4},
+            },
+        },
+    }
+
+
+def make_tool_run(i:int, start:datetime) -> dict:
+    return {
+        "_id": f"job-{i:08d}",
+        "job_id": f"job-{i:08d}",
+        "studio_id": random.choice(STUDIO_IDS),
+        "conversation_id": f"conversation-{i // 5:08d}",
+        "project": "project-0000",
+        "status": "complete",
+        "insert_date_": _timestamp(start),
+        "cost": round(random.random() * 3, 3),
+        "errors": [] if random.random() > 0.05 else [{"body": "Tool failed", "step_name": "api_call"}],
+        "agent_details": {"agent_id": random.choice(AGENT_IDS), "name": "Support agent"},
+        "params": {"query": "lookup order status", "limit": 10},
+    }
+
+
+def make_action(i:int, start:datetime) -> dict:
+    return {
+        "insert_date_": _timestamp(start),
+        "content": {
+            "type": "tool-run",
+            "item_id": f"item-{i:08d}",
+            "tool_run_state": "error" if random.random() < 0.05 else "finished",
+            "original_message_ids": {"action-response": f"msg-{i:08d}"},
+            "output": {"text": "order 1234 is on its way " * 3},
+        },
+    }
+
+
+def measure(build) -> int:
+    """ Bytes still allocated by the object build() returns """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return after - before
+
+
+def run(n:int=100_000) -> dict:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    cases = {
+        "conversations": (make_conversation, ConversationRecord),
+        "tool_runs": (make_tool_run, ToolRunRecord),
+        "actions": (make_action, ActionRecord),
+    }
+    results = {}
+    for name, (make, record_type) in cases.items():
+        # Round-trip through JSON so dicts are built the way a response body would build them
+        payload = json.dumps({"results": [make(i, start) for i in range(n)]})
+        raw_bytes = measure(lambda: json.loads(payload)["results"])
+        compact_bytes = measure(lambda: list(compact_records(json.loads(payload), record_type)))
+        results[name] = {
+            "records": n,
+            "raw_mb": round(raw_bytes / 1024 ** 2, 1),
+            "compact_mb": round(compact_bytes / 1024 ** 2, 1),
+            "saving": round(1 - compact_bytes / raw_bytes, 3),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    for name, result in run().items():
+        print(f"{name:<14} raw {result['raw_mb']:>7} MB  compact {result['compact_mb']:>7} MB  ({result['saving']:.0%} less, {result['records']} records)")
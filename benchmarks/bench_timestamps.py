@@ -0,0 +1,58 @@
+""" Per-record cost of parsing platform timestamps: the previous str_to_datetime path against
+parse_platform_timestamp / parse_platform_timestamps. Run from the repository root so aiworkforce is importable:
+
+    python -m benchmarks.bench_timestamps
+"""
+import random
+import timeit
+from datetime import datetime, timedelta, timezone
+
+import pytz
+
+from aiworkforce.utils import parse_platform_timestamp, parse_platform_timestamps, PLATFORM_TIMESTAMP_FORMAT
+
+
+def str_to_datetime(date_string, from_tz='UTC', to_tz='Australia/Sydney'):
+    """ The implementation previously used by the cost report, kept here as the baseline """
+    if not date_string:
+        return None
+    if 'T' not in date_string:
+        date_string = f"{date_string}T00:00:00"
+    if '.' in date_string:
+        date_string = date_string.split('.')[0]
+
+    if date_string.endswith('Z'):
+        dt = datetime.fromisoformat(date_string.replace('Z', '+00:00'))
+    elif '+' in date_string[-6:] or '-' in date_string[-6:]:
+        dt = datetime.fromisoformat(date_string)
+    else:
+        dt = pytz.timezone(from_tz).localize(datetime.fromisoformat(date_string))
+
+    return dt.astimezone(pytz.timezone(to_tz))
+
+
+def make_timestamps(n:int, days:int=30) -> list:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [(start + timedelta(seconds=random.randrange(days * 86400))).strftime(PLATFORM_TIMESTAMP_FORMAT) for _ in range(n)]
+
+
+def run(n:int=100_000, repeat:int=3) -> dict:
+    values = make_timestamps(n)
+    for value in values[:1000]:
+        assert parse_platform_timestamp(value) == str_to_datetime(value).timestamp()
+
+    cases = {
+        "str_to_datetime": lambda: [str_to_datetime(value) for value in values],
+        "parse_platform_timestamp": lambda: [parse_platform_timestamp(value) for value in values],
+        "parse_platform_timestamps": lambda: parse_platform_timestamps(values),
+    }
+    results = {}
+    for name, case in cases.items():
+        seconds = min(timeit.repeat(case, number=1, repeat=repeat))
+        results[name] = {"records": n, "seconds": round(seconds, 4), "ns_per_record": round(seconds / n * 1e9)}
+    return results
+
+
+if __name__ == "__main__":
+    for name, result in run().items():
+        print(f"{name:<28} {result['ns_per_record']:>8} ns/record  ({result['seconds']}s for {result['records']})")
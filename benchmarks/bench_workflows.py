@@ -0,0 +1,148 @@
+""" Times the example workflows end to end against the offline mock server at several dataset sizes:
+dev -> local sync (full, incremental cold and warm), local -> prod push (full and diff-aware, with 1% of the
+agents edited locally), the conversation cost report and the failure retrigger. Results are written as JSON and
+can be compared against an earlier run:
+
+    python -m benchmarks.bench_workflows --sizes 1000 10000 --output after.json --baseline before.json
+"""
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+from datetime import datetime, timezone
+
+from aiworkforce.client import RelevanceClient, close_clients, use_client
+from aiworkforce.ratelimit import RateLimiter
+from aiworkforce.recovery import RetriggerPipeline
+from aiworkforce.utils import open_object_file, save_object_file
+from benchmarks.mock_server import MockRelevanceAPI
+from examples.from_relevanceai_to_local import get_current_state_from_relevance_ai, sync_changes_from_relevance_ai
+from examples.from_local_to_relevanceai import push_to_relevance_ai_prod, push_changes_to_relevance_ai_prod
+from examples.get_agent_conversation_costs import get_conversation_costs
+
+REGION_ID = "mock"
+DEV_PROJECT_ID = "dev-project"
+PRD_PROJECT_ID = "prd-project"
+API_KEY = "mock-key"
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+WORKFLOWS = ("sync_full", "sync_incremental_cold", "sync_incremental_warm", "push_full", "push_diff", "cost_report", "retrigger")
+
+
+def _edit_local_agents(fraction:float=0.01) -> int:
+    folderpath = "relevance_ai/agents"
+    files = sorted(file for file in os.listdir(folderpath) if file.endswith(".json"))
+    edited = files[:max(1, int(len(files) * fraction))]
+    for file in edited:
+        agent = open_object_file(f"{folderpath}/{file}")
+        agent["system_prompt"] = agent.get("system_prompt", "") + " Edited locally."
+        save_object_file(f"{folderpath}/{file}", agent)
+    return len(edited)
+
+
+def _run_workflow(name:str, api:MockRelevanceAPI):
+    if name == "sync_full":
+        get_current_state_from_relevance_ai(REGION_ID, DEV_PROJECT_ID, API_KEY, PRD_PROJECT_ID)
+    elif name in ("sync_incremental_cold", "sync_incremental_warm"):
+        sync_changes_from_relevance_ai(REGION_ID, DEV_PROJECT_ID, API_KEY, PRD_PROJECT_ID)
+    elif name == "push_full":
+        push_to_relevance_ai_prod(REGION_ID, PRD_PROJECT_ID, API_KEY)
+    elif name == "push_diff":
+        _edit_local_agents()
+        push_changes_to_relevance_ai_prod(REGION_ID, PRD_PROJECT_ID, API_KEY)
+    elif name == "cost_report":
+        asyncio.run(get_conversation_costs(REGION_ID, DEV_PROJECT_ID, api.agent_id, API_KEY, datetime(2020, 1, 1, tzinfo=timezone.utc), datetime(2030, 1, 1, tzinfo=timezone.utc)))
+    elif name == "retrigger":
+        RetriggerPipeline(REGION_ID, DEV_PROJECT_ID, api.agent_id, API_KEY, max_in_flight=50, poll_interval=0.2).run()
+    else:
+        raise ValueError(f"Unknown workflow: {name}")
+
+
+def run_size(size:int, workflows=WORKFLOWS, latency:float=0.0, error_rate:float=0.0, rate:float=0.0) -> list:
+    """ Runs the workflows in order against a fresh mock project of `size` agents, tools and conversations.
+    rate paces the client as RateLimiter would in production; 0 leaves it effectively unlimited """
+    results = []
+    with MockRelevanceAPI(agents=size, tools=size, conversations=size, latency=latency, error_rate=error_rate) as api:
+        for project_id in (DEV_PROJECT_ID, PRD_PROJECT_ID):
+            limiter = RateLimiter(rate=rate, burst=max(int(rate), 1)) if rate else RateLimiter(rate=1e9, burst=10 ** 9, max_rate=1e9)
+            use_client(RelevanceClient(REGION_ID, project_id, API_KEY, pool_size=64, base_url=api.url, rate_limiter=limiter))
+
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir)
+            try:
+                for name in workflows:
+                    requests_before = sum(api.requests.values())
+                    start = time.perf_counter()
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        _run_workflow(name, api)
+                    seconds = time.perf_counter() - start
+                    results.append({
+                        "workflow": name,
+                        "size": size,
+                        "seconds": round(seconds, 3),
+                        "requests": sum(api.requests.values()) - requests_before,
+                    })
+                    print(f"{size:>7} {name:<24} {seconds:>9.2f}s {results[-1]['requests']:>8} requests", file=sys.stderr)
+            finally:
+                os.chdir(cwd)
+        close_clients()
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results:list, baseline:list) -> str:
+    """ Per workflow and size: baseline seconds, current seconds and the ratio (below 1 is faster) """
+    previous = {(row["workflow"], row["size"]): row for row in baseline}
+    lines = [f"{'size':>7} {'workflow':<24} {'baseline':>10} {'current':>10} {'ratio':>7}"]
+    for row in results:
+        before = previous.get((row["workflow"], row["size"]))
+        if before is None:
+            continue
+        ratio = row["seconds"] / before["seconds"] if before["seconds"] else float("nan")
+        lines.append(f"{row['size']:>7} {row['workflow']:<24} {before['seconds']:>9.2f}s {row['seconds']:>9.2f}s {ratio:>7.2f}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the example workflows against the mock Relevance API")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--workflows", nargs="+", default=list(WORKFLOWS), choices=WORKFLOWS)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every mock response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of mock responses failing with a 503")
+    parser.add_argument("--rate", type=float, default=0.0, help="client requests per second per endpoint family, 0 for unlimited")
+    parser.add_argument("--output", default="bench_workflows.json")
+    parser.add_argument("--baseline", help="results file of an earlier run to compare against")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        results.extend(run_size(size, args.workflows, args.latency, args.error_rate, args.rate))
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {"latency": args.latency, "error_rate": args.error_rate, "rate": args.rate},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            print(compare(results, json.load(f)["results"]))
@@ -0,0 +1,392 @@
+""" Offline stand-in for the Relevance AI API, serving a synthetic project over HTTP on localhost.
+
+It implements the endpoints the package calls (agents, studios, conversations, tool jobs, knowledge) closely
+enough for the example workflows to run end to end, with configurable latency, 5xx and 429 rates and dataset
+sizes. It is single tenant: every project id sees the same data. Point a client at it with
+
+    use_client(RelevanceClient(region_id, project_id, api_key, base_url=server.url))
+
+or run it standalone with `python -m benchmarks.mock_server --size 10000` """
+import re
+import json
+import time
+import socket
+import random
+import argparse
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from aiworkforce.instrumentation import endpoint_name
+from aiworkforce.types import ConversationState
+from aiworkforce.utils import PLATFORM_TIMESTAMP_FORMAT
+
+MOCK_PROJECT_ID = "mock-project"
+ERROR_STATES = (ConversationState.ERRORED_PENDING_APPROVAL, ConversationState.UNRECOVERABLE, ConversationState.TIMED_OUT)
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _timestamp(seconds:float) -> str:
+    return (_EPOCH + timedelta(seconds=seconds)).strftime(PLATFORM_TIMESTAMP_FORMAT)
+
+
+def _lookup(record:dict, field:str):
+    """ Resolves a dotted filter field the way the list endpoints do for conversations, where
+    conversation.* lives under metadata and bare fields may refer to the conversation """
+    for root in (record, record.get("metadata", {}), record.get("metadata", {}).get("conversation", {})):
+        value = root
+        for part in field.split("."):
+            if not isinstance(value, dict) or part not in value:
+                value = None
+                break
+            value = value[part]
+        if value is not None:
+            return value
+    return None
+
+
+def _matches(record:dict, condition:dict) -> bool:
+    filter_type = condition.get("filter_type")
+    if filter_type in ("or", "and"):
+        results = (_matches(record, c) for c in condition.get("condition_value", []))
+        return any(results) if filter_type == "or" else all(results)
+    value = _lookup(record, condition.get("field", ""))
+    expected = condition.get("condition_value")
+    operator = condition.get("condition", "==")
+    if filter_type == "exact_match":
+        found = value in expected if isinstance(expected, list) else value == expected
+        return found if operator == "==" else not found
+    if filter_type == "exists":
+        return (value is not None) == (operator == "==")
+    if filter_type in ("numeric", "date"):
+        if value is None:
+            return False
+        return {">=": value >= expected, ">": value > expected, "<=": value <= expected, "<": value < expected}.get(operator, value == expected)
+    if filter_type == "regexp":
+        return value is not None and re.search(expected, str(value)) is not None
+    return True
+
+
+class MockRelevanceAPI:
+    """ Synthetic project of `agents` agents, `tools` tools and `conversations` conversations (all belonging
+    to the first agent, failed_fraction of them errored), each with `actions_per_conversation` studio runs.
+
+    Every response is delayed by latency plus up to latency_jitter seconds; error_rate of requests fail with a
+    503 and throttle_rate with a 429 (Retry-After: 0). Regenerated conversations report running for
+    job_seconds before completing, and tool jobs poll as 'timeout' for job_seconds """
+
+    def __init__(self, agents:int=1000, tools:int=1000, conversations:int=1000, actions_per_conversation:int=5, failed_fraction:float=0.3, latency:float=0.0, latency_jitter:float=0.0, error_rate:float=0.0, throttle_rate:float=0.0, job_seconds:float=0.05, host:str="127.0.0.1", port:int=0, seed:int=0):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.job_seconds = job_seconds
+        self.actions_per_conversation = actions_per_conversation
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = Counter()
+
+        self.agents = {}
+        for i in range(agents):
+            agent_id = f"agent-{i:06d}"
+            self.agents[agent_id] = {
+                "agent_id": agent_id,
+                "name": f"Agent {i}",
+                "project": MOCK_PROJECT_ID,
+                "system_prompt": f"You are agent {i}. " * 20,
+                "actions": [{"chain_id": f"tool-{(i + k) % max(tools, 1):06d}", "project": MOCK_PROJECT_ID} for k in range(3)],
+                "update_date_": _timestamp(i),
+            }
+        self.tools = {}
+        for i in range(tools):
+            studio_id = f"tool-{i:06d}"
+            self.tools[studio_id] = {
+                "studio_id": studio_id,
+                "title": f"Tool {i}",
+                "project": MOCK_PROJECT_ID,
+                "params_schema": {"properties": {"query": {"type": "string"}}},
+                "transformations": {"steps": [{"transformation": "prompt_completion", "params": {"prompt": "{{query}} " * 10}}]},
+                "update_date_": _timestamp(i),
+            }
+        self.agent_id = next(iter(self.agents), "agent-000000")
+        self.conversations = {}
+        for i in range(conversations):
+            conversation_id = f"conversation-{i:08d}"
+            state = self.random.choice(ERROR_STATES) if self.random.random() < failed_fraction else ConversationState.COMPLETED
+            self.conversations[conversation_id] = {
+                "knowledge_set": conversation_id,
+                "insert_datetime": _timestamp(i * 60),
+                "update_datetime": _timestamp(i * 60 + 600),
+                "metadata": {
+                    "_id": f"{self.agent_id}_-_{conversation_id}",
+                    "conversation": {
+                        "agent_id": self.agent_id,
+                        "title": f"Conversation {i}",
+                        "state": state,
+                        "is_debug_mode_task": False,
+                        "custom_metadata": [{"title": "customer", "value": f"c{i % 100}"}],
+                    },
+                },
+            }
+        self.regenerating = {}
+        self.jobs = {}
+        self.knowledge = {}
+        self._listings = {}
+        self._version = 0
+
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockRelevanceAPI":
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # data helpers
+
+    def _changed(self):
+        self._version += 1
+
+    def _listing(self, name:str, records:dict, params:dict) -> list:
+        """ Filtered and sorted snapshot of a collection, reused across the pages of one listing """
+        key = (name, json.dumps(params.get("filters")), json.dumps(params.get("sort")), self._version)
+        listing = self._listings.get(key)
+        if listing is None:
+            # Single tenant: project filters are ignored
+            conditions = [c for c in params.get("filters") or [] if c.get("field") != "project"]
+            listing = [record for record in records.values() if all(_matches(record, c) for c in conditions)]
+            for sort in reversed(params.get("sort") or []):
+                for field, direction in sort.items():
+                    listing.sort(key=lambda r: str(_lookup(r, field) or ""), reverse=direction == "desc")
+            if len(self._listings) > 32:
+                self._listings.clear()
+            self._listings[key] = listing
+        return listing
+
+    @staticmethod
+    def _page(listing:list, params:dict) -> dict:
+        page_size = int(params.get("page_size") or 20)
+        page = int(params.get("page") or 1)
+        results = listing[(page - 1) * page_size:page * page_size]
+        fields = params.get("select_fields")
+        if fields:
+            results = [{field: record[field] for field in fields if field in record} for record in results]
+        return {"results": results}
+
+    def _conversation_state(self, conversation:dict) -> dict:
+        conversation_id = conversation["knowledge_set"]
+        completes_at = self.regenerating.get(conversation_id)
+        if completes_at is not None and time.monotonic() >= completes_at:
+            with self.lock:
+                self.regenerating.pop(conversation_id, None)
+                conversation["metadata"]["conversation"]["state"] = ConversationState.COMPLETED
+        return conversation
+
+    def studio_history(self, conversation_id:str) -> list:
+        index = int(conversation_id.rsplit("-", 1)[-1]) if conversation_id[-1:].isdigit() else 0
+        rng = random.Random(index)
+        return [
+            {
+                "studio_id": f"tool-{rng.randrange(max(len(self.tools), 1)):06d}",
+                "conversation_id": conversation_id,
+                "insert_date_": _timestamp(index * 60 + k * 30),
+                "cost": round(rng.random() * 5, 2),
+                "errors": [{"body": "tool failed"}] if rng.random() < 0.05 else [],
+            }
+            for k in range(self.actions_per_conversation)
+        ]
+
+    def actions(self, conversation_id:str) -> list:
+        conversation = self.conversations.get(conversation_id)
+        index = int(conversation_id.rsplit("-", 1)[-1]) if conversation_id[-1:].isdigit() else 0
+        actions = []
+        for k in range(self.actions_per_conversation):
+            actions.append({"insert_date_": _timestamp(index * 60 + k * 30), "content": {"type": "tool-run", "item_id": f"{conversation_id}-item-{k}", "tool_run_state": "finished", "original_message_ids": {"action-response": f"{conversation_id}-msg-{k}"}}})
+        if conversation and conversation["metadata"]["conversation"]["state"] in ERROR_STATES:
+            actions.append({"insert_date_": _timestamp(index * 60 + 3000), "content": {"type": "tool-run", "item_id": f"{conversation_id}-item-error", "tool_run_state": "error", "original_message_ids": {"action-error": f"{conversation_id}-msg-error"}}})
+        return actions
+
+    # request handling
+
+    def handle(self, method:str, path:str, params:dict, body:dict):
+        """ Returns (status, response json) """
+        segments = path.strip("/").split("/")
+        if path == "/agents/list":
+            return 200, self._page(self._listing("agents", self.agents, {**params, **body}), {**params, **body})
+        if path == "/studios/list":
+            return 200, self._page(self._listing("tools", self.tools, params), params)
+        if path == "/agents/tools/list":
+            results = []
+            for agent_id in body.get("agent_ids", []):
+                for action in self.agents.get(agent_id, {}).get("actions", []):
+                    tool = self.tools.get(action.get("chain_id"), {})
+                    results.append({"studio_id": action.get("chain_id"), "title": tool.get("title"), "agent_id": agent_id})
+            return 200, {"results": results}
+        if path == "/agents/upsert":
+            with self.lock:
+                agent = {key: value for key, value in body.items() if key != "partial_update"}
+                self.agents[agent.get("agent_id") or f"agent-new-{len(self.agents)}"] = agent
+                self._changed()
+            return 200, {"agent_id": agent.get("agent_id")}
+        if path == "/studios/bulk_update":
+            with self.lock:
+                for tool in body.get("updates", []):
+                    self.tools[tool.get("studio_id")] = tool
+                self._changed()
+            return 200, {"updated": len(body.get("updates", []))}
+        if path == "/agents/conversations/list":
+            listing = self._listing("conversations", self.conversations, params)
+            response = self._page(listing, params)
+            response["results"] = [self._conversation_state(conversation) for conversation in response["results"]]
+            return 200, response
+        if path == "/agents/conversations/studios/list":
+            return 200, self._page(self.studio_history(params.get("conversation_id", "")), params)
+        if len(segments) == 5 and segments[0] == "agents" and segments[2] == "tasks" and segments[4] == "view":
+            return 200, {"results": self.actions(segments[3])}
+        if path == "/agents/trigger":
+            conversation_id = body.get("conversation_id")
+            if body.get("action") == "regenerate" and conversation_id in self.conversations:
+                with self.lock:
+                    self.conversations[conversation_id]["metadata"]["conversation"]["state"] = ConversationState.RUNNING
+                    self.regenerating[conversation_id] = time.monotonic() + self.job_seconds
+            return 200, {"job_info": {"job_id": f"job-{self.random.getrandbits(32):08x}"}, "conversation_id": conversation_id}
+        if len(segments) == 3 and segments[0] == "studios" and segments[2] == "trigger_async":
+            job_id = f"job-{self.random.getrandbits(48):012x}"
+            with self.lock:
+                self.jobs[job_id] = (time.monotonic() + self.job_seconds, body.get("params"))
+            return 200, {"job_id": job_id}
+        if len(segments) == 4 and segments[0] == "studios" and segments[2] == "async_poll":
+            job = self.jobs.get(segments[3])
+            if job is None:
+                return 404, {"message": "job not found"}
+            done_at, inputs = job
+            if time.monotonic() < done_at:
+                return 200, {"type": "timeout"}
+            return 200, {"type": "complete", "updates": [{"type": "chain-success", "output": {"output": {"echo": inputs}}}]}
+        if path == "/studios/run_history/list":
+            return 200, {"results": []}
+        if path == "/knowledge/sets/list":
+            return 200, {"results": [{"knowledge_set": name} for name in self.knowledge]}
+        if path == "/knowledge/add":
+            with self.lock:
+                rows = self.knowledge.setdefault(body.get("knowledge_set"), {})
+                for document in body.get("data", []):
+                    rows[document["document_id"]] = {"document_id": document["document_id"], "data": document["value"]}
+            return 200, {"inserted": len(body.get("data", []))}
+        if path == "/knowledge/list":
+            rows = list(self.knowledge.get(body.get("knowledge_set"), {}).values())
+            return 200, self._page(rows, body)
+        if path == "/knowledge/delete":
+            with self.lock:
+                rows = self.knowledge.get(body.get("knowledge_set"), {})
+                for document_id in [document_id for document_id, row in rows.items() if all(_matches(row, c) for c in body.get("filters", []))]:
+                    del rows[document_id]
+            return 200, {}
+        if len(segments) == 4 and segments[:2] == ["knowledge", "sets"] and segments[3] == "get_metadata":
+            return 200, {"metadata": {"count": len(self.knowledge.get(segments[2], {}))}}
+        return 404, {"message": f"mock server does not implement {method} {path}"}
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out in separate writes; without this each response waits on a delayed ACK
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def _respond(self):
+                parsed = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                raw_body = self.rfile.read(length) if length else b""
+                api.requests[(self.command, endpoint_name(parsed.path))] += 1
+
+                if api.latency or api.latency_jitter:
+                    time.sleep(api.latency + api.random.random() * api.latency_jitter)
+                roll = api.random.random()
+                if roll < api.error_rate:
+                    return self._send(503, {"message": "mock server error"})
+                if roll < api.error_rate + api.throttle_rate:
+                    return self._send(429, {"message": "mock rate limit"}, {"Retry-After": "0"})
+
+                try:
+                    status, response = api.handle(self.command, parsed.path, _params(parsed.query), json.loads(raw_body) if raw_body else {})
+                except Exception as e:
+                    status, response = 500, {"message": repr(e)}
+                self._send(status, response)
+
+            def _send(self, status:int, response:dict, headers:dict=None):
+                payload = json.dumps(response).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = _respond
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def _params(query:str) -> dict:
+    """ Query params with JSON values decoded. Some callers send the whole params dict as one JSON string """
+    if not query:
+        return {}
+    raw = unquote(query)
+    if raw.startswith("{"):
+        try:
+            params = json.loads(raw)
+        except ValueError:
+            params = {}
+    else:
+        params = {key: values[-1] for key, values in parse_qs(query).items()}
+    for key, value in params.items():
+        if isinstance(value, str) and value[:1] in "[{":
+            try:
+                params[key] = json.loads(value)
+            except ValueError:
+                pass
+    return params
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--size", type=int, default=1000, help="agents, tools and conversations to generate")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    api = MockRelevanceAPI(args.size, args.size, args.size, latency=args.latency, latency_jitter=args.latency_jitter, error_rate=args.error_rate, throttle_rate=args.throttle_rate, port=args.port)
+    print(f"Mock Relevance API on {api.url} ({args.size} agents/tools/conversations)")
+    try:
+        api.server.serve_forever()
+    except KeyboardInterrupt:
+        api.stop()
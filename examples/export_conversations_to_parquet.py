@@ -0,0 +1,25 @@
+from aiworkforce.export import export_conversations, open_dataset
+
+
+if __name__ == "__main__":
+    import os
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    region_id = os.getenv("region_id")
+    project_id = os.getenv("project_id")
+    agent_id = os.getenv("agent_id")
+    api_key = os.getenv("api_key")
+    export_path = os.getenv("export_path", "exports")
+    # Rerunning replaces the partitions this export writes to instead of duplicating their rows
+    existing_data = os.getenv("existing_data", "delete_matching")
+
+    counts = export_conversations(region_id, project_id, agent_id, api_key, export_path, existing_data=existing_data)
+    print(counts)
+
+    # Read back lazily: only the cost column of this agent's partitions is loaded
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    history = open_dataset(export_path, "studio_history")
+    costs = history.to_table(columns=["cost"], filter=ds.field("agent_id") == agent_id)
+    print(f"total cost: {pc.sum(costs['cost']).as_py()}")
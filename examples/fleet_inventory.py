@@ -0,0 +1,24 @@
+import json
+
+from aiworkforce.fleet import Fleet, load_fleet_credentials
+
+
+if __name__ == "__main__":
+    import os
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    # JSON list of {"region_id", "project_id", "api_key", "name"} for every client project
+    credentials = load_fleet_credentials(os.getenv("fleet_credentials", "fleet_credentials.json"))
+
+    with Fleet(credentials, region_concurrency=int(os.getenv("region_concurrency", "8"))) as fleet:
+        agents = fleet.agents()
+        tools = fleet.tools()
+        costs = fleet.conversation_costs(agents=agents)
+
+        print(f"{len(credentials)} projects in {len(fleet.regions)} regions: {len(agents)} agents, {len(tools)} tools")
+        for error in fleet.errors:
+            print(f"failed: {error['_project_name']} {error['operation']}: {error['error']}")
+
+    with open("fleet_inventory.json", "w") as f:
+        json.dump({"agents": agents, "tools": tools, "conversation_costs": costs}, f)
@@ -1,5 +1,6 @@
 from aiworkforce.agent import create_agent
 from aiworkforce.tool import create_tools
+from aiworkforce.deploy import plan_deployment, format_plan, execute_deployment, plan_graph_deployment, execute_graph_deployment
 from aiworkforce.utils import open_all_object_files
 
 def push_to_relevance_ai_prod(region_id, prd_project_id, prd_api_key):
@@ -12,6 +13,35 @@ def push_to_relevance_ai_prod(region_id, prd_project_id, prd_api_key):
 
     create_tools(tools, region_id, prd_project_id, prd_api_key)
 
+def push_changes_to_relevance_ai_prod(region_id, prd_project_id, prd_api_key, dry_run=False):
+    """ Diff-aware version of push_to_relevance_ai_prod: only created/modified objects are pushed """
+    agents = open_all_object_files("relevance_ai/agents")
+    tools = open_all_object_files("relevance_ai/tools")
+
+    plan = plan_deployment(agents, tools, region_id, prd_project_id, prd_api_key)
+    print(format_plan(plan))
+    if dry_run:
+        return
+
+    for timing in execute_deployment(plan, region_id, prd_project_id, prd_api_key):
+        print(f"{timing['type']:<6} {timing['id']}  {timing['status']}  {timing['seconds']}s  {timing.get('error', '')}")
+
+def push_graph_to_relevance_ai_prod(region_id, prd_project_id, prd_api_key, dry_run=False):
+    """ Like push_changes_to_relevance_ai_prod, but tools are deployed before the agents that use them, in
+    dependency waves, and a wave that fails is rolled back to what was deployed before """
+    agents = open_all_object_files("relevance_ai/agents")
+    tools = open_all_object_files("relevance_ai/tools")
+
+    plan = plan_graph_deployment(agents, tools, region_id, prd_project_id, prd_api_key)
+    print(format_plan(plan))
+    if dry_run:
+        return
+
+    for wave in execute_graph_deployment(plan, region_id, prd_project_id, prd_api_key):
+        print(f"wave {wave['wave']}: {wave['status']}  {len(wave['objects'])} objects  {wave.get('seconds', '')}")
+        for error in wave.get("errors", []):
+            print(f"  {error}")
+
 if __name__ == "__main__":
     import os
     from dotenv import load_dotenv
@@ -21,4 +51,9 @@ if __name__ == "__main__":
     prd_project_id = os.getenv("prd_project_id")
     prd_api_key = os.getenv("prd_api_key")
 
-    push_to_relevance_ai_prod(region_id, prd_project_id, prd_api_key)
+    if os.getenv("graph_deploy", "").lower() in ("1", "true", "yes"):
+        push_graph_to_relevance_ai_prod(region_id, prd_project_id, prd_api_key, dry_run=os.getenv("dry_run", "").lower() in ("1", "true", "yes"))
+    elif os.getenv("diff_deploy", "").lower() in ("1", "true", "yes"):
+        push_changes_to_relevance_ai_prod(region_id, prd_project_id, prd_api_key, dry_run=os.getenv("dry_run", "").lower() in ("1", "true", "yes"))
+    else:
+        push_to_relevance_ai_prod(region_id, prd_project_id, prd_api_key)
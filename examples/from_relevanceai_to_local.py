@@ -1,5 +1,7 @@
-from aiworkforce.agent import get_all_agents
-from aiworkforce.tool import get_all_tools
+from aiworkforce.agent import get_all_agents, iter_agent_ids, iter_agents
+from aiworkforce.tool import get_all_tools, iter_tool_ids, iter_tools
+from aiworkforce.instrumentation import enable_call_stats
+from aiworkforce.sync import load_sync_manifest, sync_objects_to_local
 from aiworkforce.utils import save_all_objects, update_objects_metadata, remove_objects_changing_fields, remove_local_files_not_in_objects
 
 def get_current_state_from_relevance_ai(region_id, dev_project_id, dev_api_key, prd_project_id):
@@ -25,6 +27,17 @@ def get_current_state_from_relevance_ai(region_id, dev_project_id, dev_api_key,
     # remove_local_files_not_in_objects(knowledge, "knowledge", "relevance_ai/knowledge")
     # save_all_objects(knowledge, "relevance_ai/knowledge", "knowledge")
 
+def sync_changes_from_relevance_ai(region_id, dev_project_id, dev_api_key, prd_project_id, prune=True):
+    """ Incremental version of get_current_state_from_relevance_ai: only objects updated since the last sync are
+    fetched and only changed files rewritten. With prune, remote deletions are found from an id-only listing """
+    for object_type, iter_objects, iter_ids in (("agents", iter_agents, iter_agent_ids), ("tools", iter_tools, iter_tool_ids)):
+        folderpath = f"relevance_ai/{object_type}"
+        updated_since = load_sync_manifest(folderpath)["last_sync"]
+        objects = iter_objects(region_id, dev_project_id, dev_api_key, updated_since=updated_since)
+        current_ids = iter_ids(region_id, dev_project_id, dev_api_key) if prune else None
+        stats = sync_objects_to_local(objects, folderpath, object_type, prd_project_id, prune=prune, current_ids=current_ids)
+        print(f"{object_type}: {stats}")
+
 if __name__ == "__main__":
     import os
     from dotenv import load_dotenv
@@ -35,4 +48,10 @@ if __name__ == "__main__":
     dev_api_key = os.getenv("dev_api_key")
     prd_project_id = os.getenv("prd_project_id")
 
-    get_current_state_from_relevance_ai(region_id, dev_project_id, dev_api_key, prd_project_id)
+    if os.getenv("call_stats", "").lower() in ("1", "true", "yes"):
+        enable_call_stats()
+
+    if os.getenv("incremental_sync", "").lower() in ("1", "true", "yes"):
+        sync_changes_from_relevance_ai(region_id, dev_project_id, dev_api_key, prd_project_id)
+    else:
+        get_current_state_from_relevance_ai(region_id, dev_project_id, dev_api_key, prd_project_id)
@@ -1,9 +1,11 @@
-import statistics as stats
-import pytz
-from datetime import datetime, timedelta
-from collections import Counter
+import asyncio
+from datetime import datetime
 
-from aiworkforce.conversation import get_conversations_between_dates, get_list_conversation_studio_history
+from aiworkforce.utils import conversation_id_of, get_timezone
+from aiworkforce.aio import gather_bounded, get_conversations_between_dates, get_list_conversation_studio_history
+from aiworkforce.analytics import ConversationCostTable
+from aiworkforce.cache import ResponseCache, use_cache
+from aiworkforce.instrumentation import enable_call_stats
 
 
 def str_to_datetime(date_string, from_tz='UTC', to_tz='Australia/Sydney'):
@@ -19,41 +21,34 @@ def str_to_datetime(date_string, from_tz='UTC', to_tz='Australia/Sydney'):
     elif '+' in date_string[-6:] or '-' in date_string[-6:]:
         dt = datetime.fromisoformat(date_string)
     else:
-        dt = pytz.timezone(from_tz).localize(datetime.fromisoformat(date_string))
+        dt = get_timezone(from_tz).localize(datetime.fromisoformat(date_string))
     
-    return dt.astimezone(pytz.timezone(to_tz))
+    return dt.astimezone(get_timezone(to_tz))
 
 
-def analyze_conversation(results):
-    summary = {
-        "task_id": "",
-        # "total_actions": len(results), # TODO: not accurate
-        "errored_actions": 0,
-        "total_cost": 0,
-        "start_timestamp": pytz.timezone('UTC').localize(datetime.now() + timedelta(days=10000)),
-        "end_timestamp": pytz.timezone('UTC').localize(datetime.now() - timedelta(days=10000)),
-        "runtime_minutes": 0,
-    }
+async def fetch_studio_history(region_id, project_id, api_key, agent_id, convo):
+    conversation_id = conversation_id_of(convo)
+    conversation_state = convo.get('metadata', {}).get('conversation', {}).get('state')
+    return convo, await get_list_conversation_studio_history(region_id, project_id, api_key, agent_id, conversation_id, conversation_state=conversation_state)
 
-    for result in results:
-        timestamp = str_to_datetime(result.get("insert_date_"))
-        if timestamp:
-            summary["start_timestamp"] = min(summary["start_timestamp"], timestamp)
-            summary["end_timestamp"] = max(summary["end_timestamp"], timestamp)
-        summary["duration_minutes"] = int((summary["end_timestamp"] - summary["start_timestamp"]).total_seconds() / 60)
-        if len(result.get("errors", [])) > 0:
-            summary["errored_actions"] += 1
 
-        summary["total_cost"] += result.get("cost", 0)
-
-    summary["total_cost"] = round(summary["total_cost"], 1)
-    return summary
-
-def clean_metadata(metadata:list):
-    cleaned = []
-    for i in metadata:
-        cleaned.append({i['title']: i['value']})
-    return cleaned
+async def get_conversation_costs(region_id, project_id, agent_id, api_key, from_timestamp, to_timestamp, concurrency=20):
+    full = await get_conversations_between_dates(
+        region_id,
+        project_id,
+        agent_id,
+        api_key,
+        from_timestamp,
+        to_timestamp
+    )
+    histories = await gather_bounded(
+        (fetch_studio_history(region_id, project_id, api_key, agent_id, convo) for convo in full['results']),
+        limit=concurrency
+    )
+    table = ConversationCostTable()
+    for convo, studio_results in histories:
+        table.add_conversation(convo, studio_results)
+    return table
 
 
 if __name__ == "__main__":
@@ -67,41 +62,22 @@ if __name__ == "__main__":
     agent_id = os.getenv("agent_id")
     api_key = os.getenv("api_key")
 
+    # Per-endpoint call counts and latency histogram, printed when the script exits
+    if os.getenv("call_stats", "").lower() in ("1", "true", "yes"):
+        enable_call_stats()
+
+    # Studio history of completed conversations never changes, so keep it between report runs
+    cache = use_cache(ResponseCache(os.getenv("cache_path", "aiworkforce_cache.sqlite")))
+
     timezone = "Australia/Sydney"
     from_timestamp = str_to_datetime("2023-01-01", from_tz=timezone, to_tz="UTC")
     to_timestamp = str_to_datetime("2030-01-01", from_tz=timezone, to_tz="UTC")
 
-    response = get_conversations_between_dates(
-        region_id,
-        project_id,
-        agent_id,
-        api_key,
-        from_timestamp,
-        to_timestamp
-    )
-
-    full = response.json()
-    convos = []
-    for convo in full['results']:
-        conversation_id = convo['metadata']['_id'].split("_-_")[1]
-        studio_results = get_list_conversation_studio_history(region_id, project_id, api_key, agent_id, conversation_id)
-        summary = analyze_conversation(studio_results)
-
-        summary['task_id'] = convo.get('knowledge_set', '')
-        summary['task_name'] = convo.get('metadata', {}).get('conversation', {}).get('title', '')
-        summary['task_state'] = convo.get('metadata', {}).get('conversation', {}).get('state', 'unknown')
-        summary['metadata'] = clean_metadata(convo.get('metadata', {}).get('conversation', {}).get('custom_metadata', []))
-        convos.append(summary)
-
-    conversation_credits = [convo['total_cost'] for convo in convos]
-    aggs = {
-        "total_credits": int(sum(conversation_credits)),
-        "total_conversations": len(convos),
-        "median": round(stats.median(conversation_credits),2),
-        "average": round(stats.mean(conversation_credits),2),
-        "task_states": Counter(convo['task_state'] for convo in convos)
-    }
+    table = asyncio.run(get_conversation_costs(region_id, project_id, agent_id, api_key, from_timestamp, to_timestamp))
+    convos = table.conversation_rows(tz=timezone)
+    aggs = table.aggregates()
     print(aggs)
+    print(f"cache: {cache.stats()}")
     with open(f'agent_{agent_id}_conversation_costs.json', 'w') as f:
         json.dump(convos, f)
 
@@ -0,0 +1,17 @@
+from aiworkforce.knowledge_sync import sync_all_knowledge
+
+
+if __name__ == "__main__":
+    import os
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    region_id = os.getenv("region_id")
+    dev = (region_id, os.getenv("dev_project_id"), os.getenv("dev_api_key"))
+    prd = (region_id, os.getenv("prd_project_id"), os.getenv("prd_api_key"))
+    dry_run = os.getenv("dry_run", "").lower() in ("1", "true", "yes")
+
+    for result in sync_all_knowledge(dev, prd, dry_run=dry_run):
+        print(f"{result['knowledge_set']}: +{result['added']} ~{result['updated']} -{result['deleted']} ={result['unchanged']}")
+        for failure in result.get("failures", []):
+            print(f"  failed {failure['rows']} rows: {failure['error']}")
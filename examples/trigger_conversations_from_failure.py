@@ -1,9 +1,9 @@
 import os
-import time
 from dotenv import load_dotenv
 
-from aiworkforce.types import ConversationState
-from aiworkforce.conversation import get_conversations, retrigger_conversation_after_message, get_conversation_actions
+from aiworkforce.client import RelevanceClient, use_client
+from aiworkforce.ratelimit import RateLimiter
+from aiworkforce.recovery import RetriggerPipeline, DEFAULT_ERROR_STATES
 
 
 if __name__ == "__main__":
@@ -14,39 +14,25 @@ if __name__ == "__main__":
     agent_id = os.getenv("dev_agent_id")
     api_key = os.getenv("dev_api_key")
 
-    error_states = [
-        ConversationState.ERRORED_PENDING_APPROVAL,
-        ConversationState.UNRECOVERABLE,
-        ConversationState.TIMED_OUT
-    ]
-
-    # STEP 1: Get failed conversation metadata
-    # NOTE: can't get conversation filters to work, so simply get all and filter afterwards
-    conversations = get_conversations(region_id, project_id, agent_id, api_key).get('results', [])
-    failed_conversations = [c for c in conversations if c.get('metadata', {}).get('conversation', {}).get('state', '') in error_states]
-
-    for conversation_metadata in failed_conversations:
-        # STEP 2: Get the conversation messages (actions)
-        conversation_id = conversation_metadata.get('knowledge_set', None)
-        conversation = get_conversation_actions(region_id, project_id, agent_id, conversation_id, api_key).get('results', [])
-
-        # STEP 3: Find the message ID of the action-response 1 before the last action-error
-        prev_event_id = None
-        for i in range(len(conversation) - 1, -1, -1):
-            if conversation[i].get('content', {}).get('tool_run_state', '') == 'error':
-                prev_event_ids = conversation[i - 1].get('content', {}).get('original_message_ids', {})
-                # Get the last id from the previous event
-                prev_event_id = prev_event_ids.get('action-response', prev_event_ids.get('action-error', prev_event_ids.get('agent-error', conversation[i - 1].get('content', {}).get('item_id', None))))
-                if prev_event_id is not None:
-                    break
-        if prev_event_id is None:
-            print(f"No failed tool run state was found, skipping conversation: {conversation_id} with state: {conversation_metadata.get('metadata', {}).get('conversation', {}).get('state', '')}")
-            continue
-
-        # STEP 4: Trigger the conversation from the message ID
-        print(f"Triggering conversation {conversation_id} from after message ID: {prev_event_id}")
-        _ = retrigger_conversation_after_message(project_id, region_id, agent_id, conversation_id, prev_event_id, api_key)
-        # STEP 5: Add a delay to not get rate limited...
-        # NOTE: You can trigger all the conversations at once without the API returning a rate limit error
-        # However, internal tools the agent is using (such as API calls or LLM queries) including the agent itself, may through a rate limit error during runtime.
-        time.sleep(20)
+    # Retriggers are paced by the client's adaptive rate limiter, which backs off on 429s and honours Retry-After.
+    # trigger_rate is a ceiling: the trigger family never runs faster than it, even after a long run of successes.
+    # NOTE: The API itself rarely rate limits triggers, but internal tools the agent is using (such as API calls or LLM queries)
+    # including the agent itself, may throw a rate limit error during runtime - lower the trigger rate or max_in_flight if that happens.
+    trigger_rate = float(os.getenv("trigger_rate_per_second", "1"))
+    use_client(RelevanceClient(region_id, project_id, api_key, rate_limiter=RateLimiter(family_rates={"agents/trigger": trigger_rate})))
+
+    # STEP 1: List the failed conversations (filtered by state on the server)
+    # STEP 2: Get the conversation messages (actions)
+    # STEP 3: Find the message ID of the action-response 1 before the last action-error
+    # STEP 4: Trigger the conversation from the message ID, keeping at most max_in_flight running at once
+    pipeline = RetriggerPipeline(
+        region_id,
+        project_id,
+        agent_id,
+        api_key,
+        states=DEFAULT_ERROR_STATES,
+        max_in_flight=int(os.getenv("max_in_flight", "10")),
+        checkpoint_path=f"retrigger_{agent_id}.checkpoint.jsonl",
+        dry_run=os.getenv("dry_run", "").lower() in ("1", "true", "yes"),
+    )
+    print(pipeline.run())
@@ -0,0 +1,35 @@
+import asyncio
+
+from aiworkforce.aio import gather_bounded, run_sync
+
+
+def test_gather_bounded_respects_limit_and_keeps_order():
+    running = 0
+    peak = 0
+
+    async def job(i):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01 * (10 - i))
+        running -= 1
+        return i
+
+    results = asyncio.run(gather_bounded((job(i) for i in range(10)), limit=3))
+    assert results == list(range(10))
+    assert peak == 3
+
+
+def test_gather_bounded_return_exceptions():
+    async def job(i):
+        if i == 1:
+            raise ValueError(i)
+        return i
+
+    results = asyncio.run(gather_bounded((job(i) for i in range(3)), limit=2, return_exceptions=True))
+    assert results[0] == 0 and results[2] == 2
+    assert isinstance(results[1], ValueError)
+
+
+def test_run_sync_runs_blocking_call():
+    assert asyncio.run(run_sync(sum, [1, 2, 3])) == 6
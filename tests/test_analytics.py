@@ -0,0 +1,81 @@
+from collections import Counter
+
+from aiworkforce.analytics import ConversationCostTable
+
+
+def conversation(conversation_id:str, title:str, state:str, custom_metadata=()) -> dict:
+    return {"knowledge_set": conversation_id, "metadata": {"conversation": {"title": title, "state": state, "custom_metadata": list(custom_metadata)}}}
+
+
+def run(insert_date:str, cost:float, errors=None) -> dict:
+    return {"insert_date_": insert_date, "cost": cost, "errors": errors}
+
+
+def cost_table() -> ConversationCostTable:
+    table = ConversationCostTable()
+    table.add_conversation(
+        conversation("c1", "First", "completed", [{"title": "team", "value": "sales"}]),
+        {"results": [run("2024-01-01T00:00:00Z", 1.5), run("2024-01-01T00:30:00.000Z", 2.0, errors=["boom"])]},
+    )
+    table.add_conversation(conversation("c2", "No runs", "running"), {"results": []})
+    table.add_conversation(conversation("c3", "Bad timestamp", "completed"), [run("not a date", 4.0)])
+    return table
+
+
+def test_conversation_rows():
+    assert cost_table().conversation_rows() == [
+        {
+            "task_id": "c1",
+            "task_name": "First",
+            "task_state": "completed",
+            "metadata": [{"team": "sales"}],
+            "errored_actions": 1,
+            "total_cost": 3.5,
+            "start_timestamp": "2024-01-01T00:00:00+00:00",
+            "end_timestamp": "2024-01-01T00:30:00+00:00",
+            "duration_minutes": 30,
+        },
+        {
+            "task_id": "c2",
+            "task_name": "No runs",
+            "task_state": "running",
+            "metadata": [],
+            "errored_actions": 0,
+            "total_cost": 0.0,
+            "start_timestamp": None,
+            "end_timestamp": None,
+            "duration_minutes": 0,
+        },
+        {
+            "task_id": "c3",
+            "task_name": "Bad timestamp",
+            "task_state": "completed",
+            "metadata": [],
+            "errored_actions": 0,
+            "total_cost": 4.0,
+            "start_timestamp": None,
+            "end_timestamp": None,
+            "duration_minutes": 0,
+        },
+    ]
+
+
+def test_aggregates():
+    assert cost_table().aggregates() == {
+        "total_credits": 7,
+        "total_conversations": 3,
+        "total_actions": 3,
+        "errored_actions": 1,
+        "median": 3.5,
+        "average": 2.5,
+        "cost_percentiles": {50: 3.5, 90: 3.9, 99: 3.99},
+        "runtime_minutes_percentiles": {50: 0.0, 90: 24.0, 99: 29.4},
+        "task_states": Counter({"completed": 2, "running": 1}),
+    }
+
+
+def test_readding_a_conversation_appends_its_runs():
+    table = cost_table()
+    table.add_conversation(conversation("c2", "No runs", "running"), [run("2024-01-02T00:00:00Z", 1.0)])
+    assert len(table) == 3
+    assert [row["total_cost"] for row in table.conversation_rows()] == [3.5, 1.0, 4.0]
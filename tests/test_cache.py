@@ -0,0 +1,54 @@
+import pytest
+
+from aiworkforce.cache import ResponseCache, cached_call, use_cache
+from aiworkforce.types import ConversationState
+
+
+class FakeResponse:
+    def __init__(self, status_code:int, body):
+        self.status_code = status_code
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = use_cache(ResponseCache(str(tmp_path / "cache.sqlite")))
+    yield cache
+    use_cache(None)
+    cache.close()
+
+
+def test_server_error_is_not_cached(cache):
+    responses = [FakeResponse(500, {"message": "Internal server error"}), FakeResponse(200, {"results": [{"cost": 1}]})]
+    fetch = lambda: responses.pop(0)
+
+    first = cached_call("/agents/conversations/studios/list", {"conversation_id": "c1"}, fetch, ConversationState.COMPLETED)
+    second = cached_call("/agents/conversations/studios/list", {"conversation_id": "c1"}, fetch, ConversationState.COMPLETED)
+
+    assert first == {"message": "Internal server error"}
+    assert second == {"results": [{"cost": 1}]}
+    assert cache.writes == 1
+
+
+def test_ok_response_is_served_from_cache(cache):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return FakeResponse(200, {"results": []})
+
+    for _ in range(3):
+        assert cached_call("/studios/run_history/list", {"tool_id": "t1"}, fetch) == {"results": []}
+    assert len(calls) == 1
+    assert cache.hits == 2
+
+
+def test_transform_applies_before_storing(cache):
+    fetch = lambda: FakeResponse(200, {"results": [3, 1, 2]})
+    transform = lambda result: {"results": sorted(result["results"])}
+
+    assert cached_call("/view", {}, fetch, transform=transform) == {"results": [1, 2, 3]}
+    assert cached_call("/view", {}, fetch) == {"results": [1, 2, 3]}
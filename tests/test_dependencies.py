@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from aiworkforce import dependencies
+from aiworkforce.dependencies import build_agent_tool_index
+
+
+AGENT_TOOLS = {
+    "a1": ["t1", "t2"],
+    "a2": ["t2"],
+    "a3": [],
+    "a4": ["t3"],
+}
+
+
+class FakeToolsList:
+    """ agents/tools/list stand-in; with attributed, each returned tool carries the agent_id it belongs to """
+
+    def __init__(self, attributed:bool):
+        self.attributed = attributed
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def __call__(self, agent_ids, region_id, project_id, api_key):
+        with self.lock:
+            self.requests.append(list(agent_ids))
+        return [
+            {"studio_id": tool_id, **({"agent_id": agent_id} if self.attributed else {})}
+            for agent_id in agent_ids
+            for tool_id in AGENT_TOOLS[agent_id]
+        ]
+
+
+def fake_tools_list(monkeypatch, attributed:bool) -> FakeToolsList:
+    tools_list = FakeToolsList(attributed)
+    monkeypatch.setattr(dependencies, "get_many_agents_tool_metadata", tools_list)
+    return tools_list
+
+
+def assert_index(index):
+    assert index.to_dict()["agent_tools"] == AGENT_TOOLS
+    assert index.agents_for("t2") == ["a1", "a2"]
+    assert index.unused_tools(["t1", "t4"]) == ["t4"]
+
+
+def test_one_request_per_agent_by_default(monkeypatch):
+    tools_list = fake_tools_list(monkeypatch, attributed=False)
+    assert_index(build_agent_tool_index("region", "project", "key", agent_ids=list(AGENT_TOOLS)))
+    assert sorted(tools_list.requests) == [[agent_id] for agent_id in AGENT_TOOLS]
+
+
+def test_batched_requests_use_agent_attribution(monkeypatch):
+    tools_list = fake_tools_list(monkeypatch, attributed=True)
+    assert_index(build_agent_tool_index("region", "project", "key", agent_ids=list(AGENT_TOOLS), concurrency=2, batched=True))
+    assert sorted(tools_list.requests) == [["a1", "a2"], ["a3", "a4"]]
+
+
+def test_batch_without_attribution_falls_back_to_one_request_per_agent(monkeypatch):
+    tools_list = fake_tools_list(monkeypatch, attributed=False)
+    assert_index(build_agent_tool_index("region", "project", "key", agent_ids=list(AGENT_TOOLS), concurrency=2, batched=True))
+    assert sorted(tools_list.requests) == sorted([["a1", "a2"], ["a3", "a4"]] + [[agent_id] for agent_id in AGENT_TOOLS])
+
+
+@pytest.mark.parametrize("count, batch_size", [(0, 1), (5, 1), (16, 2), (10000, 100)])
+def test_batch_size(count, batch_size):
+    assert dependencies.batch_size_for(count, concurrency=8, max_batch_size=100) == batch_size
@@ -0,0 +1,123 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from aiworkforce import agent, tool
+from aiworkforce.deploy import _deploy_wave, _rollback_wave, build_dependency_graph, execute_deployment, topological_waves
+
+
+def make_agent(agent_id:str, *actions) -> dict:
+    return {"agent_id": agent_id, "actions": list(actions)}
+
+
+def test_dependency_graph_keeps_only_known_objects():
+    agents = [
+        make_agent("a1", {"chain_id": "t1"}, {"chain_id": "missing"}),
+        make_agent("a2", {"agent_id": "a1"}, {"agent_id": "a2"}),
+    ]
+    tools = [{"studio_id": "t1"}]
+    assert build_dependency_graph(agents, tools) == {
+        ("tools", "t1"): set(),
+        ("agents", "a1"): {("tools", "t1")},
+        ("agents", "a2"): {("agents", "a1")},
+    }
+
+
+def test_waves_follow_dependencies():
+    agents = [
+        make_agent("parent", {"agent_id": "child"}, {"chain_id": "t2"}),
+        make_agent("child", {"chain_id": "t1"}),
+        make_agent("standalone"),
+    ]
+    tools = [{"studio_id": "t1"}, {"studio_id": "t2"}]
+    assert topological_waves(build_dependency_graph(agents, tools)) == [
+        [("agents", "standalone"), ("tools", "t1"), ("tools", "t2")],
+        [("agents", "child")],
+        [("agents", "parent")],
+    ]
+
+
+def test_cycle_shares_final_wave():
+    graph = {
+        ("tools", "t1"): set(),
+        ("agents", "a"): {("agents", "b"), ("tools", "t1")},
+        ("agents", "b"): {("agents", "a")},
+        ("agents", "c"): {("agents", "b")},
+    }
+    assert topological_waves(graph) == [
+        [("tools", "t1")],
+        [("agents", "a"), ("agents", "b"), ("agents", "c")],
+    ]
+
+
+def test_empty_graph_has_no_waves():
+    assert topological_waves({}) == []
+
+
+class FakeResponse:
+    status_code = 200
+    url = "http://mock/studios/bulk_update"
+    text = ""
+
+    def json(self):
+        return {}
+
+
+class FailedResponse(FakeResponse):
+    status_code = 500
+    text = "boom"
+
+
+class FakeClient:
+    def __init__(self, failing=()):
+        self.bodies = []
+        self.failing = set(failing)
+
+    def post(self, path, json=None, **kwargs):
+        self.bodies.append((path, json))
+        return FailedResponse() if json.get("agent_id") in self.failing else FakeResponse()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = FakeClient()
+    for module in (agent, tool):
+        monkeypatch.setattr(module, "get_client", lambda *args: client)
+    return client
+
+
+def test_rollback_replaces_tools_whole(client):
+    steps = [
+        {"type": "tools", "id": "t1", "action": "update", "object": {"studio_id": "t1", "title": "new"}},
+        {"type": "tools", "id": "t2", "action": "create", "object": {"studio_id": "t2"}},
+        {"type": "agents", "id": "a1", "action": "update", "object": {"agent_id": "a1", "name": "new"}},
+    ]
+    snapshot = {("tools", "t1"): {"studio_id": "t1", "title": "old"}, ("agents", "a1"): {"agent_id": "a1", "name": "old"}}
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert _deploy_wave(executor, steps, "region", "project", "key", tool_batch_size=10) == []
+        deployed = dict(client.bodies)
+        client.bodies.clear()
+        assert _rollback_wave(executor, steps, snapshot, "region", "project", "key", tool_batch_size=10) == []
+        restored = dict(client.bodies)
+
+    assert deployed["/studios/bulk_update"]["partial_update"] is True
+    assert restored["/studios/bulk_update"] == {"updates": [{"studio_id": "t1", "title": "old"}], "partial_update": False, "insert_if_not_exists": True}
+    assert restored["/agents/upsert"] == {"agent_id": "a1", "name": "old", "partial_update": False}
+
+
+def test_execute_deployment_reports_failures_per_object(client):
+    client.failing.add("bad")
+    plan = {
+        "agents": {"create": [{"agent_id": "good"}], "update": [{"agent_id": "bad"}]},
+        "tools": {"create": [{"studio_id": "t1"}, {"studio_id": "t2"}], "update": []},
+    }
+    timings = {(timing["type"], timing["id"]): timing for timing in execute_deployment(plan, "region", "project", "key", tool_batch_size=1)}
+
+    assert {key: timing["status"] for key, timing in timings.items()} == {
+        ("agents", "good"): "deployed",
+        ("agents", "bad"): "failed",
+        ("tools", "t1"): "deployed",
+        ("tools", "t2"): "deployed",
+    }
+    assert "returned 500: boom" in timings[("agents", "bad")]["error"]
+    assert [timings[("tools", tool_id)]["batch"] for tool_id in ("t1", "t2")] == [0, 1]
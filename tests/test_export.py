@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from aiworkforce import export
+from aiworkforce.export import export_conversations, open_dataset
+
+
+CONVERSATIONS = [
+    {"knowledge_set": "c2", "insert_datetime": "2024-01-01T09:00:00.000Z", "update_datetime": "2024-01-03T10:00:00.000Z", "metadata": {"conversation": {"state": "completed"}}},
+    {"knowledge_set": "c1", "insert_datetime": "2024-01-01T08:00:00.000Z", "update_datetime": "2024-01-02T10:00:00.000Z", "metadata": {"conversation": {"state": "completed"}}},
+]
+
+HISTORIES = {
+    "c1": {"results": [{"studio_id": "t1", "insert_date_": "2024-01-01T08:01:00.000Z", "cost": 1.5}]},
+    "c2": {"results": [{"studio_id": "t1", "insert_date_": "2024-01-01T09:01:00.000Z", "cost": 2.0, "errors": ["boom"]}]},
+}
+
+
+@pytest.fixture(autouse=True)
+def platform(monkeypatch):
+    monkeypatch.setattr(export, "iter_conversations", lambda *args, **kwargs: iter(CONVERSATIONS))
+    monkeypatch.setattr(export, "get_list_conversation_studio_history", lambda region_id, project_id, api_key, agent_id, conversation_id, conversation_state=None: HISTORIES[conversation_id])
+
+
+def run_export(root, existing_data:str="error") -> dict:
+    return export_conversations("region", "project", "agent-1", "key", str(root), existing_data=existing_data)
+
+
+def part_files(root) -> list:
+    return sorted(
+        os.path.relpath(os.path.join(directory, name), root)
+        for directory, _, names in os.walk(root)
+        for name in names
+    )
+
+
+def run_id(path:str) -> str:
+    return os.path.basename(path).split("-")[1]
+
+
+def test_hive_layout_partitions_conversations_by_update_day(tmp_path):
+    assert run_export(tmp_path) == {"conversations": 2, "studio_history": 2}
+    directories = sorted({os.path.dirname(path) for path in part_files(tmp_path)})
+    assert directories == [
+        "conversations/agent_id=agent-1/day=2024-01-02",
+        "conversations/agent_id=agent-1/day=2024-01-03",
+        "studio_history/agent_id=agent-1/day=2024-01-01",
+    ]
+    table = open_dataset(str(tmp_path), "studio_history").to_table().to_pydict()
+    assert sorted(zip(table["conversation_id"], table["cost"], table["errored"])) == [("c1", 1.5, False), ("c2", 2.0, True)]
+
+
+def test_rerun_raises_by_default(tmp_path):
+    run_export(tmp_path)
+    with pytest.raises(FileExistsError):
+        run_export(tmp_path)
+
+
+def test_append_keeps_both_runs_under_separate_part_names(tmp_path):
+    run_export(tmp_path)
+    first = part_files(tmp_path)
+    run_export(tmp_path, existing_data="append")
+    second = part_files(tmp_path)
+    assert set(first) < set(second)
+    assert len(second) == 2 * len(first)
+    # each run names its parts after its own run id
+    first_runs = {run_id(path) for path in first}
+    second_runs = {run_id(path) for path in second if path not in first}
+    assert len(first_runs) == len(second_runs) == 2  # one per dataset writer
+    assert not first_runs & second_runs
+    assert open_dataset(str(tmp_path), "conversations").count_rows() == 4
+
+
+def test_delete_matching_replaces_earlier_parts(tmp_path):
+    run_export(tmp_path)
+    first = part_files(tmp_path)
+    run_export(tmp_path, existing_data="delete_matching")
+    second = part_files(tmp_path)
+    assert len(second) == len(first)
+    assert not set(first) & set(second)
+    assert open_dataset(str(tmp_path), "conversations").count_rows() == 2
+
+
+def test_unknown_existing_data_behaviour(tmp_path):
+    with pytest.raises(ValueError):
+        run_export(tmp_path, existing_data="overwrite")
@@ -0,0 +1,51 @@
+import pytest
+
+from aiworkforce import fleet
+from aiworkforce.fleet import Fleet, ProjectCredentials
+from aiworkforce.pagination import PaginationError
+
+
+GOOD = ProjectCredentials("region", "good", "key", name="Good")
+BROKEN = ProjectCredentials("region", "broken", "key", name="Broken")
+
+CONVERSATIONS = [{"knowledge_set": f"c{i}", "metadata": {"conversation": {"state": "completed"}}} for i in range(3)]
+
+
+def query_conversations(region_id, project_id, api_key, query, include_agent_details=True):
+    if project_id == "broken":
+        raise PaginationError("List response has no results: {'message': 'unauthorised'}")
+    return iter(CONVERSATIONS)
+
+
+def get_list_conversation_studio_history(region_id, project_id, api_key, agent_id, conversation_id, conversation_state=None):
+    if conversation_id == "c1":
+        # cached_call hands back the error body of a failed request
+        return {"message": "internal error"}
+    return {"results": [{"insert_date_": "2024-01-01T00:00:00.000Z", "cost": 2.0}]}
+
+
+@pytest.fixture
+def costs(monkeypatch):
+    monkeypatch.setattr(fleet, "query_conversations", query_conversations)
+    monkeypatch.setattr(fleet, "get_list_conversation_studio_history", get_list_conversation_studio_history)
+    agents = [{**credentials.tags(), "agent_id": "agent-1"} for credentials in (GOOD, BROKEN)]
+    with Fleet([GOOD, BROKEN]) as project_fleet:
+        rows = project_fleet.conversation_costs(agents=agents)
+    return rows, project_fleet.errors
+
+
+def test_failed_history_is_an_error_not_a_free_conversation(costs):
+    rows, errors = costs
+    assert [(row["_project_id"], row["total_conversations"], row["total_credits"]) for row in rows] == [("good", 2, 4)]
+    history_errors = [error for error in errors if error["operation"] == "get_list_conversation_studio_history"]
+    assert len(history_errors) == 1
+    assert history_errors[0]["_project_id"] == "good"
+    assert "internal error" in history_errors[0]["error"]
+    assert "'c1'" in history_errors[0]["args"][1]
+
+
+def test_failed_listing_is_recorded_per_project(costs):
+    rows, errors = costs
+    listing_errors = [error for error in errors if error["operation"] == "get_conversations_between_dates"]
+    assert [(error["_project_id"], error["args"]) for error in listing_errors] == [("broken", ["'agent-1'"])]
+    assert "broken" not in {row["_project_id"] for row in rows}
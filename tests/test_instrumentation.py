@@ -0,0 +1,52 @@
+import pytest
+
+from aiworkforce.instrumentation import CallEvent, CallStats, endpoint_name
+
+
+@pytest.mark.parametrize("path, endpoint", [
+    ("/agents/list", "/agents/list"),
+    ("/agents/trigger", "/agents/trigger"),
+    ("/agents/tools/list", "/agents/tools/list"),
+    ("/agents/conversations/studios/list", "/agents/conversations/studios/list"),
+    ("/agents/support-agent/tools/list", "/agents/{id}/tools/list"),
+    ("/agents/1f0e2d3c-aaaa/tasks/9a7c6b5d-bbbb/view?full_history=true", "/agents/{id}/tasks/{id}/view"),
+    ("/agents/support-agent/tasks/welcome/trigger_message", "/agents/{id}/tasks/{id}/trigger_message"),
+    ("/studios/bulk_update", "/studios/bulk_update"),
+    ("/studios/run_history/list", "/studios/run_history/list"),
+    ("/studios/my-tool/trigger_async", "/studios/{id}/trigger_async"),
+    ("/studios/my-tool/async_poll/job", "/studios/{id}/async_poll/{id}"),
+    ("/knowledge/sets/list", "/knowledge/sets/list"),
+    ("/knowledge/sets/faq/get_metadata", "/knowledge/sets/{id}/get_metadata"),
+    ("/projects/snippets/upsert", "/projects/snippets/upsert"),
+    ("/unknown/abc12345xyz/thing", "/unknown/{id}/thing"),
+])
+def test_endpoint_name(path, endpoint):
+    assert endpoint_name(path) == endpoint
+
+
+def test_all_letter_tool_ids_share_one_endpoint():
+    assert len({endpoint_name(f"/studios/{tool_id}/trigger_async") for tool_id in ("my-tool", "search", "summarise_ticket")}) == 1
+
+
+def event(endpoint:str, latency:float, status:int=200, retries:int=0, error:str=None) -> CallEvent:
+    return CallEvent("POST", endpoint, endpoint, "region", "project", status, latency, 0.0, 100, 2048, retries, error)
+
+
+def test_report_orders_endpoints_by_total_time():
+    stats = CallStats()
+    assert stats.report() == "No API calls recorded"
+    for latency in (0.02, 0.02, 0.03, 0.2):
+        stats(event("/agents/list", latency))
+    stats(event("/studios/{id}/trigger_async", 3.0, status=429, retries=2))
+    # a latency on a bucket bound goes in the next bucket, the labels being upper bounds
+    stats(event("/studios/{id}/trigger_async", 0.5, status=None, error="ConnectionError"))
+
+    assert stats.report(width=10).splitlines() == [
+        "POST /studios/{id}/trigger_async  calls 2  failed 2  retries 2  total 3.50s  p50 1.75s  p90 2.75s  p99 2.98s  max 3.00s  sent 200B  received 4.0KB",
+        "    <1.00s ########## 1",
+        "    <5.00s ########## 1",
+        "POST /agents/list  calls 4  failed 0  retries 0  total 270ms  p50 25ms  p90 149ms  p99 195ms  max 200ms  sent 400B  received 8.0KB",
+        "     <25ms ########## 2",
+        "     <50ms #####      1",
+        "    <250ms #####      1",
+    ]
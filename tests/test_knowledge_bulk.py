@@ -0,0 +1,118 @@
+import uuid
+import threading
+
+import pytest
+
+from aiworkforce import knowledge, knowledge_bulk
+from aiworkforce.knowledge_bulk import KnowledgeBulkLoader, document_id_for, to_documents
+from aiworkforce.ratelimit import RetryPolicy
+
+
+class FakeResponse:
+    def __init__(self, status_code:int=200, text:str=""):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return {}
+
+
+class FakeClient:
+    """ /knowledge/add stand-in: answers the responses queued in scripted first, then rejects bodies of more than
+    max_rows documents with a 413 and bodies holding a failing document id with a 400 """
+
+    def __init__(self, max_rows:int=1000):
+        self.max_rows = max_rows
+        self.retry_policy = RetryPolicy()
+        self.scripted = []
+        self.failing = set()
+        self.uploads = []
+        self.lock = threading.Lock()
+
+    def post(self, path, json=None, **kwargs):
+        with self.lock:
+            if self.scripted:
+                return self.scripted.pop(0)
+            if len(json["data"]) > self.max_rows:
+                return FakeResponse(413, "payload too large")
+            if any(document["document_id"] in self.failing for document in json["data"]):
+                return FakeResponse(400, "bad row")
+            self.uploads.append([document["document_id"] for document in json["data"]])
+        return FakeResponse()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = FakeClient()
+    for module in (knowledge, knowledge_bulk):
+        monkeypatch.setattr(module, "get_client", lambda *args: client)
+    monkeypatch.setattr(knowledge_bulk.time, "sleep", lambda seconds: None)
+    return client
+
+
+def records(n:int) -> list:
+    return [{"id": str(i), "text": f"row {i}"} for i in range(n)]
+
+
+def loader(**kwargs) -> KnowledgeBulkLoader:
+    return KnowledgeBulkLoader("region", "project", "key", "set-1", id_field="id", **kwargs)
+
+
+def test_oversized_chunk_is_split_until_it_fits(client):
+    client.max_rows = 2
+    stats = loader(max_rows=5, concurrency=1).load(records(5))
+    assert (stats["rows"], stats["chunks"], stats["failed_chunks"]) == (5, 1, 0)
+    # 5 -> 2 + 3 -> 2 + (1 + 2)
+    assert client.uploads == [["0", "1"], ["2"], ["3", "4"]]
+
+
+def test_rerun_resumes_from_checkpoint(client, tmp_path):
+    checkpoint_path = str(tmp_path / "load.checkpoint.jsonl")
+    client.max_rows = 2
+    client.failing = {"4"}
+    first = loader(max_rows=4, concurrency=1, checkpoint_path=checkpoint_path)
+    stats = first.load(records(6))
+    assert (stats["rows"], stats["chunks"], stats["failed_chunks"]) == (4, 1, 1)
+    assert first.failures == [{"chunk": 1, "rows": 2, "error": "bad row", "status_code": 400, "document_ids": ["4", "5"]}]
+    assert client.uploads == [["0", "1"], ["2", "3"]]
+
+    client.uploads.clear()
+    client.failing.clear()
+    stats = loader(max_rows=4, concurrency=1, checkpoint_path=checkpoint_path).load(records(6))
+    assert (stats["rows"], stats["chunks"], stats["skipped_chunks"], stats["failed_chunks"]) == (2, 1, 1, 0)
+    assert client.uploads == [["4", "5"]]
+
+
+def test_request_timeout_is_retried_by_the_loader(client):
+    client.scripted = [FakeResponse(408, "timeout")]
+    bulk_loader = loader(max_rows=10)
+    stats = bulk_loader.load(records(3))
+    assert (stats["rows"], stats["retries"], stats["failed_chunks"]) == (3, 1, 0)
+    assert client.uploads == [["0", "1", "2"]]
+    # 429/5xx are left to the client's retry policy
+    assert bulk_loader.retry_statuses == (408,)
+
+
+def test_retries_give_up_after_max_retries(client):
+    client.scripted = [FakeResponse(408, "timeout")] * 3
+    bulk_loader = loader(max_rows=10, max_retries=2)
+    stats = bulk_loader.load(records(3))
+    assert (stats["rows"], stats["retries"], stats["failed_chunks"]) == (0, 2, 1)
+    assert bulk_loader.failures[0]["status_code"] == 408
+
+
+def test_failed_half_of_a_split_chunk_is_reported(client):
+    client.max_rows = 2
+    client.failing = {"3"}
+    bulk_loader = loader(max_rows=4, concurrency=1)
+    stats = bulk_loader.load(records(4))
+    assert (stats["rows"], stats["chunks"], stats["failed_chunks"]) == (2, 0, 1)
+    assert bulk_loader.failures == [{"chunk": 0, "rows": 2, "error": "bad row", "status_code": 400, "document_ids": ["2", "3"]}]
+
+
+def test_content_ids_are_stable_uuid5():
+    a = document_id_for({"text": "hello", "n": 1})
+    assert a == document_id_for({"n": 1, "text": "hello"})
+    assert a != document_id_for({"text": "hello", "n": 2})
+    assert a == str(uuid.uuid5(knowledge_bulk.DOCUMENT_NAMESPACE, '{"n":1,"text":"hello"}'))
+    assert [document["document_id"] for document in to_documents(records(2), "id")] == ["0", "1"]
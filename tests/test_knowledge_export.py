@@ -0,0 +1,62 @@
+import csv
+import json
+
+import pytest
+
+from benchmarks.mock_server import MockRelevanceAPI
+from aiworkforce import knowledge_export
+from aiworkforce.client import RelevanceClient, close_clients, use_client
+from aiworkforce.knowledge_export import export_all_knowledge, export_knowledge
+
+
+ROWS = [{"document_id": f"d{i}", "data": {"text": f"row {i}", "n": i}} for i in range(6)]
+# first seen on the last page
+ROWS.append({"document_id": "d6", "data": {"text": "row 6", "source": "late"}})
+
+
+@pytest.fixture
+def api():
+    with MockRelevanceAPI(agents=0, tools=0, conversations=0) as api:
+        api.knowledge["faq"] = {row["document_id"]: row for row in ROWS}
+        api.knowledge["empty"] = {}
+        use_client(RelevanceClient("mock", "project", "key", base_url=api.url))
+        try:
+            yield api
+        finally:
+            close_clients()
+
+
+def test_jsonl_export_pages_through_the_whole_set(api, tmp_path):
+    filepath = str(tmp_path / "faq.jsonl")
+    result = export_knowledge("mock", "project", "key", "faq", filepath, page_size=3)
+    assert result == {"knowledge_set": "faq", "filepath": filepath, "rows": 7, "expected_rows": 7, "verification": "verified"}
+    with open(filepath) as f:
+        assert [json.loads(line) for line in f] == ROWS
+
+
+def test_csv_export_takes_the_union_of_columns(api, tmp_path):
+    filepath = str(tmp_path / "faq.csv")
+    export_knowledge("mock", "project", "key", "faq", filepath, page_size=3)
+    with open(filepath, newline="") as f:
+        reader = csv.DictReader(f)
+        assert reader.fieldnames == ["document_id", "text", "n", "source"]
+        rows = list(reader)
+    assert rows[0] == {"document_id": "d0", "text": "row 0", "n": "0", "source": ""}
+    assert rows[-1] == {"document_id": "d6", "text": "row 6", "n": "", "source": "late"}
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+@pytest.mark.parametrize("metadata, expected_rows, verification", [
+    ({"metadata": {"count": 99}}, 99, "mismatch"),
+    ({"metadata": {}}, None, "unverified"),
+    ({"error": "not found"}, None, "unverified"),
+])
+def test_verification_result(api, tmp_path, monkeypatch, metadata, expected_rows, verification):
+    monkeypatch.setattr(knowledge_export, "get_knowledge_metadata", lambda *args: metadata)
+    result = export_knowledge("mock", "project", "key", "faq", str(tmp_path / "faq.jsonl"), page_size=3)
+    assert (result["rows"], result["expected_rows"], result["verification"]) == (7, expected_rows, verification)
+
+
+def test_export_all_knowledge(api, tmp_path):
+    results = export_all_knowledge("mock", "project", "key", str(tmp_path))
+    assert {(result["knowledge_set"], result["rows"], result["verification"]) for result in results} == {("faq", 7, "verified"), ("empty", 0, "verified")}
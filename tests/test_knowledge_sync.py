@@ -0,0 +1,94 @@
+import pytest
+
+from aiworkforce import knowledge, knowledge_bulk
+from aiworkforce.knowledge_sync import knowledge_row_hashes, sync_knowledge
+from aiworkforce.pagination import PaginationError
+from aiworkforce.ratelimit import RetryPolicy
+
+
+class FakeResponse:
+    def __init__(self, body:dict, status_code:int=200):
+        self.body = body
+        self.status_code = status_code
+        self.text = str(body)
+
+    def json(self):
+        return self.body
+
+
+class FakeProject:
+    """ A project's knowledge endpoints: sets maps set name -> document_id -> data. Uploads holding a failing
+    document id are rejected """
+
+    def __init__(self, sets:dict):
+        self.sets = sets
+        self.failing = set()
+        self.retry_policy = RetryPolicy()
+
+    def post(self, path, json=None, **kwargs):
+        rows = self.sets.get(json["knowledge_set"])
+        if path == "/knowledge/list":
+            if rows is None:
+                return FakeResponse({"message": "knowledge set not found"}, 404)
+            listing = [{"document_id": document_id, "data": data} for document_id, data in rows.items()]
+            start = (json["page"] - 1) * json["page_size"]
+            return FakeResponse({"results": listing[start:start + json["page_size"]]})
+        if path == "/knowledge/add":
+            if any(document["document_id"] in self.failing for document in json["data"]):
+                return FakeResponse({"message": "bad row"}, 400)
+            rows = self.sets.setdefault(json["knowledge_set"], {})
+            rows.update({document["document_id"]: document["value"] for document in json["data"]})
+            return FakeResponse({})
+        if path == "/knowledge/delete":
+            for document_id in json["filters"][0]["condition_value"]:
+                rows.pop(document_id, None)
+            return FakeResponse({})
+
+
+SOURCE = ("region", "dev", "key")
+TARGET = ("region", "prd", "key")
+
+
+@pytest.fixture
+def projects(monkeypatch):
+    projects = {
+        "dev": FakeProject({"faq": {"same": {"q": 1}, "changed": {"q": 2}, "new": {"q": 3}, "broken": {"q": 4}}}),
+        "prd": FakeProject({"faq": {"same": {"q": 1}, "changed": {"q": 0}, "stale": {"q": 5}}}),
+    }
+    for module in (knowledge, knowledge_bulk):
+        monkeypatch.setattr(module, "get_client", lambda region_id, project_id, api_key: projects[project_id])
+    return projects
+
+
+def test_sync_ships_only_the_difference(projects):
+    result = sync_knowledge(SOURCE, TARGET, "faq")
+    assert (result["added"], result["updated"], result["deleted"], result["unchanged"], result["failures"]) == (2, 1, 1, 1, [])
+    assert projects["prd"].sets["faq"] == projects["dev"].sets["faq"]
+
+
+def test_counts_leave_out_rows_that_failed_to_upload(projects):
+    projects["prd"].failing = {"broken"}
+    # the changed rows go up in one chunk, so the bad row takes the others down with it
+    result = sync_knowledge(SOURCE, TARGET, "faq")
+    assert (result["added"], result["updated"], result["deleted"]) == (0, 0, 1)
+    assert [sorted(failure["document_ids"]) for failure in result["failures"]] == [["broken", "changed", "new"]]
+    assert projects["prd"].sets["faq"] == {"same": {"q": 1}, "changed": {"q": 0}}
+
+
+def test_dry_run_reports_the_plan(projects):
+    projects["prd"].failing = {"broken"}
+    result = sync_knowledge(SOURCE, TARGET, "faq", dry_run=True)
+    assert (result["added"], result["updated"], result["deleted"], result["unchanged"]) == (2, 1, 1, 1)
+    assert "stale" in projects["prd"].sets["faq"]
+
+
+def test_missing_target_set_is_created(projects):
+    result = sync_knowledge(SOURCE, TARGET, "faq", target_knowledge_set="faq-copy")
+    assert (result["added"], result["updated"], result["deleted"], result["unchanged"]) == (4, 0, 0, 0)
+    assert projects["prd"].sets["faq-copy"] == projects["dev"].sets["faq"]
+
+
+def test_missing_source_set_still_raises(projects):
+    with pytest.raises(PaginationError):
+        sync_knowledge(SOURCE, TARGET, "nope")
+    assert knowledge_row_hashes(*TARGET, "nope", missing_ok=True) == {}
@@ -0,0 +1,41 @@
+from benchmarks.mock_server import MockRelevanceAPI, _matches
+from aiworkforce.client import RelevanceClient, close_clients, use_client
+from aiworkforce.conversation import query_conversations
+from aiworkforce.query import Query, all_of, any_of, exact, exists, is_in, numeric, regexp
+from aiworkforce.types import ConversationState
+
+
+RECORD = {
+    "knowledge_set": "conversation-1",
+    "update_datetime": "2024-01-02T00:00:00.000Z",
+    "metadata": {"conversation": {"agent_id": "agent-1", "state": "completed", "title": "Refund request"}},
+}
+
+
+def test_filter_matching():
+    assert _matches(RECORD, exact("conversation.agent_id", "agent-1"))
+    assert _matches(RECORD, exact("agent_id", "agent-1"))
+    assert not _matches(RECORD, exact("conversation.agent_id", "agent-1", negate=True))
+    assert _matches(RECORD, is_in("conversation.state", ["errored", "completed"]))
+    assert not _matches(RECORD, is_in("conversation.state", ["errored"]))
+    assert _matches(RECORD, exists("knowledge_set"))
+    assert _matches(RECORD, exists("conversation.missing", negate=True))
+    assert _matches(RECORD, regexp("conversation.title", "^Refund"))
+    assert _matches(RECORD, numeric("update_datetime", ">=", "2024-01-01T00:00:00.000Z"))
+    assert not _matches(RECORD, numeric("update_datetime", "<", "2024-01-01T00:00:00.000Z"))
+    assert _matches(RECORD, any_of(exact("conversation.state", "errored"), [exists("knowledge_set"), regexp("conversation.title", "Refund")]))
+    assert not _matches(RECORD, all_of(exact("conversation.state", "completed"), exact("conversation.agent_id", "agent-2")))
+
+
+def test_listing_filters_over_http():
+    with MockRelevanceAPI(agents=1, tools=1, conversations=40, failed_fraction=0.5, seed=1) as api:
+        use_client(RelevanceClient("mock", "project", "key", base_url=api.url))
+        try:
+            failed = list(query_conversations("mock", "project", "key", Query().where(is_in("conversation.state", [ConversationState.COMPLETED], negate=True)), page_size=7))
+            everything = list(query_conversations("mock", "project", "key", Query(), page_size=7))
+        finally:
+            close_clients()
+    expected = [c for c in api.conversations.values() if c["metadata"]["conversation"]["state"] != ConversationState.COMPLETED]
+    assert 0 < len(failed) < 40
+    assert sorted(c["knowledge_set"] for c in failed) == sorted(c["knowledge_set"] for c in expected)
+    assert len(everything) == 40
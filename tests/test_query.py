@@ -0,0 +1,215 @@
+""" Golden tests: the params/bodies the list functions send, pinned to the hand-built dicts they used
+before moving onto aiworkforce.query """
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from aiworkforce import agent, conversation, knowledge, tool
+from aiworkforce.query import Query, all_of, any_of, exact, is_in, numeric
+
+
+AGENT_ID = "agent-1"
+PROJECT_ID = "project-1"
+TOOL_ID = "tool-1"
+
+
+class FakeResponse:
+    status_code = 200
+    text = ""
+
+    def json(self):
+        return {"results": [{}]}
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+
+    def get(self, path, **kwargs):
+        self.calls.append(("GET", path, kwargs))
+        return FakeResponse()
+
+    def post(self, path, **kwargs):
+        self.calls.append(("POST", path, kwargs))
+        return FakeResponse()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = FakeClient()
+    for module in (agent, conversation, knowledge, tool):
+        monkeypatch.setattr(module, "get_client", lambda *args: client)
+    return client
+
+
+def decoded(params:dict, *keys) -> dict:
+    return {key: json.loads(value) if key in keys else value for key, value in params.items()}
+
+
+NOT_DEBUG = {"field": "conversation.is_debug_mode_task", "filter_type": "exact_match", "condition": "!=", "condition_value": True}
+
+
+def test_get_conversations(client):
+    conversation.get_conversations("region", PROJECT_ID, AGENT_ID, "key")
+    method, path, kwargs = client.calls[0]
+    assert (method, path) == ("GET", "/agents/conversations/list")
+    assert decoded(json.loads(kwargs["params"]), "filters", "sort") == {
+        "include_agent_details": "true",
+        "include_debug_info": "false",
+        "filters": [
+            NOT_DEBUG,
+            {"filter_type": "exact_match", "field": "conversation.agent_id", "condition_value": AGENT_ID, "condition": "=="},
+        ],
+        "sort": [{"update_datetime": "desc"}],
+        "page_size": 500000,
+    }
+
+
+def test_get_conversations_between_dates(client):
+    from_dt = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    to_dt = datetime(2024, 1, 31, tzinfo=timezone.utc)
+    conversation.get_conversations_between_dates("region", PROJECT_ID, AGENT_ID, "key", from_dt, to_dt)
+    method, path, kwargs = client.calls[0]
+    assert (method, path) == ("GET", "/agents/conversations/list")
+    assert kwargs["headers"] == {"Content-Type": "application/json"}
+    assert decoded(kwargs["params"], "filters", "sort") == {
+        "include_agent_details": "false",
+        "include_debug_info": "false",
+        "filters": [
+            NOT_DEBUG,
+            {"filter_type": "exact_match", "field": "conversation.agent_id", "condition_value": [AGENT_ID], "condition": "=="},
+            {"filter_type": "numeric", "field": "update_datetime", "condition": ">=", "condition_value": "2024-01-01T00:00:00.000Z"},
+            {"filter_type": "numeric", "field": "update_datetime", "condition": "<", "condition_value": "2024-02-01T00:00:00.000Z"},
+        ],
+        "sort": [{"update_datetime": "desc"}],
+        "page_size": 500000,
+    }
+
+
+def test_get_conversations_between_dates_without_bounds(client):
+    conversation.get_conversations_between_dates("region", PROJECT_ID, AGENT_ID, "key")
+    assert json.loads(client.calls[0][2]["params"]["filters"]) == [
+        NOT_DEBUG,
+        {"filter_type": "exact_match", "field": "conversation.agent_id", "condition_value": [AGENT_ID], "condition": "=="},
+    ]
+
+
+def test_get_conversations_where_specific_tool_failed(client):
+    conversation.get_conversations_where_specific_tool_failed("region", PROJECT_ID, AGENT_ID, TOOL_ID, "key")
+    method, path, kwargs = client.calls[0]
+    assert (method, path) == ("GET", "/agents/conversations/list")
+    assert decoded(kwargs["params"], "filters", "event_logs_filters") == {
+        "page_size": 50000,
+        "filters": [{"condition": "==", "case_insensitive": False, "field": "agent_id", "filter_type": "exact_match", "condition_value": AGENT_ID}],
+        "event_logs_filters": [{"event_value": TOOL_ID, "event_type": "tool_runs_failed", "min_count": 1, "max_count": 10, "comparison_type": "gte"}],
+    }
+
+
+def test_get_conversation_states(client):
+    since = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    conversation.get_conversation_states("region", PROJECT_ID, AGENT_ID, ["c1", "c2"], "key", updated_since=since, page_size=10)
+    assert decoded(client.calls[0][2]["params"], "filters", "sort") == {
+        "include_agent_details": "false",
+        "include_debug_info": "false",
+        "filters": [
+            NOT_DEBUG,
+            {"filter_type": "exact_match", "field": "conversation.agent_id", "condition_value": AGENT_ID, "condition": "=="},
+            {"filter_type": "numeric", "field": "update_datetime", "condition": ">=", "condition_value": "2024-01-01T00:00:00.000Z"},
+        ],
+        "sort": [{"update_datetime": "desc"}],
+        "page_size": 10,
+        "page": 1,
+    }
+
+
+def test_iter_conversations(client):
+    list(conversation.iter_conversations("region", PROJECT_ID, AGENT_ID, "key", page_size=10))
+    assert decoded(client.calls[0][2]["params"], "filters", "sort") == {
+        "include_agent_details": "true",
+        "include_debug_info": "false",
+        "filters": [
+            NOT_DEBUG,
+            {"filter_type": "exact_match", "field": "conversation.agent_id", "condition_value": AGENT_ID, "condition": "=="},
+        ],
+        "sort": [{"update_datetime": "desc"}],
+        "page_size": 10,
+        "page": 1,
+    }
+
+
+def test_tool_filters(client):
+    project = {"field": "project", "condition": "==", "condition_value": PROJECT_ID, "filter_type": "exact_match"}
+    studio = {"field": "studio_id", "condition": "==", "condition_value": TOOL_ID, "filter_type": "exact_match"}
+
+    tool.get_tool(TOOL_ID, "region", PROJECT_ID, "key")
+    tool.get_all_tools("region", PROJECT_ID, "key")
+    list(tool.iter_tools("region", PROJECT_ID, "key", page_size=10, updated_since="2024-01-01T00:00:00.000Z"))
+    list(tool.iter_tool_runs(TOOL_ID, "region", PROJECT_ID, "key", page_size=10))
+
+    get_tool, get_all_tools, iter_tools, iter_tool_runs = (decoded(call[2]["params"], "filters") for call in client.calls)
+    assert get_tool == {"page_size": 1, "filters": [project, studio]}
+    assert get_all_tools == {"page_size": 50000, "filters": [project]}
+    assert iter_tools == {
+        "page_size": 10,
+        "page": 1,
+        "filters": [project, {"field": "update_date_", "condition": ">=", "condition_value": "2024-01-01T00:00:00.000Z", "filter_type": "date"}],
+    }
+    assert iter_tool_runs == {"page_size": 10, "page": 1, "filters": [project, studio], "with_agent_details": True}
+
+
+def test_agent_filters(client):
+    agent.get_all_agents("region", PROJECT_ID, "key")
+    list(agent.iter_agents("region", PROJECT_ID, "key", page_size=10, updated_since="2024-01-01T00:00:00.000Z"))
+
+    project = {"field": "project", "condition": "==", "condition_value": PROJECT_ID, "filter_type": "exact_match"}
+    assert json.loads(client.calls[0][2]["params"]) == {"page_size": 50000, "filters": [project]}
+    assert client.calls[1][2]["json"] == {
+        "page_size": 10,
+        "page": 1,
+        "filters": [project, {"field": "update_date_", "condition": ">=", "condition_value": "2024-01-01T00:00:00.000Z", "filter_type": "date"}],
+    }
+
+
+def test_knowledge_delete_filter(client):
+    knowledge.delete_knowledge_documents("region", PROJECT_ID, "key", "set-1", ["d1", "d2"])
+    method, path, kwargs = client.calls[0]
+    assert (method, path) == ("POST", "/knowledge/delete")
+    assert kwargs["json"] == {
+        "knowledge_set": "set-1",
+        "filters": [{"field": "document_id", "filter_type": "exact_match", "condition": "==", "condition_value": ["d1", "d2"]}],
+    }
+
+
+def test_any_of_all_of_nesting():
+    a = exact("conversation.state", "completed")
+    b = numeric("update_datetime", ">=", datetime(2024, 1, 1, tzinfo=timezone.utc))
+    c = is_in("conversation.agent_id", ["agent-1", "agent-2"])
+
+    assert any_of(a, [b, c]) == {
+        "filter_type": "or",
+        "condition_value": [
+            {"field": "conversation.state", "filter_type": "exact_match", "condition": "==", "condition_value": "completed"},
+            {
+                "filter_type": "and",
+                "condition_value": [
+                    {"field": "update_datetime", "filter_type": "numeric", "condition": ">=", "condition_value": "2024-01-01T00:00:00.000Z"},
+                    {"field": "conversation.agent_id", "filter_type": "exact_match", "condition": "==", "condition_value": ["agent-1", "agent-2"]},
+                ],
+            },
+        ],
+    }
+    assert all_of(any_of(a, b), c) == {"filter_type": "and", "condition_value": [any_of(a, b), c]}
+
+
+def test_query_serialization():
+    query = Query().where(exact("a", 1), [exact("b", 2)]).sort("update_datetime", descending=False).select("knowledge_set")
+    assert query.to_body(page_size=5, page=None) == {
+        "filters": [exact("a", 1), exact("b", 2)],
+        "sort": [{"update_datetime": "asc"}],
+        "select_fields": ["knowledge_set"],
+        "page_size": 5,
+    }
+    assert decoded(query.to_params(page_size=5), "filters", "sort", "select_fields") == query.to_body(page_size=5)
+    assert query.extend(Query().where(exact("c", 3))).filters == [exact("a", 1), exact("b", 2), exact("c", 3)]
+    assert query.filters == [exact("a", 1), exact("b", 2)]
@@ -0,0 +1,41 @@
+import time
+
+from aiworkforce.ratelimit import RateLimiter, RetryPolicy, endpoint_family
+
+
+def test_trigger_endpoints_share_trigger_family():
+    assert endpoint_family("/agents/trigger") == "agents/trigger"
+    assert endpoint_family("/studios/tool-1/trigger_async") == "studios/trigger"
+
+
+def test_trigger_message_read_is_not_a_trigger():
+    path = "/agents/agent-1/tasks/conversation-1/trigger_message"
+    assert endpoint_family(path) == "agents"
+    assert RetryPolicy().should_retry(endpoint_family(path), 0, 503)
+
+
+def test_triggers_are_not_retried_on_server_errors():
+    policy = RetryPolicy()
+    assert not policy.should_retry(endpoint_family("/agents/trigger"), 0, 503)
+    assert policy.should_retry(endpoint_family("/agents/trigger"), 0, 429)
+
+
+def test_query_string_and_ids_are_ignored():
+    assert endpoint_family("/agents/list?page=2") == "agents"
+    assert endpoint_family("/studios/tool-1/async_poll/job-1?ending_update_only=true") == "studios"
+    assert endpoint_family("") == ""
+
+
+def test_family_rate_is_a_ceiling():
+    limiter = RateLimiter(family_rates={"agents/trigger": 20.0})
+    bucket = limiter.bucket("agents/trigger")
+    for _ in range(1000):
+        limiter.on_success("agents/trigger")
+    assert (bucket.rate, bucket.burst) == (20.0, 1)
+    assert limiter.bucket("agents").max_rate == limiter.max_rate
+
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire("agents/trigger")
+    # the first token is the burst of 1, the other five are paced at 20/s
+    assert time.monotonic() - start >= 5 / 20.0 * 0.95
@@ -0,0 +1,49 @@
+import math
+
+import pytest
+
+from benchmarks.mock_server import MockRelevanceAPI
+from aiworkforce.records import ActionRecord, ConversationRecord, ToolRunRecord, compact_records
+from aiworkforce.recovery import find_retrigger_message_id
+from aiworkforce.types import ConversationState
+from aiworkforce.utils import parse_platform_timestamp
+
+
+@pytest.fixture(scope="module")
+def api():
+    with MockRelevanceAPI(agents=1, tools=3, conversations=20, failed_fraction=0.5, seed=3) as api:
+        yield api
+
+
+def test_conversation_records(api):
+    raw = next(iter(api.conversations.values()))
+    record = ConversationRecord.from_api(raw)
+    assert record.conversation_id == raw["knowledge_set"]
+    assert record.agent_id == api.agent_id
+    assert record.state == raw["metadata"]["conversation"]["state"]
+    assert record.update_datetime == parse_platform_timestamp(raw["update_datetime"])
+    assert record.custom_metadata == {"customer": "c0"}
+    assert record.raw is None
+    assert ConversationRecord.from_api(raw, keep_raw=True).raw is raw
+
+
+def test_tool_run_records(api):
+    history = api.studio_history("conversation-00000001")
+    records = list(compact_records({"results": history}, ToolRunRecord))
+    assert [record.studio_id for record in records] == [run["studio_id"] for run in history]
+    assert [record.cost for record in records] == [float(run["cost"]) for run in history]
+    assert [record.errored for record in records] == [bool(run["errors"]) for run in history]
+    assert all(record.conversation_id == "conversation-00000001" for record in records)
+    assert ToolRunRecord.from_api({}).cost == 0.0 and math.isnan(ToolRunRecord.from_api({}).insert_date)
+
+
+def test_action_message_ids_match_the_retrigger_lookup(api):
+    failed = [conversation_id for conversation_id, conversation in api.conversations.items() if conversation["metadata"]["conversation"]["state"] != ConversationState.COMPLETED]
+    assert failed
+    for conversation_id in failed:
+        actions = api.actions(conversation_id)
+        records = list(compact_records(actions, ActionRecord))
+        assert records[-1].tool_run_state == "error"
+        assert records[-1].message_id == f"{conversation_id}-msg-error"
+        # the retrigger starts after the event before the last error
+        assert records[-2].message_id == find_retrigger_message_id(actions) == f"{conversation_id}-msg-{api.actions_per_conversation - 1}"
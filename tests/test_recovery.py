@@ -0,0 +1,110 @@
+import pytest
+
+from aiworkforce import recovery
+from aiworkforce.recovery import RetriggerPipeline, find_retrigger_message_id, load_checkpoint
+from aiworkforce.types import ConversationState
+
+
+def action(tool_run_state:str="", item_id:str=None, **original_message_ids) -> dict:
+    return {"content": {"tool_run_state": tool_run_state, "item_id": item_id, "original_message_ids": original_message_ids}}
+
+
+def test_retrigger_message_is_the_event_before_the_last_error():
+    actions = [
+        action("error", **{"action-response": "m1"}),
+        action(**{"action-response": "m2"}),
+        action("error"),
+        action(**{"action-response": "m3"}),
+        action("error"),
+    ]
+    assert find_retrigger_message_id(actions) == "m3"
+
+
+def test_retrigger_message_falls_back_through_ids():
+    assert find_retrigger_message_id([action(**{"action-error": "e1"}), action("error")]) == "e1"
+    assert find_retrigger_message_id([action(**{"agent-error": "a1"}), action("error")]) == "a1"
+    assert find_retrigger_message_id([action(item_id="i1"), action("error")]) == "i1"
+
+
+def test_error_on_first_action_does_not_wrap_around():
+    # i == 0 used to look at actions[-1], retriggering from the end of the conversation
+    actions = [action("error"), action(**{"action-response": "last"})]
+    assert find_retrigger_message_id(actions) is None
+    assert find_retrigger_message_id([]) is None
+
+
+class FakePlatform:
+    def __init__(self, conversations:dict, actions:dict, failing_triggers=()):
+        self.conversations = conversations
+        self.actions = actions
+        self.failing_triggers = set(failing_triggers)
+        self.fetched = []
+        self.triggered = []
+
+    def iter_conversations(self, region_id, project_id, agent_id, api_key, prefetch=False, query=None):
+        for conversation_id, state in self.conversations.items():
+            yield {"knowledge_set": conversation_id, "metadata": {"conversation": {"state": state}}}
+
+    def get_conversation_actions(self, region_id, project_id, agent_id, conversation_id, api_key):
+        self.fetched.append(conversation_id)
+        return {"results": self.actions[conversation_id]}
+
+    def retrigger_conversation_after_message(self, project_id, region_id, agent_id, conversation_id, message_id, api_key):
+        if conversation_id in self.failing_triggers:
+            raise RuntimeError("trigger failed")
+        self.triggered.append((conversation_id, message_id))
+
+    def get_conversation_states(self, region_id, project_id, agent_id, conversation_ids, api_key, updated_since=None):
+        return {conversation_id: ConversationState.COMPLETED for conversation_id in conversation_ids}
+
+
+@pytest.fixture
+def platform(monkeypatch):
+    failed = [action(**{"action-response": "m1"}), action("error")]
+    platform = FakePlatform(
+        conversations={"c1": ConversationState.UNRECOVERABLE, "c2": ConversationState.TIMED_OUT, "c3": ConversationState.TIMED_OUT, "c4": ConversationState.COMPLETED},
+        actions={"c1": failed, "c2": [action(**{"action-response": "m2"})], "c3": failed},
+        failing_triggers={"c3"},
+    )
+    for name in ("iter_conversations", "get_conversation_actions", "retrigger_conversation_after_message", "get_conversation_states"):
+        monkeypatch.setattr(recovery, name, getattr(platform, name))
+    return platform
+
+
+def test_resume_skips_checkpointed_conversations(platform, tmp_path):
+    checkpoint_path = str(tmp_path / "retrigger.checkpoint.jsonl")
+    pipeline = lambda: RetriggerPipeline("region", "project", "agent", "key", poll_interval=0.01, checkpoint_path=checkpoint_path)
+
+    summary = pipeline().run()
+    assert (summary["triggered"], summary["skipped"], summary["trigger_errors"], summary["matched"]) == (1, 1, 1, 3)
+    # the failed trigger is left out of the checkpoint so the next run tries it again
+    assert load_checkpoint(checkpoint_path) == {"c1": "triggered", "c2": "skipped"}
+
+    platform.fetched.clear()
+    platform.failing_triggers.clear()
+    summary = pipeline().run()
+    assert (summary["resumed"], summary["triggered"]) == (2, 1)
+    assert platform.fetched == ["c3"]
+    assert platform.triggered == [("c1", "m1"), ("c3", "m1")]
+    assert load_checkpoint(checkpoint_path) == {"c1": "triggered", "c2": "skipped", "c3": "triggered"}
+
+
+def test_poll_counts_missing_conversations_and_frees_their_slots(platform, monkeypatch):
+    pipeline = RetriggerPipeline("region", "project", "agent", "key", max_in_flight=2, poll_interval=60)
+    pipeline._trigger("c1", "m1")
+    pipeline._trigger("c2", "m2")
+    requested = []
+
+    def get_states(region_id, project_id, agent_id, conversation_ids, api_key, updated_since=None):
+        requested.append(updated_since)
+        return {"c1": ConversationState.RUNNING}
+
+    monkeypatch.setattr(recovery, "get_conversation_states", get_states)
+    pipeline._poll_in_flight()
+
+    assert pipeline.stats["poll_missing"] == 1
+    assert list(pipeline._in_flight) == ["c1"]
+    assert pipeline._in_flight["c1"]["seen_active"]
+    assert requested[0] < pipeline._in_flight["c1"]["triggered_wall"]
+    # c2's slot was released, so another trigger goes through without blocking
+    assert pipeline._in_flight_slots.acquire(blocking=False)
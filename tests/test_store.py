@@ -0,0 +1,49 @@
+import os
+
+from aiworkforce.store import ObjectStore
+
+
+def agent(agent_id:str, prompt:str) -> dict:
+    return {"agent_id": agent_id, "system_prompt": prompt, "project": "dev", "update_date_": "2024-01-01", "actions": [{"chain_id": "t1", "project": "dev"}]}
+
+
+def blob_count(root) -> int:
+    return sum(len(files) for _, _, files in os.walk(root / "blobs"))
+
+
+def test_put_get_roundtrip_applies_project_metadata(tmp_path):
+    store = ObjectStore(str(tmp_path), "prd")
+    store.put_all([agent("a1", "hello")], "agents")
+
+    reloaded = ObjectStore(str(tmp_path), "prd")
+    obj = reloaded.get("agents", "a1")
+    assert obj["system_prompt"] == "hello"
+    assert obj["project"] == "prd"
+    assert obj["_id"] == "prd_-_a1"
+    assert obj["actions"][0]["project"] == "prd"
+    assert "update_date_" not in obj
+
+
+def test_identical_content_shares_one_blob_and_changes_are_reported(tmp_path):
+    dev = ObjectStore(str(tmp_path), "dev")
+    prd = ObjectStore(str(tmp_path), "prd")
+    assert dev.put_all([agent("a1", "hello")], "agents") == ["a1"]
+    assert prd.put_all([agent("a1", "hello")], "agents") == ["a1"]
+    assert blob_count(tmp_path) == 1
+
+    assert dev.put_all([agent("a1", "hello")], "agents") == []
+    assert not dev.has_changed(agent("a1", "hello"), "agents")
+    assert dev.has_changed(agent("a1", "edited"), "agents")
+
+
+def test_collect_garbage_keeps_blobs_other_projects_reference(tmp_path):
+    dev = ObjectStore(str(tmp_path), "dev")
+    prd = ObjectStore(str(tmp_path), "prd")
+    dev.put_all([agent("a1", "shared"), agent("a2", "dev only")], "agents")
+    prd.put_all([agent("a1", "shared")], "agents")
+
+    dev.remove("agents", "a2")
+    dev.remove("agents", "a1")
+    assert dev.collect_garbage() == 1
+    assert blob_count(tmp_path) == 1
+    assert prd.get("agents", "a1")["system_prompt"] == "shared"
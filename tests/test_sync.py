@@ -0,0 +1,68 @@
+import os
+
+from aiworkforce.sync import load_sync_manifest, save_sync_manifest, sync_objects_to_local
+from aiworkforce.utils import open_object_file
+
+
+def agent(agent_id:str, prompt:str, update_date:str="2024-01-01T00:00:00.000Z") -> dict:
+    return {"agent_id": agent_id, "name": f"Agent {agent_id}", "system_prompt": prompt, "update_date_": update_date}
+
+
+def local_files(folder) -> dict:
+    """ agent id -> object of the files in folder """
+    objects = [open_object_file(f"{folder}/{file}") for file in os.listdir(folder) if file.endswith(".json")]
+    return {obj["agent_id"]: obj for obj in objects}
+
+
+def mtimes(folder) -> dict:
+    return {file: os.stat(folder / file).st_mtime_ns for file in os.listdir(folder) if file.endswith(".json")}
+
+
+def test_manifest_roundtrip(tmp_path):
+    assert load_sync_manifest(str(tmp_path)) == {"last_sync": None, "objects": {}}
+    manifest = {"last_sync": "2024-01-01T00:00:00.000Z", "objects": {"a1": {"file": "a.json", "hash": "h", "update_date_": None}}}
+    save_sync_manifest(manifest, str(tmp_path / "agents"))
+    assert load_sync_manifest(str(tmp_path / "agents")) == manifest
+
+
+def test_unchanged_objects_are_not_rewritten(tmp_path):
+    folder = tmp_path / "agents"
+    assert sync_objects_to_local([agent("a1", "x"), agent("a2", "y")], str(folder), "agents", "prd") == {"written": 2, "unchanged": 0, "deleted": 0}
+    before = mtimes(folder)
+
+    stats = sync_objects_to_local([agent("a1", "x"), agent("a2", "y")], str(folder), "agents", "prd")
+    assert stats == {"written": 0, "unchanged": 2, "deleted": 0}
+    # Same content under a new update_date_ is hashed but still not rewritten
+    stats = sync_objects_to_local([agent("a1", "x", "2024-02-01T00:00:00.000Z")], str(folder), "agents", "prd", current_ids=["a1", "a2"])
+    assert stats == {"written": 0, "unchanged": 1, "deleted": 0}
+    assert mtimes(folder) == before
+    assert load_sync_manifest(str(folder))["last_sync"] is not None
+
+
+def test_changed_objects_are_rewritten(tmp_path):
+    folder = tmp_path / "agents"
+    sync_objects_to_local([agent("a1", "x"), agent("a2", "y")], str(folder), "agents", "prd")
+    stats = sync_objects_to_local([agent("a1", "edited", "2024-02-01T00:00:00.000Z")], str(folder), "agents", "prd", current_ids=["a1", "a2"])
+    assert stats == {"written": 1, "unchanged": 0, "deleted": 0}
+    files = local_files(folder)
+    assert files["a1"]["system_prompt"] == "edited"
+    assert files["a1"]["project"] == "prd"
+    assert files["a2"]["system_prompt"] == "y"
+
+
+def test_prune_deletes_only_removed_ids(tmp_path):
+    folder = tmp_path / "agents"
+    sync_objects_to_local([agent("a1", "x"), agent("a2", "y"), agent("a3", "z")], str(folder), "agents", "prd")
+    # Delta sync: nothing changed, a2 is gone remotely
+    stats = sync_objects_to_local([], str(folder), "agents", "prd", current_ids=["a1", "a3"])
+    assert stats == {"written": 0, "unchanged": 0, "deleted": 1}
+    assert sorted(local_files(folder)) == ["a1", "a3"]
+    assert sorted(load_sync_manifest(str(folder))["objects"]) == ["a1", "a3"]
+
+
+def test_without_prune_nothing_is_deleted(tmp_path):
+    folder = tmp_path / "agents"
+    sync_objects_to_local([agent("a1", "x"), agent("a2", "y")], str(folder), "agents", "prd")
+    assert sync_objects_to_local([], str(folder), "agents", "prd", prune=False)["deleted"] == 0
+    assert sorted(local_files(folder)) == ["a1", "a2"]
+
@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+
+from aiworkforce import tool
+from aiworkforce.tool import ToolJobRunner
+
+
+class FakeJobs:
+    """ trigger_tool/poll_tool_run stand-ins. script maps an input value to its trigger response (or exception)
+    and the poll responses its job returns in turn """
+
+    def __init__(self, script:dict):
+        self.script = script
+        self.polls = {trigger["job_id"]: list(polls) for trigger, polls in script.values() if isinstance(trigger, dict) and "job_id" in trigger}
+        self.outstanding = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def trigger_tool(self, tool_id, region_id, project_id, api_key, tool_inputs):
+        trigger, _ = self.script[tool_inputs["value"]]
+        if isinstance(trigger, Exception):
+            raise trigger
+        if "job_id" in trigger:
+            with self.lock:
+                self.outstanding += 1
+                self.peak = max(self.peak, self.outstanding)
+        return trigger
+
+    def poll_tool_run(self, tool_id, region_id, project_id, api_key, job_id):
+        with self.lock:
+            response = self.polls[job_id].pop(0)
+            if response["type"] != "timeout":
+                self.outstanding -= 1
+        return response
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    jobs = FakeJobs({
+        "slow": ({"job_id": "j-slow"}, [{"type": "timeout"}, {"type": "timeout"}, {"type": "complete", "output": 1}]),
+        "fast": ({"job_id": "j-fast"}, [{"type": "complete", "output": 2}]),
+        "failed": ({"job_id": "j-failed"}, [{"type": "failed", "error": "bad input"}]),
+        "raises": (RuntimeError("trigger failed"), []),
+        "no_job": ({"status": "queued"}, []),
+    })
+    monkeypatch.setattr(tool, "trigger_tool", jobs.trigger_tool)
+    monkeypatch.setattr(tool, "poll_tool_run", jobs.poll_tool_run)
+    return jobs
+
+
+def runner(**kwargs) -> ToolJobRunner:
+    return ToolJobRunner("tool", "region", "project", "key", min_poll_interval=0.001, max_poll_interval=0.01, **kwargs)
+
+
+def test_results_for_completed_timed_out_and_failed_jobs(jobs):
+    tool_runner = runner(max_outstanding=2)
+    inputs = [{"value": value} for value in ("slow", "fast", "failed", "raises", "no_job")]
+    results = {result["index"]: result for result in tool_runner.run(inputs)}
+
+    assert {index: result["error"] for index, result in results.items()} == {
+        0: None,
+        1: None,
+        2: "bad input",
+        3: "RuntimeError('trigger failed')",
+        4: "no job_id returned",
+    }
+    assert results[0]["result"] == {"type": "complete", "output": 1}
+    assert results[0]["job_id"] == "j-slow"
+    assert results[4]["job_id"] is None
+    # slow is polled until it stops returning 'timeout'
+    assert tool_runner.polls == 5
+    assert tool_runner.errors == 3
+    assert jobs.peak <= 2
+    assert tool_runner.elapsed > 0
+
+
+def test_elapsed_is_set_when_iteration_stops_early(jobs):
+    tool_runner = runner(max_outstanding=1)
+    results = tool_runner.run([{"value": "fast"}, {"value": "slow"}])
+    next(results)
+    results.close()
+    assert tool_runner.elapsed > 0
+
+
+@pytest.mark.parametrize("max_outstanding", [0, -1])
+def test_max_outstanding_must_be_positive(max_outstanding):
+    with pytest.raises(ValueError):
+        runner(max_outstanding=max_outstanding)
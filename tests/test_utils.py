@@ -0,0 +1,96 @@
+import os
+import json
+import math
+from datetime import datetime, timezone
+
+import aiworkforce.utils as utils
+from aiworkforce.utils import open_all_object_files, open_object_files_lazy, parse_platform_timestamp, parse_platform_timestamps
+
+
+def write(folder, name:str, obj:dict):
+    with open(folder / name, "w") as f:
+        json.dump(obj, f)
+
+
+def counting_loader(monkeypatch) -> list:
+    loaded = []
+    load = utils.load_json_file
+
+    def load_json_file(path):
+        loaded.append(os.path.basename(path))
+        return load(path)
+
+    monkeypatch.setattr(utils, "load_json_file", load_json_file)
+    return loaded
+
+
+def test_file_cache_hit_and_miss_after_mtime_change(tmp_path, monkeypatch):
+    folder = tmp_path / "agents"
+    folder.mkdir()
+    write(folder, "a--1.json", {"agent_id": "1", "name": "a"})
+    write(folder, "b--2.json", {"agent_id": "2", "name": "b"})
+    cache_path = str(tmp_path / "cache.pickle")
+
+    loaded = counting_loader(monkeypatch)
+    assert open_all_object_files(str(folder), cache_path=cache_path) == [{"agent_id": "1", "name": "a"}, {"agent_id": "2", "name": "b"}]
+    assert sorted(loaded) == ["a--1.json", "b--2.json"]
+
+    loaded.clear()
+    assert [obj["name"] for obj in open_all_object_files(str(folder), cache_path=cache_path)] == ["a", "b"]
+    assert loaded == []
+
+    write(folder, "b--2.json", {"agent_id": "2", "name": "edited"})
+    stat = os.stat(folder / "b--2.json")
+    os.utime(folder / "b--2.json", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert [obj["name"] for obj in open_all_object_files(str(folder), max_workers=4, cache_path=cache_path)] == ["a", "edited"]
+    assert loaded == ["b--2.json"]
+
+
+def test_stale_cache_is_a_miss(tmp_path):
+    folder = tmp_path / "agents"
+    folder.mkdir()
+    write(folder, "a--1.json", {"agent_id": "1"})
+    cache_path = tmp_path / "cache.pickle"
+    # Pickles referencing a module or class that no longer exists, as one from another version might
+    for stale in (b"cnomodule\nThing\n.", b"cbuiltins\nNoSuchThing\n."):
+        cache_path.write_bytes(stale)
+        assert open_all_object_files(str(folder), cache_path=str(cache_path)) == [{"agent_id": "1"}]
+
+
+def test_lazy_object_files_parse_on_access(tmp_path, monkeypatch):
+    write(tmp_path, "my-agent--agent_1.json", {"agent_id": "agent.1"})
+    loaded = counting_loader(monkeypatch)
+    files = open_object_files_lazy(str(tmp_path))
+    assert list(files) == ["agent_1"]
+    assert loaded == []
+    assert files["agent_1"] == {"agent_id": "agent.1"}
+    assert files["agent_1"] is files["agent_1"]
+    assert loaded == ["my-agent--agent_1.json"]
+
+
+EPOCH = datetime(2024, 5, 1, 3, 4, 5, 123000, tzinfo=timezone.utc).timestamp()
+
+
+def test_platform_timestamp_fast_path():
+    assert parse_platform_timestamp("2024-05-01T03:04:05.123Z") == EPOCH
+
+
+def test_timestamp_with_offset():
+    assert parse_platform_timestamp("2024-05-01T13:04:05.123+10:00") == EPOCH
+    assert parse_platform_timestamp("2024-05-01T03:04:05Z") == int(EPOCH)
+
+
+def test_naive_timestamp_is_utc():
+    assert parse_platform_timestamp("2024-05-01T03:04:05.123") == EPOCH
+
+
+def test_missing_or_garbage_timestamp_is_nan():
+    for value in (None, "", "not a date", "2024-13-01T00:00:00.000Z"):
+        assert math.isnan(parse_platform_timestamp(value))
+
+
+def test_batch_parse_matches_single():
+    values = ["2024-05-01T03:04:05.123Z", "2024-05-01T13:04:05.123+10:00", "", "garbage"]
+    epochs = parse_platform_timestamps(values)
+    assert list(epochs[:2]) == [EPOCH, EPOCH]
+    assert all(math.isnan(epoch) for epoch in epochs[2:])
@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from aiworkforce import conversation
+from aiworkforce.conversation import ConversationWatcher
+from aiworkforce.types import ConversationState
+
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def record(conversation_id:str, state:str, update_datetime:str) -> dict:
+    return {"knowledge_set": conversation_id, "update_datetime": update_datetime, "metadata": {"conversation": {"state": state}}}
+
+
+class FakeListing:
+    """ query_conversations stand-in returning one scripted page per poll; an Exception in the script is raised """
+
+    def __init__(self, *polls):
+        self.polls = list(polls)
+        self.queries = []
+
+    def __call__(self, region_id, project_id, api_key, query, page_size, include_agent_details=True):
+        self.queries.append(query)
+        result = self.polls.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return iter(result)
+
+
+def since_of(query) -> str:
+    return next(condition["condition_value"] for condition in query.filters if condition.get("field") == "update_datetime")
+
+
+@pytest.fixture
+def watcher():
+    return ConversationWatcher("region", "project", "agent-1", "key", poll_interval=0, since=START, overlap_seconds=5)
+
+
+def test_high_water_mark_advances_with_overlap(watcher, monkeypatch):
+    listing = FakeListing(
+        [record("c1", ConversationState.RUNNING, "2024-01-01T00:10:00.000Z"), record("c2", ConversationState.RUNNING, "2024-01-01T00:20:00.000Z")],
+        [],
+    )
+    monkeypatch.setattr(conversation, "query_conversations", listing)
+    watcher.poll()
+    assert watcher.high_water == datetime(2024, 1, 1, 0, 20, tzinfo=timezone.utc).timestamp()
+    # an empty poll leaves the mark where it was
+    watcher.poll()
+    assert [since_of(query) for query in listing.queries] == ["2023-12-31T23:59:55.000Z", "2024-01-01T00:19:55.000Z"]
+    assert (watcher.polls, watcher.fetched) == (2, 2)
+
+
+def test_overlap_repeats_are_not_emitted_twice(watcher, monkeypatch):
+    c1_running = record("c1", ConversationState.RUNNING, "2024-01-01T00:10:00.000Z")
+    monkeypatch.setattr(conversation, "query_conversations", FakeListing(
+        [c1_running],
+        [c1_running, record("c1", ConversationState.COMPLETED, "2024-01-01T00:11:00.000Z")],
+    ))
+    first = watcher.poll()
+    second = watcher.poll()
+    assert [(event["conversation_id"], event["previous_state"], event["state"]) for event in first + second] == [
+        ("c1", None, ConversationState.RUNNING),
+        ("c1", ConversationState.RUNNING, ConversationState.COMPLETED),
+    ]
+
+
+def test_callbacks_filter_on_target_states(watcher, monkeypatch):
+    monkeypatch.setattr(conversation, "query_conversations", FakeListing([
+        record("c1", ConversationState.RUNNING, "2024-01-01T00:10:00.000Z"),
+        record("c2", ConversationState.UNRECOVERABLE, "2024-01-01T00:10:00.000Z"),
+        record("c3", ConversationState.COMPLETED, "2024-01-01T00:10:00.000Z"),
+    ]))
+    everything, failures = [], []
+    watcher.on_transition(everything.append)
+    watcher.on_transition(failures.append, to_states=[ConversationState.UNRECOVERABLE, ConversationState.TIMED_OUT])
+    watcher.on_transition(lambda event: 1 / 0)
+    watcher.poll()
+    assert [event["conversation_id"] for event in everything] == ["c1", "c2", "c3"]
+    assert [event["conversation_id"] for event in failures] == ["c2"]
+    assert watcher.callback_errors == 3
+
+
+def test_run_counts_failed_polls_towards_max_polls(watcher, monkeypatch):
+    listing = FakeListing(RuntimeError("listing failed"), [], [record("c1", ConversationState.RUNNING, "2024-01-01T00:10:00.000Z")], [])
+    monkeypatch.setattr(conversation, "query_conversations", listing)
+    watcher.run(max_polls=3)
+    assert (watcher.polls, watcher.poll_errors) == (2, 1)
+    assert len(listing.queries) == 3
+    assert watcher.states == {"c1": ConversationState.RUNNING}